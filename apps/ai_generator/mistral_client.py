@@ -161,6 +161,9 @@ class MistralClient:
         """
         Генерация хештегов для текста.
         
+        Запасной вариант для индекса хештегов (suggest_hashtags при
+        HASHTAG_AI_FALLBACK): вызывается, только если истории не хватило.
+        
         Args:
             text: Текст поста
             count: Количество хештегов
@@ -8,6 +8,15 @@ from .models import (
     Platform, PostCategory, PostTemplate, 
     Post, Publication, ProjectData, ScheduleSlot
 )
+from .services.image_renditions import get_rendition_url
+
+
+def image_preview(field_file):
+    """Уменьшенная копия изображения вместо оригинала на несколько МБ"""
+    url = get_rendition_url(field_file, 'admin')
+    if not url:
+        return '—'
+    return format_html('<img src="{}" style="max-width: 320px; max-height: 320px;">', url)
 
 
 @admin.register(Platform)
@@ -36,6 +45,7 @@ class PostCategoryAdmin(admin.ModelAdmin):
 @admin.register(PostTemplate)
 class PostTemplateAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'is_active']
+    list_select_related = ['category']
     list_filter = ['category', 'is_active']
     search_fields = ['name', 'template_text']
     
@@ -59,6 +69,10 @@ class PublicationInline(admin.TabularInline):
     readonly_fields = ['platform', 'status', 'external_id', 'external_url', 'published_at', 'error_message']
     can_delete = False
     
+    def get_queryset(self, request):
+        # __str__ публикации берёт пост и платформу - без этого по два запроса на строку
+        return super().get_queryset(request).select_related('post', 'platform')
+    
     def has_add_permission(self, request, obj=None):
         return False
 
@@ -66,19 +80,20 @@ class PublicationInline(admin.TabularInline):
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = ['title', 'category', 'status_badge', 'platforms_list', 'scheduled_time', 'created_at']
+    list_select_related = ['category']
     list_filter = ['status', 'category', 'platforms', 'ai_generated', 'created_at']
     search_fields = ['title', 'content']
     date_hierarchy = 'created_at'
     filter_horizontal = ['platforms']
     inlines = [PublicationInline]
-    readonly_fields = ['created_at', 'updated_at', 'published_at']
+    readonly_fields = ['image_preview', 'created_at', 'updated_at', 'published_at', 'bot_author_id']
     
     fieldsets = (
         ('Основное', {
             'fields': ('title', 'category', 'status')
         }),
         ('Контент', {
-            'fields': ('content', 'content_telegram', 'content_vk', 'image'),
+            'fields': ('content', 'content_telegram', 'content_vk', 'image', 'image_preview'),
         }),
         ('Публикация', {
             'fields': ('platforms', 'scheduled_time'),
@@ -88,7 +103,7 @@ class PostAdmin(admin.ModelAdmin):
             'classes': ('collapse',),
         }),
         ('Метаданные', {
-            'fields': ('created_by', 'created_at', 'updated_at', 'published_at'),
+            'fields': ('created_by', 'bot_author_id', 'created_at', 'updated_at', 'published_at'),
             'classes': ('collapse',),
         }),
     )
@@ -102,6 +117,7 @@ class PostAdmin(admin.ModelAdmin):
             'publishing': '#007bff',
             'published': '#28a745',
             'failed': '#dc3545',
+            'rejected': '#dc3545',
         }
         color = colors.get(obj.status, '#6c757d')
         return format_html(
@@ -111,10 +127,23 @@ class PostAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Статус'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('platforms')
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'template':
+            # Название шаблона в списке включает категорию
+            kwargs['queryset'] = PostTemplate.objects.select_related('category')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    
     def platforms_list(self, obj):
         return ", ".join([p.display_name for p in obj.platforms.all()])
     platforms_list.short_description = 'Платформы'
     
+    def image_preview(self, obj):
+        return image_preview(obj.image)
+    image_preview.short_description = 'Превью'
+    
     def save_model(self, request, obj, form, change):
         if not change:  # New object
             obj.created_by = request.user
@@ -124,6 +153,7 @@ class PostAdmin(admin.ModelAdmin):
 @admin.register(Publication)
 class PublicationAdmin(admin.ModelAdmin):
     list_display = ['post', 'platform', 'status', 'external_id', 'published_at']
+    list_select_related = ['post', 'platform']
     list_filter = ['status', 'platform', 'published_at']
     search_fields = ['post__title', 'external_id']
     readonly_fields = ['post', 'platform', 'status', 'external_id', 'external_url', 'error_message', 'published_at']
@@ -143,39 +173,44 @@ class ProjectDataAdmin(admin.ModelAdmin):
             'fields': ('features', 'description'),
         }),
         ('Изображения', {
-            'fields': ('main_image', 'images'),
+            'fields': ('main_image', 'main_image_preview', 'images'),
         }),
         ('Статус', {
             'fields': ('is_published', 'source_url'),
         }),
     )
     
+    readonly_fields = ['main_image_preview']
     actions = ['create_post_from_project']
     
+    def main_image_preview(self, obj):
+        return image_preview(obj.main_image)
+    main_image_preview.short_description = 'Превью'
+    
     @admin.action(description='Создать пост из выбранных проектов')
     def create_post_from_project(self, request, queryset):
         from .services.content_generator import ContentGenerator
         generator = ContentGenerator()
         
-        created_count = 0
-        for project in queryset.filter(is_published=False):
-            try:
-                post = generator.create_post_from_project(project)
-                project.is_published = True
-                project.save()
-                created_count += 1
-            except Exception as e:
-                self.message_user(request, f"Ошибка для {project.title}: {e}", level='error')
+        try:
+            posts = generator.create_posts_from_projects(queryset.filter(is_published=False))
+        except Exception as e:
+            self.message_user(request, f"Ошибка создания постов: {e}", level='error')
+            return
         
-        self.message_user(request, f"Создано постов: {created_count}")
+        self.message_user(request, f"Создано постов: {len(posts)}")
 
 
 @admin.register(ScheduleSlot)
 class ScheduleSlotAdmin(admin.ModelAdmin):
     list_display = ['day_of_week', 'time', 'is_active', 'platforms_list', 'preferred_category']
+    list_select_related = ['preferred_category']
     list_filter = ['is_active', 'day_of_week', 'platforms']
     filter_horizontal = ['platforms']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('platforms')
+    
     def platforms_list(self, obj):
         return ", ".join([p.display_name for p in obj.platforms.all()])
     platforms_list.short_description = 'Платформы'
@@ -2,7 +2,7 @@
 API Views for Posts app - JSON API endpoints
 """
 import json
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST, require_GET
 from django.views.decorators.csrf import csrf_exempt
 from django.shortcuts import get_object_or_404
@@ -16,7 +16,7 @@ def posts_list(request):
     """Список постов (API)"""
     status = request.GET.get('status')
     
-    posts = Post.objects.all()
+    posts = Post.objects.select_related('category')
     if status:
         posts = posts.filter(status=status)
     
@@ -37,7 +37,9 @@ def posts_list(request):
 @require_GET
 def post_detail(request, post_id):
     """Детали поста (API)"""
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('category').prefetch_related('platforms'), id=post_id
+    )
     
     data = {
         'id': post.id,
@@ -129,3 +131,14 @@ def scheduler_status(request):
     
     status = get_scheduler_status()
     return JsonResponse(status)
+
+
+@require_GET
+def metrics(request):
+    """Метрики Prometheus (текстовый формат)"""
+    import apps.publishers.metrics  # noqa: F401 - регистрирует метрики публикации
+    from apps.scheduler.metrics import PostQueueCollector
+    from config.metrics import render_metrics
+    
+    body, content_type = render_metrics(collectors=[PostQueueCollector()])
+    return HttpResponse(body, content_type=content_type)
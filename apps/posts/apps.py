@@ -5,3 +5,25 @@ class PostsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.posts'
     verbose_name = 'Публикации'
+    
+    def ready(self):
+        """Подключаем тюнинг SQLite, сброс кэша шаблонов и сборку превью"""
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_save, post_delete
+        from config.sqlite import on_connection_created
+        from .models import Post, PostCategory, PostTemplate, ProjectData
+        from .services.template_store import invalidate_template_cache
+        from .services.thumbnails import warm_thumbnail
+        
+        connection_created.connect(on_connection_created, dispatch_uid='sqlite_pragmas')
+        
+        for model in (PostTemplate, PostCategory):
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    invalidate_template_cache,
+                    sender=model,
+                    dispatch_uid=f'template_cache_{model.__name__}_{signal is post_save}'
+                )
+        
+        for model in (Post, ProjectData):
+            post_save.connect(warm_thumbnail, sender=model, dispatch_uid=f'thumbnail_{model.__name__}')
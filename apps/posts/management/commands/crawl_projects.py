@@ -0,0 +1,41 @@
+"""
+Импорт проектов с сайта компании.
+
+    python manage.py crawl_projects
+    python manage.py crawl_projects --site https://example.com --no-posts
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.posts.services.site_crawler import SiteCrawler
+
+
+class Command(BaseCommand):
+    help = 'Обойти сайт компании и обновить проекты бассейнов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--site', help='URL сайта (по умолчанию COMPANY_SITE_URL)')
+        parser.add_argument('--path', help='Путь к списку проектов (по умолчанию CRAWLER_PROJECTS_PATH)')
+        parser.add_argument('--workers', type=int, help='Параллельных загрузок')
+        parser.add_argument('--no-posts', action='store_true', help='Не создавать посты для новых проектов')
+
+    def handle(self, *args, **options):
+        crawler = SiteCrawler(
+            site_url=options['site'],
+            projects_path=options['path'],
+            workers=options['workers'],
+        )
+        if not crawler.site_url:
+            raise CommandError('Укажите --site или COMPANY_SITE_URL')
+
+        try:
+            # Посты создаём здесь же: процесс команды завершится раньше очереди планировщика
+            result = crawler.crawl(queue_posts=False)
+        finally:
+            crawler.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Готово: {result}'))
+
+        if result.created_ids and not options['no_posts']:
+            from apps.scheduler.scheduler import create_posts_from_projects
+            create_posts_from_projects(result.created_ids)
+            self.stdout.write(f'Созданы посты для {len(result.created_ids)} новых проектов')
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='bot_author_id',
+            field=models.BigIntegerField(blank=True, db_index=True, help_text='ID пользователя Telegram-бота, создавшего пост', null=True, verbose_name='Автор в боте'),
+        ),
+    ]
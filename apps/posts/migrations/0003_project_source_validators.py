@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_post_bot_author'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectdata',
+            name='source_etag',
+            field=models.CharField(blank=True, help_text='Для условных запросов при повторном обходе сайта', max_length=200, verbose_name='ETag источника'),
+        ),
+        migrations.AddField(
+            model_name='projectdata',
+            name='source_last_modified',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Last-Modified источника'),
+        ),
+        migrations.AlterField(
+            model_name='projectdata',
+            name='source_url',
+            field=models.URLField(blank=True, db_index=True, help_text='URL страницы проекта на сайте', verbose_name='Источник'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_project_source_validators'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='status',
+            field=models.CharField(choices=[('draft', '📝 Черновик'), ('pending', '⏳ На модерации'), ('approved', '✅ Одобрен'), ('scheduled', '📅 Запланирован'), ('publishing', '🔄 Публикуется'), ('published', '✔️ Опубликован'), ('failed', '❌ Ошибка'), ('rejected', '🚫 Отклонён')], default='draft', max_length=20, verbose_name='Статус'),
+        ),
+    ]
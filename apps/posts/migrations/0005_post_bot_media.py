@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_rejected_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='bot_media',
+            field=models.JSONField(blank=True, default=list, help_text='file_id Telegram и URL, которые не являются файлами в MEDIA_ROOT', verbose_name='Медиа из бота'),
+        ),
+    ]
@@ -2,6 +2,7 @@
 Database models for social media automation system.
 Модели базы данных для системы автоматизации публикаций.
 """
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import timezone
 
@@ -130,6 +131,15 @@ class PostTemplate(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.category})"
+    
+    def clean(self):
+        """Проверка плейсхолдеров при сохранении, а не при генерации"""
+        from .services.template_renderer import CompiledTemplate, TemplateError
+        
+        try:
+            CompiledTemplate(self.template_text, self.name)
+        except TemplateError as e:
+            raise ValidationError({'template_text': str(e)})
 
 
 class Post(models.Model):
@@ -144,6 +154,7 @@ class Post(models.Model):
         ('publishing', '🔄 Публикуется'),
         ('published', '✔️ Опубликован'),
         ('failed', '❌ Ошибка'),
+        ('rejected', '🚫 Отклонён'),
     ]
     
     title = models.CharField(
@@ -171,6 +182,12 @@ class Post(models.Model):
         null=True,
         verbose_name='Изображение'
     )
+    bot_media = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Медиа из бота',
+        help_text='file_id Telegram и URL, которые не являются файлами в MEDIA_ROOT'
+    )
     
     category = models.ForeignKey(
         PostCategory,
@@ -234,6 +251,13 @@ class Post(models.Model):
         related_name='created_posts',
         verbose_name='Создал'
     )
+    bot_author_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name='Автор в боте',
+        help_text='ID пользователя Telegram-бота, создавшего пост'
+    )
     
     class Meta:
         verbose_name = 'Пост'
@@ -371,9 +395,21 @@ class ProjectData(models.Model):
     
     source_url = models.URLField(
         blank=True,
+        db_index=True,
         verbose_name='Источник',
         help_text='URL страницы проекта на сайте'
     )
+    source_etag = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='ETag источника',
+        help_text='Для условных запросов при повторном обходе сайта'
+    )
+    source_last_modified = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Last-Modified источника'
+    )
     
     is_published = models.BooleanField(
         default=False,
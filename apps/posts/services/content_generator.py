@@ -4,9 +4,16 @@ Content Generator - генератор контента для постов.
 """
 import random
 import logging
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+from django.conf import settings
+from django.db import connections, transaction
 from django.utils import timezone
 
+from .template_renderer import compile_templates
+from .hashtag_index import get_hashtag_index, suggest_hashtags
+from .template_store import get_category_templates, get_db_templates
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,6 +21,9 @@ class TemplateEngine:
     """
     Шаблонный движок для генерации постов.
     Используется как fallback когда ИИ недоступен.
+    
+    Сначала берутся активные PostTemplate категории из БД (кэш в памяти,
+    см. template_store), если их нет - встроенные TEMPLATES.
     """
     
     # Шаблоны для разных категорий
@@ -154,6 +164,10 @@ class TemplateEngine:
         ],
     }
     
+    def __init__(self):
+        # Компилируются один раз (compile_template кэширует по тексту)
+        self.renderers = compile_templates(self.TEMPLATES)
+    
     def generate(
         self, 
         category: str, 
@@ -165,53 +179,34 @@ class TemplateEngine:
         
         Args:
             category: Категория поста (project, tip, promo и т.д.)
-            data: Данные для подстановки в шаблон
+            data: Данные для подстановки в шаблон (не изменяются)
             hashtag_count: Количество хештегов
             
         Returns:
             Готовый текст поста
         """
-        templates = self.TEMPLATES.get(category, self.TEMPLATES['project'])
-        template = random.choice(templates)
+        db_templates = get_category_templates(category)
+        if db_templates:
+            stored = random.choice(db_templates)
+            renderer = stored.renderer
+            category_hashtags = stored.hashtags or self.HASHTAGS.get(category, self.HASHTAGS['project'])
+        else:
+            renderer = random.choice(self.renderers.get(category) or self.renderers['project'])
+            category_hashtags = self.HASHTAGS.get(category, self.HASHTAGS['project'])
         
-        # Подготавливаем хештеги
-        category_hashtags = self.HASHTAGS.get(category, self.HASHTAGS['project'])
-        selected_hashtags = random.sample(
-            category_hashtags, 
-            min(hashtag_count, len(category_hashtags))
+        # Подготавливаем хештеги: сначала подобранные по истории публикаций
+        # (при HASHTAG_AI_FALLBACK недостающие - от ИИ), остальные - случайные
+        # из набора категории
+        text = ' '.join(str(value) for key, value in data.items() if value and key != 'hashtags')
+        selected_hashtags = suggest_hashtags(text, hashtag_count) if text else []
+        rest = [tag for tag in category_hashtags if tag.lower() not in selected_hashtags]
+        selected_hashtags += random.sample(
+            rest, 
+            min(hashtag_count - len(selected_hashtags), len(rest))
         )
-        data['hashtags'] = ' '.join(selected_hashtags)
-        
-        # Заполняем пустые поля дефолтными значениями
-        defaults = {
-            'title': 'Новый пост',
-            'description': '',
-            'content': '',
-            'pool_type': 'бассейн',
-            'size': '',
-            'features': '',
-            'location': 'Москва и МО',
-        }
-        
-        for key, default_value in defaults.items():
-            if key not in data or not data[key]:
-                data[key] = default_value
         
-        try:
-            result = template.format(**data)
-            # Убираем лишние пустые строки
-            lines = result.split('\n')
-            cleaned_lines = []
-            prev_empty = False
-            for line in lines:
-                is_empty = not line.strip()
-                if not (is_empty and prev_empty):
-                    cleaned_lines.append(line)
-                prev_empty = is_empty
-            return '\n'.join(cleaned_lines)
-        except KeyError as e:
-            logger.error(f"Template key error: {e}")
-            return template
+        # Пустые поля рендерер заполнит значениями по умолчанию
+        return renderer.render({**data, 'hashtags': ' '.join(selected_hashtags)})
 
 
 class ContentGenerator:
@@ -252,6 +247,15 @@ class ContentGenerator:
         Returns:
             Текст поста
         """
+        return self._generate_content(category, data, use_ai)[0]
+    
+    def _generate_content(
+        self,
+        category: str,
+        data: Dict[str, Any],
+        use_ai: bool = True
+    ) -> Tuple[str, bool]:
+        """Текст поста и признак того, что его написал ИИ"""
         # Попробуем использовать ИИ
         if use_ai and self.ai_client:
             try:
@@ -263,28 +267,18 @@ class ContentGenerator:
                 )
                 if ai_result:
                     logger.info("Generated content using DeepSeek AI")
-                    return ai_result
+                    return ai_result, True
             except Exception as e:
                 logger.warning(f"AI generation failed, using templates: {e}")
         
         # Fallback на шаблоны
         logger.info("Generating content using templates")
-        return self.template_engine.generate(category, data)
+        return self.template_engine.generate(category, data), False
     
-    def create_post_from_project(self, project) -> 'Post':
-        """
-        Создание поста из данных проекта.
-        
-        Args:
-            project: Экземпляр ProjectData
-            
-        Returns:
-            Созданный Post
-        """
-        from apps.posts.models import Post, PostCategory
-        
-        # Подготавливаем данные
-        data = {
+    @staticmethod
+    def _project_data(project) -> Dict[str, Any]:
+        """Данные проекта для шаблона / промпта"""
+        return {
             'title': project.title,
             'description': project.description or project.title,
             'pool_type': project.get_pool_type_display(),
@@ -292,29 +286,101 @@ class ContentGenerator:
             'features': project.features,
             'location': project.location,
         }
+    
+    @staticmethod
+    def _project_category():
+        from apps.posts.models import PostCategory
         
-        # Генерируем контент
-        content = self.generate_post_content('project', data)
-        
-        # Получаем или создаём категорию
         category, _ = PostCategory.objects.get_or_create(
             slug='project',
             defaults={'name': '🏊 Новый проект'}
         )
+        return category
+    
+    @staticmethod
+    def _project_post(project, category, content: str, ai_generated: bool) -> 'Post':
+        """Несохранённый Post для проекта"""
+        from apps.posts.models import Post
         
-        # Создаём пост
-        post = Post.objects.create(
-            title=f"Проект: {project.title}",
+        return Post(
+            title=f"Проект: {project.title}"[:200],
             content=content,
             category=category,
             status='pending',
-            ai_generated=bool(self.ai_client),
+            ai_generated=ai_generated,
             image=project.main_image if project.main_image else None,
         )
+    
+    def create_post_from_project(self, project) -> 'Post':
+        """
+        Создание поста из данных проекта.
+        
+        Args:
+            project: Экземпляр ProjectData
+            
+        Returns:
+            Созданный Post
+        """
+        content, ai_generated = self._generate_content('project', self._project_data(project))
+        
+        post = self._project_post(project, self._project_category(), content, ai_generated)
+        post.save()
         
         logger.info(f"Created post {post.id} from project {project.id}")
         return post
     
+    def create_posts_from_projects(self, projects, max_workers: int = None) -> List['Post']:
+        """
+        Создание постов сразу для многих проектов.
+        
+        Категория получается один раз, тексты генерируются параллельно,
+        посты сохраняются одним bulk_create, а проекты помечаются одним update().
+        
+        Args:
+            projects: QuerySet или список ProjectData
+            max_workers: Параллельных запросов к ИИ (по умолчанию AI_CONCURRENCY)
+            
+        Returns:
+            Созданные посты
+        """
+        from apps.posts.models import Post, ProjectData
+        
+        projects = list(projects)
+        if not projects:
+            return []
+        
+        # Данные и кеши (шаблоны из БД, индекс хештегов) готовим заранее, чтобы
+        # потоки в основном только генерировали. Кеш может истечь посреди
+        # долгой пачки и дочитаться из потока - поэтому поток закрывает
+        # свои соединения с БД после каждой задачи
+        items = [self._project_data(project) for project in projects]
+        get_db_templates()
+        get_hashtag_index()
+        
+        def generate(data):
+            try:
+                return self._generate_content('project', data)
+            finally:
+                connections.close_all()
+        
+        with ThreadPoolExecutor(max_workers=max_workers or settings.AI_CONCURRENCY) as executor:
+            generated = list(executor.map(generate, items))
+        
+        category = self._project_category()
+        posts = [
+            self._project_post(project, category, content, ai_generated)
+            for project, (content, ai_generated) in zip(projects, generated)
+        ]
+        
+        with transaction.atomic():
+            posts = Post.objects.bulk_create(posts, batch_size=100)
+            ProjectData.objects.filter(
+                id__in=[project.id for project in projects]
+            ).update(is_published=True, updated_at=timezone.now())
+        
+        logger.info(f"Created {len(posts)} posts from projects")
+        return posts
+    
     def generate_tips_batch(self, count: int = 5) -> list:
         """
         Генерация пакета советов.
@@ -0,0 +1,221 @@
+"""
+Hashtag Index - подбор хештегов по истории публикаций без обращения к ИИ.
+
+Индекс строится по опубликованным постам:
+- связь "слово текста -> хештег" (грубая основа слова: первые 6 букв),
+  с поправкой на частоту и слова, и хештега (idf);
+- совместная встречаемость хештегов;
+- вес каждого поста - вовлечённость: число успешных публикаций.
+
+Пополняется инкрементально - посты, опубликованные не раньше последнего
+учтённого (по published_at, а не по id: пост, созданный раньше, может
+выйти позже). Раз в HASHTAG_INDEX_REBUILD секунд индекс перестраивается с
+нуля в каждом процессе - учесть изменившуюся статистику.
+
+Рекомендация - несколько обращений к словарям в памяти, без запросов к БД
+(кроме редкого инкрементального обновления). ИИ - опциональный запасной
+вариант, когда истории не хватает (suggest_hashtags).
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+HASHTAG_RE = re.compile(r'#[^\W_][\w]*')
+WORD_RE = re.compile(r'[^\W\d_]{4,}')
+STEM_LENGTH = 6
+
+# Вклад признаков в оценку хештега
+WORD_WEIGHT = 1.0
+COOCCURRENCE_WEIGHT = 2.0
+POPULARITY_WEIGHT = 0.05
+
+
+def extract_hashtags(text: str) -> List[str]:
+    """Хештеги текста в нижнем регистре, без повторов"""
+    return list(dict.fromkeys(tag.lower() for tag in HASHTAG_RE.findall(text or '')))
+
+
+def _stems(text: str) -> set:
+    text = HASHTAG_RE.sub(' ', (text or '').lower())
+    return {word[:STEM_LENGTH] for word in WORD_RE.findall(text)}
+
+
+class HashtagIndex:
+    """Индекс хештегов в памяти процесса"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.refreshed_at = 0.0
+        self.rebuilt_at = 0.0
+
+    def _reset(self):
+        self.popularity: Dict[str, float] = defaultdict(float)
+        self.cooccurrence: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.word_tags: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.word_posts: Dict[str, int] = defaultdict(int)
+        self.posts = 0
+        self.total_weight = 0.0
+        self.last_published_at = None
+        self._post_ids = set()
+
+    def __len__(self):
+        return len(self.popularity)
+
+    def add(self, text: str, weight: float = 1.0):
+        """Учесть текст опубликованного поста с весом вовлечённости"""
+        tags = extract_hashtags(text)
+        if not tags:
+            return
+
+        self.posts += 1
+        self.total_weight += weight
+        for tag in tags:
+            self.popularity[tag] += weight
+            for other in tags:
+                if other != tag:
+                    self.cooccurrence[tag][other] += weight
+
+        for stem in _stems(text):
+            self.word_posts[stem] += 1
+            word_tags = self.word_tags[stem]
+            for tag in tags:
+                word_tags[tag] += weight
+
+    def recommend(self, text: str, count: int = 5) -> List[str]:
+        """
+        Хештеги для черновика.
+
+        Args:
+            text: Текст черновика (уже стоящие в нём хештеги учитываются и не повторяются)
+            count: Сколько вернуть
+        """
+        with self._lock:
+            return self._recommend(text, count)
+
+    def _recommend(self, text: str, count: int) -> List[str]:
+        present = extract_hashtags(text)
+        scores: Dict[str, float] = defaultdict(float)
+
+        for stem in _stems(text):
+            word_tags = self.word_tags.get(stem)
+            if not word_tags:
+                continue
+            # Редкие слова значат больше частых (idf)
+            idf = math.log(1 + self.posts / self.word_posts[stem])
+            for tag, weight in word_tags.items():
+                # Хештеги, стоящие почти везде, не должны вытеснять тематические
+                tag_idf = math.log(1 + self.total_weight / self.popularity[tag])
+                scores[tag] += WORD_WEIGHT * idf * tag_idf * weight
+
+        for tag in present:
+            for other, weight in self.cooccurrence.get(tag, {}).items():
+                scores[other] += COOCCURRENCE_WEIGHT * weight
+
+        if not scores:
+            # Ничего не связалось с текстом - самые популярные
+            scores = dict(self.popularity)
+        else:
+            for tag in scores:
+                scores[tag] += POPULARITY_WEIGHT * self.popularity.get(tag, 0.0)
+
+        for tag in present:
+            scores.pop(tag, None)
+
+        return heapq.nlargest(count, scores, key=scores.get)
+
+    def refresh(self, full: bool = False):
+        """
+        Дочитать новые опубликованные посты из БД.
+
+        Args:
+            full: Перестроить индекс с нуля (учесть изменившуюся статистику)
+        """
+        from django.db.models import Count, Q
+        from apps.posts.models import Post
+
+        posts = Post.objects.filter(status='published')
+        if not full and self.last_published_at is not None:
+            # >= и проверка по id: посты с тем же временем не теряются и не учитываются дважды
+            posts = posts.filter(published_at__gte=self.last_published_at)
+
+        # Запрос - без блокировки, рекомендации в это время продолжают работать
+        rows = list(
+            posts.annotate(reach=Count('publications', filter=Q(publications__status='success')))
+            .order_by('published_at', 'id')
+            .values_list('id', 'content', 'reach', 'published_at')
+        )
+
+        with self._lock:
+            if full:
+                self._reset()
+            for post_id, content, reach, published_at in rows:
+                if post_id in self._post_ids:
+                    continue
+                self.add(content, weight=1.0 + reach)
+                self._post_ids.add(post_id)
+                if published_at and (self.last_published_at is None or published_at > self.last_published_at):
+                    self.last_published_at = published_at
+            self.refreshed_at = time.monotonic()
+            if full:
+                self.rebuilt_at = self.refreshed_at
+
+        logger.info(f"Hashtag index: {self.posts} posts, {len(self)} hashtags")
+
+
+_index: Optional[HashtagIndex] = None
+
+
+def get_hashtag_index() -> HashtagIndex:
+    """
+    Индекс, дочитанный не реже чем раз в HASHTAG_INDEX_REFRESH секунд и
+    перестроенный с нуля не реже чем раз в HASHTAG_INDEX_REBUILD секунд.
+    """
+    global _index
+    if _index is None:
+        _index = HashtagIndex()
+
+    now = time.monotonic()
+    full = now - _index.rebuilt_at >= settings.HASHTAG_INDEX_REBUILD
+    if full or now - _index.refreshed_at >= settings.HASHTAG_INDEX_REFRESH:
+        try:
+            _index.refresh(full=full)
+        except Exception as e:
+            logger.warning(f"Hashtag index refresh failed: {e}")
+            _index.refreshed_at = now
+            if full:
+                _index.rebuilt_at = now
+    return _index
+
+
+def suggest_hashtags(text: str, count: int = 5, ai_fallback: bool = None) -> List[str]:
+    """
+    Хештеги для текста: из индекса, при нехватке - дополнить ИИ.
+
+    Args:
+        text: Текст поста
+        count: Количество хештегов
+        ai_fallback: Обращаться к ИИ, если индекс дал меньше count
+            (по умолчанию HASHTAG_AI_FALLBACK)
+    """
+    tags = get_hashtag_index().recommend(text, count)
+
+    if ai_fallback is None:
+        ai_fallback = settings.HASHTAG_AI_FALLBACK
+    if len(tags) < count and ai_fallback:
+        from apps.ai_generator.mistral_client import get_mistral_client
+        for tag in get_mistral_client().generate_hashtags(text, count):
+            tag = tag.lower()
+            if tag not in tags and len(tags) < count:
+                tags.append(tag)
+
+    return tags
@@ -0,0 +1,136 @@
+"""
+Image Renditions - уменьшенные копии изображений под платформы.
+
+Оригиналы (фото с телефона на 10-20 МБ) не отправляются как есть: для
+каждой платформы один раз строится JPEG нужного размера и кладётся в
+MEDIA_ROOT/renditions/<вариант>/. Имя файла - хеш пути, размера и
+времени изменения оригинала, поэтому замена картинки даёт новый файл,
+а повторные публикации берут готовый.
+
+Большие JPEG декодируются сразу в уменьшенном масштабе (Image.draft),
+поворот по EXIF применяется, метаданные не копируются.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'renditions'
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """Вариант изображения: наибольшая сторона и качество JPEG"""
+    name: str
+    max_side: int
+    quality: int
+
+
+RENDITIONS = {
+    # Telegram всё равно пережимает фото до 1280px по большей стороне
+    'telegram': Rendition('telegram', 1280, 85),
+    # Стена VK показывает до 1920px; больше - лишние байты при загрузке
+    'vk': Rendition('vk', 1920, 87),
+    # Превью в админке
+    'admin': Rendition('admin', 320, 80),
+}
+
+
+def rendition_path(source: str, name: str) -> Path:
+    """Путь к варианту изображения (файла может ещё не быть)"""
+    stat = os.stat(source)
+    key = hashlib.sha1(f'{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest()
+    return Path(settings.MEDIA_ROOT) / RENDITIONS_DIR / name / f'{key[:20]}.jpg'
+
+
+def load_image(source: str, max_side: int):
+    """
+    Открыть изображение уменьшенным до max_side по большей стороне:
+    RGB, с поворотом по EXIF, прозрачность - на белом фоне.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        # JPEG декодируется сразу в 1/2, 1/4 или 1/8 размера - в разы быстрее
+        image.draft('RGB', (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        image.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=3.0)
+        return image
+
+
+def save_atomic(image, target: Path, image_format: str, **options):
+    """Сохранить через временный файл: читатели не увидят недописанный файл"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            image.save(tmp, image_format, **options)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render(source: str, rendition: Rendition, target: Path):
+    """Построить вариант изображения и атомарно записать в target"""
+    image = load_image(source, rendition.max_side)
+    save_atomic(image, target, 'JPEG', quality=rendition.quality, optimize=True, progressive=True)
+
+
+def get_rendition(image_path: Optional[str], name: str) -> Optional[str]:
+    """
+    Путь к варианту изображения для платформы (строится при первом обращении).
+
+    Args:
+        image_path: Путь к оригиналу
+        name: Вариант из RENDITIONS
+
+    Returns:
+        Путь к варианту; оригинал, если построить не удалось; None без изображения
+    """
+    if not image_path or not os.path.exists(image_path):
+        return image_path
+
+    try:
+        target = rendition_path(image_path, name)
+        if not target.exists():
+            render(image_path, RENDITIONS[name], target)
+            logger.info(
+                f"Rendition {name}: {os.path.getsize(image_path) // 1024} KB -> "
+                f"{target.stat().st_size // 1024} KB ({image_path})"
+            )
+        return str(target)
+    except Exception as e:
+        logger.warning(f"Rendition {name} failed for {image_path}: {e}")
+        return image_path
+
+
+def get_rendition_url(field_file, name: str) -> Optional[str]:
+    """URL варианта изображения для поля ImageField (None без изображения)"""
+    if not field_file:
+        return None
+    try:
+        path = get_rendition(field_file.path, name)
+    except Exception:
+        return field_file.url
+
+    relative = os.path.relpath(path, settings.MEDIA_ROOT)
+    if relative.startswith('..'):
+        return field_file.url
+    return settings.MEDIA_URL + relative.replace(os.sep, '/')
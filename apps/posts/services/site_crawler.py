@@ -0,0 +1,352 @@
+"""
+Site Crawler - импорт проектов с сайта компании в ProjectData.
+
+Обходит список проектов (COMPANY_SITE_URL + CRAWLER_PROJECTS_PATH, с пагинацией),
+затем параллельно загружает страницы проектов:
+- общий пул соединений requests на все потоки;
+- условные запросы (If-None-Match / If-Modified-Since) - неизменившиеся
+  страницы отвечают 304 и не разбираются;
+- разбор через lxml;
+- запись в БД пачкой: bulk_create для новых, bulk_update для изменившихся.
+
+Для новых проектов ставится задача создания постов в планировщик.
+"""
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlparse, urldefrag
+
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'PoolSocialBot/1.0 (+crawler)'
+
+# Ссылки на страницы проектов в списке
+PROJECT_LINK_XPATH = "//a[contains(@href, '{path}')]/@href"
+NEXT_PAGE_XPATH = "//a[@rel='next']/@href | //link[@rel='next']/@href"
+
+# Подписи характеристик на странице -> поле ProjectData
+PROPERTY_LABELS = [
+    ('тип', 'pool_type'),
+    ('размер', 'size'),
+    ('габарит', 'size'),
+    ('особенност', 'features'),
+    ('оборудован', 'features'),
+    ('локац', 'location'),
+    ('город', 'location'),
+    ('адрес', 'location'),
+    ('место', 'location'),
+]
+
+# Ключевые слова -> ProjectData.POOL_TYPES
+POOL_TYPE_KEYWORDS = [
+    ('композит', 'composite'),
+    ('каркас', 'frame'),
+    ('надув', 'inflatable'),
+    ('крыт', 'indoor'),
+    ('помещени', 'indoor'),
+    ('открыт', 'outdoor'),
+    ('уличн', 'outdoor'),
+    ('бетон', 'concrete'),
+]
+DEFAULT_POOL_TYPE = 'concrete'
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+SIZE_RE = re.compile(r'\d+(?:[.,]\d+)?\s*[xх×*]\s*\d+(?:[.,]\d+)?(?:\s*м)?', re.IGNORECASE)
+
+MAX_IMAGES = 10
+
+# Поля, которые обход перезаписывает у существующих проектов
+UPDATE_FIELDS = [
+    'title', 'pool_type', 'size', 'features', 'location', 'description', 'images',
+    'source_etag', 'source_last_modified', 'updated_at',
+]
+
+
+@dataclass
+class CrawlResult:
+    """Итог обхода"""
+    pages: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    created_ids: List[int] = field(default_factory=list)
+    updated_ids: List[int] = field(default_factory=list)
+
+    def __str__(self):
+        return (f"страниц: {self.pages}, без изменений: {self.not_modified}, "
+                f"новых: {len(self.created_ids)}, обновлено: {len(self.updated_ids)}, "
+                f"ошибок: {self.errors}")
+
+
+def _clean(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def _match_pool_type(text: str) -> str:
+    text = text.lower()
+    for keyword, pool_type in POOL_TYPE_KEYWORDS:
+        if keyword in text:
+            return pool_type
+    return DEFAULT_POOL_TYPE
+
+
+def _detect_encoding(response: requests.Response) -> str:
+    """Кодировка из Content-Type, затем из <meta charset>, иначе UTF-8"""
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    match = META_CHARSET_RE.search(response.content[:4096])
+    return match.group(1).decode('ascii') if match else 'utf-8'
+
+
+def _parse_html(content: bytes, url: str, encoding: str = 'utf-8'):
+    return lxml_html.fromstring(content, base_url=url, parser=lxml_html.HTMLParser(encoding=encoding))
+
+
+def parse_project_page(content: bytes, url: str, encoding: str = 'utf-8') -> Optional[Dict]:
+    """
+    Разбор страницы проекта.
+
+    Returns:
+        Поля ProjectData или None, если на странице нет заголовка
+    """
+    doc = _parse_html(content, url, encoding)
+
+    title = (
+        _clean(' '.join(doc.xpath('//h1[1]//text()')))
+        or _clean(' '.join(doc.xpath("//meta[@property='og:title']/@content")))
+        or _clean(' '.join(doc.xpath('//title//text()')))
+    )
+    if not title:
+        return None
+
+    description = (
+        _clean(' '.join(doc.xpath("//*[contains(@class, 'description')]//text()")))
+        or _clean(' '.join(doc.xpath("//meta[@name='description']/@content")))
+        or _clean(' '.join(doc.xpath('(//article//p | //main//p)[1]//text()')))
+    )
+
+    # Характеристики: "Размер: 8x4 м" в dl, таблицах и списках
+    properties = {}
+    pairs = [
+        (row.xpath('string(./dt)'), row.xpath('string(./dd)')) for row in doc.xpath('//dl')
+    ]
+    pairs += [
+        (cells[0].text_content(), cells[-1].text_content())
+        for cells in (row.xpath('./th|./td') for row in doc.xpath('//tr'))
+        if len(cells) >= 2
+    ]
+    pairs += [
+        tuple(item.text_content().split(':', 1))
+        for item in doc.xpath('//li')
+        if ':' in item.text_content()
+    ]
+    for label, value in pairs:
+        label, value = _clean(label).lower(), _clean(value)
+        if not value:
+            continue
+        for keyword, field_name in PROPERTY_LABELS:
+            if keyword in label and field_name not in properties:
+                properties[field_name] = value
+                break
+
+    page_text = _clean(doc.text_content())
+    size = properties.get('size')
+    if not size:
+        match = SIZE_RE.search(page_text)
+        size = match.group(0) if match else ''
+
+    images = []
+    for src in doc.xpath(
+        "//meta[@property='og:image']/@content"
+        " | //*[contains(@class, 'gallery') or contains(@class, 'project')]//img/@src"
+    ):
+        src = urljoin(url, src.strip())
+        if src not in images:
+            images.append(src)
+
+    return {
+        'title': title[:200],
+        'pool_type': _match_pool_type(properties.get('pool_type') or title),
+        'size': size[:50],
+        'features': properties.get('features', ''),
+        'location': properties.get('location', '')[:200],
+        'description': description,
+        'images': images[:MAX_IMAGES],
+    }
+
+
+class SiteCrawler:
+    """Обход сайта компании и импорт проектов"""
+
+    def __init__(
+        self,
+        site_url: str = None,
+        projects_path: str = None,
+        workers: int = None,
+        timeout: int = None,
+    ):
+        self.site_url = site_url or settings.COMPANY_SITE_URL
+        self.projects_path = projects_path or settings.CRAWLER_PROJECTS_PATH
+        self.workers = workers or settings.CRAWLER_WORKERS
+        self.timeout = timeout or settings.CRAWLER_TIMEOUT
+
+        # Один пул соединений на все потоки
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers, max_retries=1)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+
+    def close(self):
+        self.session.close()
+
+    def _same_site(self, url: str) -> bool:
+        return urlparse(url).netloc == urlparse(self.site_url).netloc
+
+    def discover_project_urls(self, max_pages: int = None) -> List[str]:
+        """Ссылки на проекты со всех страниц списка"""
+        max_pages = max_pages or settings.CRAWLER_MAX_PAGES
+        index_url = urljoin(self.site_url, self.projects_path)
+        link_xpath = PROJECT_LINK_XPATH.format(path=self.projects_path)
+
+        urls = []
+        seen_pages = set()
+        page_url = index_url
+        while page_url and page_url not in seen_pages and len(seen_pages) < max_pages:
+            seen_pages.add(page_url)
+            response = self.session.get(page_url, timeout=self.timeout)
+            response.raise_for_status()
+
+            doc = _parse_html(response.content, page_url, _detect_encoding(response))
+            for href in doc.xpath(link_xpath):
+                url = urldefrag(urljoin(page_url, href))[0]
+                if url.rstrip('/') == index_url.rstrip('/') or '?' in url:
+                    continue  # Сам список и его страницы пагинации
+                if self._same_site(url) and url not in urls:
+                    urls.append(url)
+
+            next_pages = doc.xpath(NEXT_PAGE_XPATH)
+            page_url = urljoin(page_url, next_pages[0]) if next_pages else None
+
+        return urls
+
+    def _fetch(self, url: str, etag: str, last_modified: str) -> Dict:
+        """Условный GET и разбор одной страницы (выполняется в потоке)"""
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                return {'url': url, 'status': 304}
+            response.raise_for_status()
+
+            return {
+                'url': url,
+                'status': response.status_code,
+                'etag': response.headers.get('ETag', ''),
+                'last_modified': response.headers.get('Last-Modified', ''),
+                'data': parse_project_page(response.content, url, _detect_encoding(response)),
+            }
+        except Exception as e:
+            logger.warning(f"Crawler: failed to fetch {url}: {e}")
+            return {'url': url, 'status': None, 'error': str(e)}
+
+    def crawl(self, urls: List[str] = None, queue_posts: bool = True) -> CrawlResult:
+        """
+        Обойти сайт и обновить ProjectData.
+
+        Args:
+            urls: Страницы проектов (по умолчанию - найденные в списке проектов)
+            queue_posts: Поставить в планировщик создание постов для новых проектов
+
+        Returns:
+            CrawlResult
+        """
+        from apps.posts.models import ProjectData
+
+        if urls is None:
+            urls = self.discover_project_urls()
+
+        existing = {
+            project.source_url: project
+            for project in ProjectData.objects.filter(source_url__in=urls)
+        }
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            fetched = list(executor.map(
+                lambda url: self._fetch(
+                    url,
+                    existing[url].source_etag if url in existing else '',
+                    existing[url].source_last_modified if url in existing else '',
+                ),
+                urls,
+            ))
+
+        result = CrawlResult(pages=len(urls))
+        to_create, to_update = [], []
+        now = timezone.now()
+
+        for page in fetched:
+            if page['status'] == 304:
+                result.not_modified += 1
+                continue
+            if not page['status'] or not page['data']:
+                result.errors += 1
+                continue
+
+            values = dict(
+                page['data'],
+                source_etag=page['etag'][:200],
+                source_last_modified=page['last_modified'][:100],
+            )
+            project = existing.get(page['url'])
+            if project is None:
+                to_create.append(ProjectData(source_url=page['url'], **values))
+                continue
+
+            if any(getattr(project, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(project, name, value)
+                project.updated_at = now
+                to_update.append(project)
+
+        with transaction.atomic():
+            created = ProjectData.objects.bulk_create(to_create, batch_size=100)
+            ProjectData.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=100)
+
+        result.created_ids = [project.pk for project in created if project.pk]
+        result.updated_ids = [project.pk for project in to_update]
+        logger.info(f"Crawler: {result}")
+
+        if queue_posts and result.created_ids:
+            from apps.scheduler.scheduler import queue_posts_from_projects
+            queue_posts_from_projects(result.created_ids)
+
+        return result
+
+
+def crawl_company_site(queue_posts: bool = True) -> Optional[CrawlResult]:
+    """Обход сайта из настроек (COMPANY_SITE_URL)"""
+    if not settings.COMPANY_SITE_URL:
+        logger.info("Crawler: COMPANY_SITE_URL is not configured")
+        return None
+
+    crawler = SiteCrawler()
+    try:
+        return crawler.crawl(queue_posts=queue_posts)
+    finally:
+        crawler.close()
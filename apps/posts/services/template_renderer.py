@@ -0,0 +1,165 @@
+"""
+Template Renderer - предкомпилированные шаблоны постов.
+
+Шаблон (str.format-синтаксис: {title}, {size}...) разбирается один раз:
+плейсхолдеры проверяются при загрузке, а не при каждой генерации.
+Рендер - один format_map. Какие строки шаблона станут пустыми, зависит
+только от того, какие поля пустые, поэтому вариант шаблона с уже
+выброшенными лишними пустыми строками строится один раз на набор пустых
+полей и кэшируется. Входные данные не изменяются.
+"""
+import re
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, FrozenSet, List, Mapping, Tuple
+
+# Плейсхолдеры, доступные в шаблонах постов
+PLACEHOLDERS = frozenset({
+    'title', 'description', 'content', 'pool_type', 'size',
+    'features', 'location', 'hashtags',
+})
+
+# Значения по умолчанию для пустых полей
+DEFAULTS = {
+    'title': 'Новый пост',
+    'description': '',
+    'content': '',
+    'pool_type': 'бассейн',
+    'size': '',
+    'features': '',
+    'location': 'Москва и МО',
+    'hashtags': '',
+}
+
+# Пустая строка, за которой идут ещё пустые строки: оставляем только первую
+_BLANK_RUN_RE = re.compile(r'(^|\n)([ \t]*)((?:\n[ \t]*)+)(?=\n|$)')
+# Две пустые строки подряд не в начале текста (дешёвая проверка перед заменой)
+_TWO_BLANK_LINES_RE = re.compile(r'\n[ \t]*\n[ \t]*(?:\n|$)')
+
+_CONVERSIONS = ('r', 's', 'a')
+
+
+class TemplateError(ValueError):
+    """Некорректный шаблон поста"""
+
+
+def collapse_blank_lines(text: str) -> str:
+    """Схлопнуть подряд идущие пустые строки в одну"""
+    if _TWO_BLANK_LINES_RE.search(text) or (
+        text[:1] in ' \t\n' and _TWO_BLANK_LINES_RE.match('\n' + text)
+    ):
+        return _BLANK_RUN_RE.sub(r'\1\2', text)
+    return text
+
+
+class CompiledTemplate:
+    """
+    Шаблон, разобранный один раз.
+
+    Args:
+        text: Текст шаблона
+        name: Имя для сообщений об ошибках
+
+    Raises:
+        TemplateError: неизвестный плейсхолдер или неверный синтаксис
+    """
+
+    __slots__ = ('text', 'name', 'placeholders', '_lines', '_variants')
+
+    def __init__(self, text: str, name: str = None):
+        self.text = text
+        self.name = name or text[:30]
+
+        placeholders = set()
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise TemplateError(f"Шаблон «{self.name}»: {e}") from e
+
+        simple = True
+        for _literal, field_name, spec, conversion in parsed:
+            if field_name is None:
+                continue
+            simple = simple and not spec and not conversion
+            if field_name not in PLACEHOLDERS:
+                raise TemplateError(
+                    f"Шаблон «{self.name}»: неизвестный плейсхолдер {{{field_name}}}. "
+                    f"Доступны: {', '.join(sorted(PLACEHOLDERS))}"
+                )
+            if spec and '{' in spec:
+                raise TemplateError(f"Шаблон «{self.name}»: вложенные плейсхолдеры не поддерживаются")
+            if conversion and conversion not in _CONVERSIONS:
+                raise TemplateError(f"Шаблон «{self.name}»: неизвестное преобразование !{conversion}")
+            placeholders.add(field_name)
+
+        self.placeholders: FrozenSet[str] = frozenset(placeholders)
+
+        # Строки шаблона: (литерал пустой?, плейсхолдеры строки). С форматированием
+        # ({size:>10}, {title!r}) пустоту заранее не предсказать - без вариантов
+        self._lines = self._split_lines(text) if simple else None
+        self._variants: Dict[FrozenSet[str], str] = {}
+
+    @staticmethod
+    def _split_lines(text: str) -> List[Tuple[str, bool, FrozenSet[str]]]:
+        lines = []
+        for line in text.split('\n'):
+            parsed = list(Formatter().parse(line))
+            literal = ''.join(part[0] for part in parsed)
+            names = frozenset(part[1] for part in parsed if part[1] is not None)
+            lines.append((line, not literal.strip(), names))
+        return lines
+
+    def _variant(self, blank_fields: FrozenSet[str]) -> str:
+        """Текст шаблона без строк, которые схлопнутся при этих пустых полях"""
+        kept = []
+        prev_empty = False
+        for line, literal_empty, names in self._lines:
+            is_empty = literal_empty and names <= blank_fields
+            if not (is_empty and prev_empty):
+                kept.append(line)
+            prev_empty = is_empty
+        variant = self._variants[blank_fields] = '\n'.join(kept)
+        return variant
+
+    def render(self, values: Mapping[str, object]) -> str:
+        """
+        Подставить значения. Пустые и отсутствующие поля берутся из DEFAULTS.
+
+        Args:
+            values: Значения плейсхолдеров (не изменяются)
+        """
+        fields = {}
+        blank = []
+        multiline = False
+        for name in self.placeholders:
+            value = fields[name] = values.get(name) or DEFAULTS[name]
+            value = value if isinstance(value, str) else str(value)
+            if '\n' in value:
+                multiline = True
+            elif not value.strip():
+                blank.append(name)
+
+        if multiline or self._lines is None:
+            # Значение со своими переводами строк меняет разбиение на строки
+            return collapse_blank_lines(self.text.format_map(fields))
+
+        blank = frozenset(blank)
+        template = self._variants.get(blank) or self._variant(blank)
+        return template.format_map(fields)
+
+    def __repr__(self):
+        return f"<CompiledTemplate {self.name!r} {sorted(self.placeholders)}>"
+
+
+@lru_cache(maxsize=512)
+def compile_template(text: str, name: str = None) -> CompiledTemplate:
+    """Скомпилировать шаблон (с кэшированием по тексту)"""
+    return CompiledTemplate(text, name)
+
+
+def compile_templates(templates: Mapping[str, list]) -> Dict[str, Tuple[CompiledTemplate, ...]]:
+    """Скомпилировать словарь {категория: [шаблоны]}"""
+    return {
+        category: tuple(compile_template(text, f"{category} #{i + 1}") for i, text in enumerate(texts))
+        for category, texts in templates.items()
+    }
@@ -0,0 +1,103 @@
+"""
+Template Store - шаблоны постов из БД (PostTemplate) в памяти процесса.
+
+Активные шаблоны загружаются одним запросом, компилируются и группируются
+по slug категории. Кэш сбрасывается сигналами post_save/post_delete
+PostTemplate и PostCategory, так что правки в админке видны сразу,
+а генерация не делает запрос на каждый пост.
+
+Сигналы работают только внутри процесса: другие воркеры и отдельный
+планировщик подхватят изменения не позже чем через TEMPLATE_CACHE_TTL.
+"""
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from .template_renderer import CompiledTemplate, TemplateError, compile_template
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoredTemplate:
+    """Скомпилированный PostTemplate"""
+    id: int
+    name: str
+    renderer: CompiledTemplate
+    hashtags: Tuple[str, ...]
+    ai_prompt: str
+
+
+_cache: Optional[Dict[str, Tuple[StoredTemplate, ...]]] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def _parse_hashtags(text: str) -> Tuple[str, ...]:
+    """Хештеги через пробел, запятую или с новой строки; '#' добавляется при необходимости"""
+    tags = []
+    for tag in re.split(r'[\s,]+', text or ''):
+        if tag:
+            tag = tag if tag.startswith('#') else f'#{tag}'
+            if tag not in tags:
+                tags.append(tag)
+    return tuple(tags)
+
+
+def _load() -> Dict[str, Tuple[StoredTemplate, ...]]:
+    from apps.posts.models import PostTemplate
+
+    grouped: Dict[str, list] = {}
+    for template in PostTemplate.objects.filter(is_active=True).select_related('category').order_by('id'):
+        try:
+            renderer = compile_template(template.template_text, template.name)
+        except TemplateError as e:
+            # Шаблон сохранён в обход валидации - пропускаем, остальные работают
+            logger.warning(f"Skipping PostTemplate {template.id}: {e}")
+            continue
+
+        grouped.setdefault(template.category.slug, []).append(StoredTemplate(
+            id=template.id,
+            name=template.name,
+            renderer=renderer,
+            hashtags=_parse_hashtags(template.hashtags),
+            ai_prompt=template.ai_prompt,
+        ))
+
+    return {slug: tuple(items) for slug, items in grouped.items()}
+
+
+def get_db_templates() -> Dict[str, Tuple[StoredTemplate, ...]]:
+    """Активные шаблоны из БД по slug категории (из кэша)"""
+    global _cache, _loaded_at
+
+    cache = _cache
+    if cache is not None and time.monotonic() - _loaded_at < settings.TEMPLATE_CACHE_TTL:
+        return cache
+
+    with _lock:
+        if _cache is None or time.monotonic() - _loaded_at >= settings.TEMPLATE_CACHE_TTL:
+            try:
+                _cache = _load()
+            except Exception as e:
+                # Нет таблицы (до миграций) или БД недоступна - работаем на встроенных шаблонах
+                logger.warning(f"Could not load post templates: {e}")
+                _cache = {}
+            _loaded_at = time.monotonic()
+        return _cache
+
+
+def get_category_templates(category: str) -> Tuple[StoredTemplate, ...]:
+    """Шаблоны категории из БД (пустой кортеж - использовать встроенные)"""
+    return get_db_templates().get(category, ())
+
+
+def invalidate_template_cache(**kwargs):
+    """Сбросить кэш (receiver для сигналов моделей)"""
+    global _cache
+    _cache = None
@@ -0,0 +1,173 @@
+"""
+Thumbnails - превью изображений для списков (посты, проекты).
+
+Превью строятся в пуле потоков, а не во время запроса: страница списка
+берёт готовое превью или, пока его нет, показывает заглушку и ставит
+сборку в очередь. Сборка запускается и сразу после сохранения поста или
+проекта с картинкой, так что обычно к первому показу превью готово.
+
+Файлы - MEDIA_ROOT/thumbs/<xx>/<sha256>-<размер>.webp и .jpg, имя по
+содержимому оригинала: одинаковые картинки делят превью, а содержимое
+файла по имени никогда не меняется, поэтому отдаются с
+Cache-Control: immutable (views.serve_thumbnail).
+
+Какому оригиналу соответствует хеш, записано в MEDIA_ROOT/thumbs/src/
+по ключу "путь + размер + время изменения"; в запросе - только stat
+и чтение этой записи (потом - из памяти процесса).
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from .image_renditions import load_image, save_atomic
+
+logger = logging.getLogger(__name__)
+
+THUMBS_DIR = 'thumbs'
+# Форматы превью: WebP для браузеров, которые его понимают, JPEG - для остальных
+FORMATS = (
+    ('webp', 'WEBP', {'quality': 75, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending = set()
+_known: Dict[str, str] = {}  # ключ оригинала -> sha256 содержимого
+_lock = threading.Lock()
+
+
+def thumbs_root() -> Path:
+    return Path(settings.MEDIA_ROOT) / THUMBS_DIR
+
+
+def _source_key(source: str) -> str:
+    stat = os.stat(source)
+    return hashlib.sha1(f'{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest()
+
+
+def _relative_name(digest: str, extension: str) -> str:
+    return f'{THUMBS_DIR}/{digest[:2]}/{digest}-{settings.THUMBNAIL_SIZE}.{extension}'
+
+
+def _file_digest(source: str) -> str:
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_thumbnail(source: str) -> str:
+    """
+    Построить превью оригинала (если их ещё нет) и записать соответствие.
+
+    Returns:
+        sha256 содержимого оригинала
+    """
+    key = _source_key(source)
+    digest = _file_digest(source)
+    root = Path(settings.MEDIA_ROOT)
+
+    targets = [(root / _relative_name(digest, ext), fmt, options) for ext, fmt, options in FORMATS]
+    if not all(target.exists() for target, _, _ in targets):
+        image = load_image(source, settings.THUMBNAIL_SIZE)
+        for target, image_format, options in targets:
+            save_atomic(image, target, image_format, **options)
+
+    record = thumbs_root() / 'src' / key[:2] / key
+    record.parent.mkdir(parents=True, exist_ok=True)
+    record.write_text(digest)
+
+    with _lock:
+        _known[key] = digest
+    return digest
+
+
+def _build(source: str, key: str):
+    try:
+        build_thumbnail(source)
+    except Exception as e:
+        logger.warning(f"Thumbnail failed for {source}: {e}")
+    finally:
+        with _lock:
+            _pending.discard(key)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnail'
+                )
+    return _executor
+
+
+def request_thumbnail(source: str, key: str = None) -> bool:
+    """Поставить сборку превью в очередь (повторно одно и то же не ставится)"""
+    key = key or _source_key(source)
+    with _lock:
+        if key in _pending:
+            return False
+        _pending.add(key)
+    _get_executor().submit(_build, source, key)
+    return True
+
+
+def _lookup(source: str) -> Tuple[str, Optional[str]]:
+    """(ключ оригинала, sha256 или None, если превью ещё не строилось)"""
+    key = _source_key(source)
+    digest = _known.get(key)
+    if digest is None:
+        record = thumbs_root() / 'src' / key[:2] / key
+        try:
+            digest = record.read_text().strip()
+        except OSError:
+            return key, None
+        with _lock:
+            _known[key] = digest
+    return key, digest
+
+
+def get_thumbnail_urls(field_file) -> Optional[Dict[str, str]]:
+    """
+    URL превью для поля ImageField: {'webp': ..., 'jpg': ...}.
+
+    Returns:
+        None, если изображения нет или превью ещё строится (сборка поставлена в очередь)
+    """
+    if not field_file:
+        return None
+    try:
+        source = field_file.path
+        key, digest = _lookup(source)
+    except (OSError, ValueError, NotImplementedError):
+        return None
+
+    if digest is None:
+        request_thumbnail(source, key)
+        return None
+    return {ext: settings.MEDIA_URL + _relative_name(digest, ext) for ext, _, _ in FORMATS}
+
+
+def warm_thumbnail(sender, instance, **kwargs):
+    """Receiver post_save: собрать превью сразу после загрузки картинки"""
+    from django.db import transaction
+
+    for field in ('image', 'main_image'):
+        field_file = getattr(instance, field, None)
+        if field_file:
+            try:
+                source = field_file.path
+                if _lookup(source)[1] is None:
+                    transaction.on_commit(lambda source=source: request_thumbnail(source))
+            except (OSError, ValueError, NotImplementedError):
+                pass
+
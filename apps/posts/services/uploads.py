@@ -0,0 +1,154 @@
+"""
+Uploads - приём загружаемых изображений.
+
+HashingUploadHandler (settings.FILE_UPLOAD_HANDLERS) пишет файл на диск
+кусками по мере приёма и по дороге считает SHA-256, так что память не
+зависит от размера файла. Лимиты проверяются сразу: размер - на каждом
+куске, число пикселей - как только пришёл заголовок изображения (без
+декодирования). Отклонённый файл пропускается, причина - в
+request.upload_errors.
+
+store_upload() кладёт файл в MEDIA_ROOT/uploads/<xx>/<sha256>.<ext>:
+одинаковые картинки хранятся в одном файле, повторная загрузка ничего
+не пишет.
+"""
+import hashlib
+import io
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+
+logger = logging.getLogger(__name__)
+
+UPLOADS_DIR = 'uploads'
+# Сколько начала файла держать в памяти в поисках заголовка (EXIF, ICC-профили)
+HEADER_LIMIT = 1024 * 1024
+EXTENSIONS = {'JPEG': 'jpg', 'MPO': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+
+
+def probe_image(head: bytes) -> Optional[tuple]:
+    """
+    Формат и размер изображения по началу файла (без декодирования).
+
+    Returns:
+        (формат PIL, ширина, высота) или None, если заголовок ещё не весь
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(head)) as image:
+            return image.format, image.width, image.height
+    except Image.DecompressionBombError:
+        # Размер в заголовке уже известен и заведомо больше лимита
+        return None, 1 << 31, 1
+    except Exception:
+        return None
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Потоковая запись во временный файл с SHA-256 и ранними лимитами"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+        self.image_format = None
+
+        if self.content_length and self.content_length > settings.UPLOAD_MAX_SIZE:
+            self.reject(f'файл больше {settings.UPLOAD_MAX_SIZE // (1024 * 1024)} МБ')
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.UPLOAD_MAX_SIZE:
+            self.reject(f'файл больше {settings.UPLOAD_MAX_SIZE // (1024 * 1024)} МБ')
+
+        if self.image_format is None:
+            self.head += raw_data
+            self.check_header(final=len(self.head) >= HEADER_LIMIT)
+
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.image_format is None:
+            try:
+                self.check_header(final=True)
+            except SkipFile:
+                self.file.close()
+                return None
+
+        uploaded = super().file_complete(file_size)
+        uploaded.sha256 = self.digest.hexdigest()
+        uploaded.extension = EXTENSIONS.get(self.image_format, self.image_format.lower())
+        return uploaded
+
+    def check_header(self, final: bool):
+        """Проверить заголовок изображения; final - больше данных для заголовка не будет"""
+        probed = probe_image(self.head)
+        if probed is None:
+            if final:
+                self.reject('файл не является изображением')
+            return
+
+        image_format, width, height = probed
+        if width * height > settings.UPLOAD_MAX_PIXELS:
+            self.reject(f'изображение больше {settings.UPLOAD_MAX_PIXELS // 1_000_000} Мпикс')
+        self.image_format = image_format
+        self.head = b''
+
+    def reject(self, reason: str):
+        """Пропустить файл и запомнить причину для представления"""
+        logger.warning(f"Upload {self.file_name!r} rejected: {reason}")
+        if not hasattr(self.request, 'upload_errors'):
+            self.request.upload_errors = {}
+        self.request.upload_errors[self.field_name] = reason
+        self.head = b''
+        raise SkipFile()
+
+
+def _file_digest(uploaded) -> str:
+    digest = hashlib.sha256()
+    for chunk in uploaded.chunks():
+        digest.update(chunk)
+    uploaded.seek(0)
+    return digest.hexdigest()
+
+
+def store_upload(uploaded) -> str:
+    """
+    Сохранить загруженный файл с дедупликацией по содержимому.
+
+    Returns:
+        Имя файла в хранилище (для ImageField)
+    """
+    digest = getattr(uploaded, 'sha256', None) or _file_digest(uploaded)
+    extension = getattr(uploaded, 'extension', None) or uploaded.name.rsplit('.', 1)[-1].lower()
+    name = f'{UPLOADS_DIR}/{digest[:2]}/{digest}.{extension}'
+
+    if default_storage.exists(name):
+        logger.info(f"Upload {uploaded.name!r} is a duplicate of {name}")
+        return name
+    # Временный файл переносится на место, а не копируется
+    return default_storage.save(name, uploaded)
+
+
+def stored_upload(request, field: str) -> Optional[str]:
+    """
+    Сохранить файл из request.FILES[field].
+
+    Returns:
+        Имя файла в хранилище; None, если файла нет или он отклонён
+        (причина - в messages)
+    """
+    error = getattr(request, 'upload_errors', {}).get(field)
+    if error:
+        messages.error(request, f'Изображение не загружено: {error}')
+        return None
+    if field not in request.FILES:
+        return None
+    return store_upload(request.FILES[field])
@@ -0,0 +1,25 @@
+"""
+Превью изображений в шаблонах:
+
+    {% load thumbnails %}
+    {% thumbnail post.image post.title %}
+"""
+from django import template
+from django.utils.html import format_html
+
+from apps.posts.services.thumbnails import get_thumbnail_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail(field_file, alt=''):
+    """<picture> с WebP и JPEG; пока превью строится - заглушка, не оригинал"""
+    urls = get_thumbnail_urls(field_file)
+    if urls is None:
+        return format_html('<div class="thumbnail-pending" title="{}"></div>', alt)
+    return format_html(
+        '<picture><source srcset="{}" type="image/webp">'
+        '<img src="{}" alt="{}" loading="lazy" decoding="async"></picture>',
+        urls['webp'], urls['jpg'], alt
+    )
@@ -9,19 +9,27 @@ from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST, require_GET
 from django.utils import timezone
+from django.core.paginator import Paginator
 from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
 
 from .models import Post, Platform, PostCategory, PostTemplate, Publication, ProjectData, ScheduleSlot
 from .services.content_generator import ContentGenerator
+from .services.uploads import stored_upload
+
+# Постов на странице списка - страница стоит одинаково при любом размере базы
+POSTS_PER_PAGE = 24
 
 
 def dashboard(request):
     """Главная страница - дашборд"""
-    # Статистика
-    total_posts = Post.objects.count()
-    published_posts = Post.objects.filter(status='published').count()
-    scheduled_posts = Post.objects.filter(status='scheduled').count()
-    failed_posts = Post.objects.filter(status='failed').count()
+    # Статистика - одним запросом
+    stats = Post.objects.aggregate(
+        total=Count('id'),
+        published=Count('id', filter=Q(status='published')),
+        scheduled=Count('id', filter=Q(status='scheduled')),
+        failed=Count('id', filter=Q(status='failed')),
+    )
     
     # Последние публикации
     recent_publications = Publication.objects.select_related(
@@ -40,26 +48,29 @@ def dashboard(request):
     # Активные платформы
     platforms = Platform.objects.filter(is_active=True)
     
-    # Статистика по дням (последние 7 дней)
-    week_ago = timezone.now() - timedelta(days=7)
+    # Статистика по дням (последние 7 дней) - группировка по дате в БД
+    today = timezone.localdate()
+    week_start = today - timedelta(days=6)
+    counts = dict(
+        Publication.objects.filter(status='success', published_at__date__gte=week_start)
+        .annotate(day=TruncDate('published_at'))
+        .order_by()
+        .values_list('day')
+        .annotate(Count('id'))
+    )
     daily_stats = []
-    for i in range(7):
-        day = timezone.now() - timedelta(days=i)
-        count = Publication.objects.filter(
-            published_at__date=day.date(),
-            status='success'
-        ).count()
+    for i in range(6, -1, -1):
+        day = today - timedelta(days=i)
         daily_stats.append({
             'date': day.strftime('%d.%m'),
-            'count': count
+            'count': counts.get(day, 0)
         })
-    daily_stats.reverse()
     
     context = {
-        'total_posts': total_posts,
-        'published_posts': published_posts,
-        'scheduled_posts': scheduled_posts,
-        'failed_posts': failed_posts,
+        'total_posts': stats['total'],
+        'published_posts': stats['published'],
+        'scheduled_posts': stats['scheduled'],
+        'failed_posts': stats['failed'],
         'recent_publications': recent_publications,
         'upcoming_posts': upcoming_posts,
         'pending_posts': pending_posts,
@@ -83,11 +94,13 @@ def post_list(request):
         posts = posts.filter(category__slug=category_filter)
     
     posts = posts.order_by('-created_at')
+    page_obj = Paginator(posts, POSTS_PER_PAGE).get_page(request.GET.get('page'))
     
     categories = PostCategory.objects.all()
     
     context = {
-        'posts': posts,
+        'posts': page_obj,
+        'page_obj': page_obj,
         'categories': categories,
         'status_filter': status_filter,
         'category_filter': category_filter,
@@ -128,8 +141,9 @@ def post_create(request):
             post.save()
         
         # Загружаем изображение
-        if 'image' in request.FILES:
-            post.image = request.FILES['image']
+        image = stored_upload(request, 'image')
+        if image:
+            post.image = image
             post.save()
         
         messages.success(request, f'Пост "{post.title}" успешно создан!')
@@ -151,7 +165,7 @@ def post_create(request):
 
 def post_detail(request, post_id):
     """Детальная страница поста"""
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.select_related('category'), id=post_id)
     publications = post.publications.select_related('platform').order_by('-published_at')
     
     context = {
@@ -184,8 +198,9 @@ def post_edit(request, post_id):
         if scheduled_time:
             post.scheduled_time = datetime.fromisoformat(scheduled_time)
         
-        if 'image' in request.FILES:
-            post.image = request.FILES['image']
+        image = stored_upload(request, 'image')
+        if image:
+            post.image = image
         
         post.save()
         messages.success(request, 'Пост успешно обновлён!')
@@ -359,8 +374,9 @@ def project_create(request):
             description=request.POST.get('description', ''),
         )
         
-        if 'main_image' in request.FILES:
-            project.main_image = request.FILES['main_image']
+        main_image = stored_upload(request, 'main_image')
+        if main_image:
+            project.main_image = main_image
             project.save()
         
         messages.success(request, f'Проект "{project.title}" создан!')
@@ -384,7 +400,7 @@ def project_create(request):
 def settings_page(request):
     """Страница настроек"""
     platforms = Platform.objects.all()
-    schedule_slots = ScheduleSlot.objects.order_by('day_of_week', 'time')
+    schedule_slots = ScheduleSlot.objects.prefetch_related('platforms').order_by('day_of_week', 'time')
     
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -428,3 +444,14 @@ def settings_page(request):
     }
     
     return render(request, 'posts/settings.html', context)
+
+
+@require_GET
+def serve_thumbnail(request, path):
+    """Превью для списков: имя файла по содержимому, поэтому кэшируется навсегда"""
+    from django.views.static import serve
+    from .services.thumbnails import thumbs_root
+    
+    response = serve(request, path, document_root=thumbs_root())
+    response['Cache-Control'] = f'public, max-age={365 * 24 * 3600}, immutable'
+    return response
@@ -14,6 +14,9 @@ class BasePublisher(ABC):
     """
     
     platform_name: str = "base"
+    # Вариант изображения из apps.posts.services.image_renditions.RENDITIONS
+    # (None - отправлять оригинал)
+    rendition: Optional[str] = None
     
     def __init__(self, token: str, channel_id: str):
         self.token = token
@@ -60,6 +63,21 @@ class BasePublisher(ABC):
         """
         pass
     
+    def prepare_image(self, image_path: Optional[str]) -> Optional[str]:
+        """
+        Изображение для отправки: уменьшенный вариант под платформу.
+        Строится один раз и берётся из кэша при следующих публикациях.
+        """
+        if not image_path or not self.rendition:
+            return image_path
+        from apps.posts.services.image_renditions import get_rendition
+        return get_rendition(image_path, self.rendition)
+    
+    def stage(self, name: str):
+        """Замер этапа публикации (format, media, api) - см. apps/publishers/metrics.py"""
+        from .metrics import stage
+        return stage(self.platform_name, name)
+    
     def format_text(self, text: str) -> str:
         """
         Форматирование текста под платформу.
@@ -171,10 +171,15 @@ def publish_post(post) -> List[Dict[str, Any]]:
         Список результатов публикации
     """
     from apps.posts.models import Publication
+    from config.metrics import timed
+    from .metrics import PUBLICATIONS_TOTAL, PUBLISH_SECONDS, stage
     
     results = []
     
-    for platform in post.platforms.filter(is_active=True):
+    with stage('all', 'db_fetch'):
+        platforms = list(post.platforms.filter(is_active=True))
+    
+    for platform in platforms:
         # Создаём публикатор
         if platform.name == 'telegram':
             publisher = TelegramPublisher(platform.api_token, platform.channel_id)
@@ -192,29 +197,36 @@ def publish_post(post) -> List[Dict[str, Any]]:
             image_path = post.image.path
         
         # Публикуем
-        result = publisher.publish(text, image_path)
+        with timed(PUBLISH_SECONDS, platform=platform.name):
+            result = publisher.publish(text, image_path)
+        PUBLICATIONS_TOTAL.labels(
+            platform=platform.name, result='success' if result['success'] else 'failed'
+        ).inc()
         
         # Сохраняем результат в БД
-        Publication.objects.create(
-            post=post,
-            platform=platform,
-            status='success' if result['success'] else 'failed',
-            external_id=result.get('external_id', ''),
-            external_url=result.get('external_url', ''),
-            error_message=result.get('error', '')
-        )
+        with stage(platform.name, 'db_write'):
+            Publication.objects.create(
+                post=post,
+                platform=platform,
+                status='success' if result['success'] else 'failed',
+                # Публикаторы возвращают None вместо пустых значений, а поля NOT NULL
+                external_id=result.get('external_id') or '',
+                external_url=result.get('external_url') or '',
+                error_message=result.get('error') or ''
+            )
         
         result['platform'] = platform.name
         results.append(result)
     
     # Обновляем статус поста
-    if all(r['success'] for r in results):
-        post.mark_as_published()
-    elif any(r['success'] for r in results):
-        post.status = 'published'  # Частично опубликован
-        post.save()
-    else:
-        post.status = 'failed'
-        post.save()
+    with stage('all', 'db_write'):
+        if all(r['success'] for r in results):
+            post.mark_as_published()
+        elif any(r['success'] for r in results):
+            post.status = 'published'  # Частично опубликован
+            post.save()
+        else:
+            post.status = 'failed'
+            post.save()
     
     return results
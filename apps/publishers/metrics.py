@@ -0,0 +1,34 @@
+"""
+Метрики публикации (эндпоинт /metrics/, см. config/metrics.py).
+
+Этапы (stage):
+- db_fetch - чтение поста и его платформ из БД;
+- format   - подготовка текста под платформу;
+- media    - вариант изображения и загрузка фото (VK - отдельный запрос);
+- api      - запрос публикации к API платформы;
+- db_write - запись Publication и статуса поста.
+
+Этапы, общие для всех платформ поста (db_fetch, статус поста), имеют
+platform="all".
+"""
+from prometheus_client import Counter, Histogram
+
+from config.metrics import DURATION_BUCKETS, timed
+
+PUBLISH_STAGE_SECONDS = Histogram(
+    'publish_stage_seconds', 'Длительность этапа публикации',
+    ['platform', 'stage'], buckets=DURATION_BUCKETS,
+)
+PUBLISH_SECONDS = Histogram(
+    'publish_seconds', 'Публикация на платформу целиком (без записи в БД)',
+    ['platform'], buckets=DURATION_BUCKETS,
+)
+PUBLICATIONS_TOTAL = Counter(
+    'publications', 'Публикации по платформе и результату (success / failed; error - исключение в задаче)',
+    ['platform', 'result'],
+)
+
+
+def stage(platform: str, name: str):
+    """Замер этапа публикации: with stage('vk', 'api'): ..."""
+    return timed(PUBLISH_STAGE_SECONDS, platform=platform, stage=name)
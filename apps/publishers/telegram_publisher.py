@@ -22,6 +22,7 @@ class TelegramPublisher(BasePublisher):
     """
     
     platform_name = "telegram"
+    rendition = "telegram"
     
     def __init__(self, token: str, channel_id: str):
         super().__init__(token, channel_id)
@@ -46,23 +47,28 @@ class TelegramPublisher(BasePublisher):
         from telegram.constants import ParseMode
         
         bot = self._get_bot()
-        formatted_text = self.format_text(text)
+        with self.stage('format'):
+            formatted_text = self.format_text(text)
+        with self.stage('media'):
+            image_path = self.prepare_image(image_path)
         
         try:
-            if image_path and Path(image_path).exists():
-                with open(image_path, 'rb') as photo:
-                    message = await bot.send_photo(
+            # Фото уходит в том же запросе, что и подпись - это этап api
+            with self.stage('api'):
+                if image_path and Path(image_path).exists():
+                    with open(image_path, 'rb') as photo:
+                        message = await bot.send_photo(
+                            chat_id=self.channel_id,
+                            photo=photo,
+                            caption=formatted_text,
+                            parse_mode=ParseMode.HTML
+                        )
+                else:
+                    message = await bot.send_message(
                         chat_id=self.channel_id,
-                        photo=photo,
-                        caption=formatted_text,
+                        text=formatted_text,
                         parse_mode=ParseMode.HTML
                     )
-            else:
-                message = await bot.send_message(
-                    chat_id=self.channel_id,
-                    text=formatted_text,
-                    parse_mode=ParseMode.HTML
-                )
             
             # Формируем URL поста
             channel_username = self.channel_id.replace('@', '')
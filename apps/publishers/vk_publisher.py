@@ -26,6 +26,7 @@ class VKPublisher(BasePublisher):
     """
     
     platform_name = "vk"
+    rendition = "vk"
     
     def __init__(self, token: str, channel_id: str):
         super().__init__(token, channel_id)
@@ -84,25 +85,29 @@ class VKPublisher(BasePublisher):
         """
         try:
             _, api = self._get_vk()
-            formatted_text = self.format_text(text)
+            with self.stage('format'):
+                formatted_text = self.format_text(text)
             
             # Подготавливаем attachments
             attachments = []
-            if image_path and Path(image_path).exists():
-                photo_attachment = self._upload_photo(image_path)
-                if photo_attachment:
-                    attachments.append(photo_attachment)
+            with self.stage('media'):
+                image_path = self.prepare_image(image_path)
+                if image_path and Path(image_path).exists():
+                    photo_attachment = self._upload_photo(image_path)
+                    if photo_attachment:
+                        attachments.append(photo_attachment)
             
             # Публикуем пост
             # owner_id для группы должен быть отрицательным
             owner_id = f"-{self.channel_id}" if not self.channel_id.startswith('-') else self.channel_id
             
-            post_result = api.wall.post(
-                owner_id=owner_id,
-                message=formatted_text,
-                attachments=','.join(attachments) if attachments else None,
-                from_group=1  # Публикация от имени группы
-            )
+            with self.stage('api'):
+                post_result = api.wall.post(
+                    owner_id=owner_id,
+                    message=formatted_text,
+                    attachments=','.join(attachments) if attachments else None,
+                    from_group=1  # Публикация от имени группы
+                )
             
             post_id = post_result.get('post_id')
             external_url = f"https://vk.com/wall{owner_id}_{post_id}"
@@ -6,8 +6,6 @@ class SchedulerConfig(AppConfig):
     name = 'apps.scheduler'
     verbose_name = 'Планировщик'
     
-    def ready(self):
-        """Запускаем планировщик при старте Django"""
-        # Импортируем здесь чтобы избежать circular imports
-        from .scheduler import start_scheduler
-        start_scheduler()
+    # Планировщик не запускается в ready(): иначе он стартует в migrate, shell
+    # и любой команде. Его запускает config/wsgi.py (если SCHEDULER_IN_PROCESS)
+    # или отдельный процесс manage.py run_scheduler.
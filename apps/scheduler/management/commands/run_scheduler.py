@@ -0,0 +1,49 @@
+"""
+Планировщик задач отдельным процессом.
+
+    python manage.py run_scheduler
+
+Веб-процессы при этом запускаются с SCHEDULER_IN_PROCESS=False, число
+параллельных задач - SCHEDULER_THREADS. Останавливается по SIGTERM /
+Ctrl+C, дожидаясь выполняющихся задач.
+"""
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scheduler.scheduler import get_scheduler, get_scheduler_status, start_scheduler, stop_scheduler
+
+
+class Command(BaseCommand):
+    help = 'Запустить планировщик задач (публикация по расписанию, очистка, обход сайта)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-wait', action='store_true',
+                            help='Выйти с ошибкой, если планировщик уже работает в другом процессе')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        if settings.PROMETHEUS_MULTIPROC_DIR:
+            from config.metrics import cleanup_dead_processes
+            cleanup_dead_processes(settings.PROMETHEUS_MULTIPROC_DIR)
+
+        start_scheduler()
+        if not get_scheduler().running:
+            pid = get_scheduler_status()['pid']
+            if options['no_wait']:
+                raise CommandError(f'Планировщик уже работает в процессе {pid}')
+            # start_scheduler() ждёт блокировку в фоне и запустит планировщик сам
+            self.stdout.write(f'Планировщик работает в процессе {pid}, ждём его остановки')
+        else:
+            for job in get_scheduler_status()['jobs']:
+                self.stdout.write(f"  {job['name']}: {job['trigger']}")
+            self.stdout.write(self.style.SUCCESS('Планировщик запущен'))
+
+        stop.wait()
+        self.stdout.write('Останавливаем планировщик...')
+        stop_scheduler(wait=True)
@@ -0,0 +1,120 @@
+"""
+Метрики планировщика и очереди постов (эндпоинт /metrics/, см. config/metrics.py).
+
+Задачи (scheduler_*) пишет процесс, где работает планировщик; метка job -
+id задачи без номера поста/проекта (publish_post_42 -> publish_post), чтобы
+число рядов не росло с каждым постом.
+
+- scheduler_job_lag_seconds   - старт задачи в потоке минус время по расписанию
+  (ожидание свободного потока входит);
+- scheduler_job_seconds       - длительность задачи;
+- scheduler_jobs_total        - запуски по результату (success / error);
+- scheduler_misfires_total    - пропуски: grace_time (опоздание больше
+  misfire_grace_time) и max_instances (прошлый запуск ещё идёт);
+- scheduler_threads, scheduler_threads_busy, scheduler_jobs_queued - размер
+  пула, занятые потоки и задачи, ждущие свободного потока;
+- post_publish_lag_seconds    - начало публикации минус Post.scheduled_time.
+
+Посты по статусам и просроченная очередь (posts, posts_overdue,
+posts_overdue_oldest_seconds) считаются запросом к БД в момент опроса -
+PostQueueCollector.
+"""
+import re
+import threading
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+from config.metrics import DURATION_BUCKETS
+
+# Задержка старта: от мгновенного до нескольких минут (misfire_grace_time - 5 минут)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+SCHEDULER_JOB_LAG_SECONDS = Histogram(
+    'scheduler_job_lag_seconds', 'Опоздание старта задачи относительно расписания',
+    ['job'], buckets=LAG_BUCKETS,
+)
+SCHEDULER_JOB_SECONDS = Histogram(
+    'scheduler_job_seconds', 'Длительность задачи планировщика',
+    ['job'], buckets=DURATION_BUCKETS,
+)
+SCHEDULER_JOBS_TOTAL = Counter(
+    'scheduler_jobs', 'Запуски задач по результату (success / error)',
+    ['job', 'result'],
+)
+SCHEDULER_MISFIRES_TOTAL = Counter(
+    'scheduler_misfires', 'Пропущенные запуски (grace_time / max_instances)',
+    ['job', 'reason'],
+)
+SCHEDULER_THREADS = Gauge(
+    'scheduler_threads', 'Потоков в пуле планировщика', multiprocess_mode='livesum',
+)
+SCHEDULER_THREADS_BUSY = Gauge(
+    'scheduler_threads_busy', 'Потоков, выполняющих задачу', multiprocess_mode='livesum',
+)
+SCHEDULER_JOBS_QUEUED = Gauge(
+    'scheduler_jobs_queued', 'Задач, ждущих свободного потока', multiprocess_mode='livesum',
+)
+POST_PUBLISH_LAG_SECONDS = Histogram(
+    'post_publish_lag_seconds', 'Начало публикации минус запланированное время поста',
+    buckets=LAG_BUCKETS,
+)
+
+_NUMBERED_ID_RE = re.compile(r'(_\d+)+$')
+
+_job_state = threading.local()
+
+
+def job_label(job_id: str) -> str:
+    """Метка job: id задачи без номеров (publish_post_42 -> publish_post)"""
+    return _NUMBERED_ID_RE.sub('', job_id)
+
+
+def job_failed():
+    """
+    Отметить выполняющуюся задачу как неудачную.
+
+    Задачи сами ловят исключения и пишут их в лог, APScheduler видит
+    успешное завершение - этот вызов из блока except переводит запуск
+    в scheduler_jobs_total{result="error"}.
+    """
+    _job_state.failed = True
+
+
+def pop_job_failed() -> bool:
+    """Была ли задача в этом потоке отмечена job_failed() (флаг сбрасывается)"""
+    failed = getattr(_job_state, 'failed', False)
+    _job_state.failed = False
+    return failed
+
+
+class PostQueueCollector:
+    """Посты по статусам и просроченные запланированные посты (запрос к БД при опросе)"""
+
+    def describe(self):
+        # Без describe() регистрация в CollectorRegistry вызвала бы collect() - запрос к БД
+        return []
+
+    def collect(self):
+        from django.db.models import Count, Min
+        from django.utils import timezone
+        from apps.posts.models import Post
+
+        counts = dict(Post.objects.order_by().values_list('status').annotate(Count('id')))
+        by_status = GaugeMetricFamily('posts', 'Посты по статусу', labels=['status'])
+        for status, _ in Post.STATUS_CHOICES:
+            by_status.add_metric([status], counts.get(status, 0))
+        yield by_status
+
+        now = timezone.now()
+        overdue = Post.objects.filter(status='scheduled', scheduled_time__lte=now).aggregate(
+            count=Count('id'), oldest=Min('scheduled_time'),
+        )
+        yield GaugeMetricFamily(
+            'posts_overdue', 'Запланированные посты, время публикации которых прошло',
+            value=overdue['count'],
+        )
+        yield GaugeMetricFamily(
+            'posts_overdue_oldest_seconds', 'Насколько просрочен самый старый из них',
+            value=(now - overdue['oldest']).total_seconds() if overdue['oldest'] else 0,
+        )
@@ -1,22 +1,104 @@
 """
 Scheduler - планировщик задач на APScheduler.
 Бесплатная альтернатива Celery + Redis.
+
+В бою планировщик работает отдельным процессом (manage.py run_scheduler,
+SCHEDULER_IN_PROCESS=False): у задач публикации свои потоки и соединения,
+а веб-процессы ничего не хранят и масштабируются. Для разработки он
+по-прежнему может работать внутри веб-сервера (config/wsgi.py).
+
+Задачи должны выполняться один раз: планировщик запускает только процесс,
+захвативший блокировку SCHEDULER_LOCK_FILE. Остальные (воркеры gunicorn)
+ждут в фоне и подхватывают работу, если владелец завершится.
 """
 import logging
+import os
+import threading
+import time
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional
 
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from apscheduler.executors.base import run_job
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
 
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
 # Глобальный планировщик
 _scheduler: Optional[BackgroundScheduler] = None
 _is_started = False
+_lock_file = None
+_waiting = False
+
+
+class InstrumentedThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor с метриками (apps/scheduler/metrics.py): опоздание
+    старта, длительность, результат задачи и занятость потоков.
+    """
+    
+    def __init__(self, max_workers=10, pool_kwargs=None):
+        super().__init__(max_workers, pool_kwargs)
+        self._max_workers = max_workers
+    
+    def start(self, scheduler, alias):
+        super().start(scheduler, alias)
+        metrics.SCHEDULER_THREADS.set(self._max_workers)
+    
+    def shutdown(self, wait=True):
+        super().shutdown(wait)
+        metrics.SCHEDULER_THREADS.set(0)
+    
+    def _do_submit_job(self, job, run_times):
+        metrics.SCHEDULER_JOBS_QUEUED.inc()
+        
+        def callback(f):
+            exc, tb = f.exception(), getattr(f.exception(), '__traceback__', None)
+            if exc:
+                self._run_job_error(job.id, exc, tb)
+            else:
+                self._run_job_success(job.id, f.result())
+        
+        f = self._pool.submit(self._run_job, job, job._jobstore_alias, run_times, self._logger.name)
+        f.add_done_callback(callback)
+    
+    @staticmethod
+    def _run_job(job, jobstore_alias, run_times, logger_name):
+        label = metrics.job_label(job.id)
+        metrics.SCHEDULER_JOBS_QUEUED.dec()
+        metrics.SCHEDULER_THREADS_BUSY.inc()
+        # Для объединённых (coalesce) запусков - опоздание последнего из них
+        lag = (datetime.now(run_times[-1].tzinfo) - run_times[-1]).total_seconds()
+        metrics.SCHEDULER_JOB_LAG_SECONDS.labels(job=label).observe(max(lag, 0))
+        metrics.pop_job_failed()
+        started = time.perf_counter()
+        try:
+            events = run_job(job, jobstore_alias, run_times, logger_name)
+        finally:
+            metrics.SCHEDULER_THREADS_BUSY.dec()
+        
+        failed = metrics.pop_job_failed()
+        for event in events:
+            if event.code == EVENT_JOB_MISSED:
+                metrics.SCHEDULER_MISFIRES_TOTAL.labels(job=label, reason='grace_time').inc()
+                continue
+            metrics.SCHEDULER_JOB_SECONDS.labels(job=label).observe(time.perf_counter() - started)
+            result = 'error' if failed or event.code == EVENT_JOB_ERROR else 'success'
+            metrics.SCHEDULER_JOBS_TOTAL.labels(job=label, result=result).inc()
+        return events
+
+
+def _on_max_instances(event):
+    """Запуск пропущен: предыдущий ещё выполняется (max_instances)"""
+    metrics.SCHEDULER_MISFIRES_TOTAL.labels(job=metrics.job_label(event.job_id), reason='max_instances').inc()
 
 
 def get_scheduler() -> BackgroundScheduler:
@@ -27,8 +109,9 @@ def get_scheduler() -> BackgroundScheduler:
         jobstores = {
             'default': MemoryJobStore()
         }
+        from django.conf import settings
         executors = {
-            'default': ThreadPoolExecutor(10)
+            'default': InstrumentedThreadPoolExecutor(settings.SCHEDULER_THREADS)
         }
         job_defaults = {
             'coalesce': True,  # Объединять пропущенные запуски
@@ -42,17 +125,86 @@ def get_scheduler() -> BackgroundScheduler:
             job_defaults=job_defaults,
             timezone='Europe/Moscow'
         )
+        _scheduler.add_listener(_on_max_instances, EVENT_JOB_MAX_INSTANCES)
     
     return _scheduler
 
 
+def _acquire_lock() -> bool:
+    """
+    Захватить блокировку планировщика (не ждёт).
+    
+    Returns:
+        True если этот процесс - владелец планировщика
+    """
+    global _lock_file
+    
+    if _lock_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        # Windows: runserver без gunicorn, процесс один
+        return True
+    
+    from django.conf import settings
+    path = Path(settings.SCHEDULER_LOCK_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, 'a+')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    
+    # Блокировка снимается ОС при завершении процесса
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    _lock_file = handle
+    return True
+
+
+def _lock_owner() -> Optional[int]:
+    """PID процесса, в котором работает планировщик; None - блокировку никто не держит"""
+    from django.conf import settings
+    try:
+        import fcntl
+        with open(settings.SCHEDULER_LOCK_FILE) as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except OSError:
+                return int(handle.read().strip())
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            return None
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def _wait_for_lock():
+    """Фоновый поток: запустить планировщик, когда освободится блокировка"""
+    from django.conf import settings
+    
+    while not _acquire_lock():
+        time.sleep(settings.SCHEDULER_LOCK_RETRY)
+    start_scheduler()
+
+
 def start_scheduler():
-    """Запустить планировщик"""
-    global _is_started
+    """Запустить планировщик (если в другом процессе он уже работает - ждать своей очереди)"""
+    global _is_started, _waiting
     
     if _is_started:
         return
     
+    if not _acquire_lock():
+        if not _waiting:
+            _waiting = True
+            threading.Thread(target=_wait_for_lock, name='scheduler-lock', daemon=True).start()
+            logger.info(f"Scheduler is running in process {_lock_owner()}, standing by")
+        return
+    
     scheduler = get_scheduler()
     
     # Добавляем основные задачи
@@ -84,6 +236,17 @@ def start_scheduler():
         replace_existing=True
     )
     
+    # Импорт проектов с сайта компании
+    from django.conf import settings
+    if settings.COMPANY_SITE_URL and settings.CRAWLER_INTERVAL_HOURS:
+        scheduler.add_job(
+            crawl_company_site,
+            IntervalTrigger(hours=settings.CRAWLER_INTERVAL_HOURS),
+            id='crawl_company_site',
+            name='Импорт проектов с сайта',
+            replace_existing=True
+        )
+    
     try:
         scheduler.start()
         _is_started = True
@@ -92,15 +255,24 @@ def start_scheduler():
         logger.error(f"Failed to start scheduler: {e}")
 
 
-def stop_scheduler():
-    """Остановить планировщик"""
-    global _is_started
+def stop_scheduler(wait: bool = False):
+    """
+    Остановить планировщик и отдать блокировку другому процессу.
+    
+    Args:
+        wait: Дождаться завершения выполняющихся задач
+    """
+    global _is_started, _lock_file
     
     scheduler = get_scheduler()
     if scheduler.running:
-        scheduler.shutdown(wait=False)
+        scheduler.shutdown(wait=wait)
         _is_started = False
         logger.info("Scheduler stopped")
+    
+    if _lock_file is not None:
+        _lock_file.close()
+        _lock_file = None
 
 
 def schedule_post(post, publish_time: datetime) -> str:
@@ -131,6 +303,33 @@ def schedule_post(post, publish_time: datetime) -> str:
     return job_id
 
 
+def queue_posts_from_projects(project_ids: list) -> str:
+    """
+    Поставить в очередь создание постов для проектов.
+    
+    Args:
+        project_ids: ID ProjectData
+        
+    Returns:
+        Job ID
+    """
+    scheduler = get_scheduler()
+    
+    job_id = f"posts_from_projects_{project_ids[0]}_{project_ids[-1]}"
+    
+    scheduler.add_job(
+        create_posts_from_projects,
+        DateTrigger(run_date=datetime.now(scheduler.timezone)),
+        args=[list(project_ids)],
+        id=job_id,
+        name=f'Посты из проектов ({len(project_ids)})',
+        replace_existing=True
+    )
+    
+    logger.info(f"Queued post creation for {len(project_ids)} projects")
+    return job_id
+
+
 def cancel_scheduled_post(post) -> bool:
     """
     Отменить запланированную публикацию.
@@ -183,12 +382,13 @@ def check_scheduled_posts():
             try:
                 publish_single_post(post.id)
             except Exception as e:
-                logger.error(f"Failed to publish post {post.id}: {e}")
+                logger.exception(f"Failed to publish post {post.id}: {e}")
                 post.status = 'failed'
                 post.save()
                 
     except Exception as e:
-        logger.error(f"check_scheduled_posts error: {e}")
+        logger.exception(f"check_scheduled_posts error: {e}")
+        metrics.job_failed()
 
 
 def publish_single_post(post_id: int):
@@ -207,13 +407,20 @@ def publish_single_post(post_id: int):
     try:
         from apps.posts.models import Post
         from apps.publishers.manager import publish_post
+        from apps.publishers.metrics import stage
+        from django.utils import timezone
         
-        post = Post.objects.get(id=post_id)
+        with stage('all', 'db_fetch'):
+            post = Post.objects.get(id=post_id)
         
         if post.status not in ('approved', 'scheduled'):
             logger.warning(f"Post {post_id} is not approved/scheduled, skipping")
             return
         
+        if post.scheduled_time:
+            lag = (timezone.now() - post.scheduled_time).total_seconds()
+            metrics.POST_PUBLISH_LAG_SECONDS.observe(max(lag, 0))
+        
         post.status = 'publishing'
         post.save()
         
@@ -223,7 +430,10 @@ def publish_single_post(post_id: int):
         logger.info(f"Published post {post_id}: {success_count}/{len(results)} platforms succeeded")
         
     except Exception as e:
-        logger.error(f"publish_single_post error for {post_id}: {e}")
+        logger.exception(f"publish_single_post error for {post_id}: {e}")
+        metrics.job_failed()
+        from apps.publishers.metrics import PUBLICATIONS_TOTAL
+        PUBLICATIONS_TOTAL.labels(platform='all', result='error').inc()
         try:
             from apps.posts.models import Post
             post = Post.objects.get(id=post_id)
@@ -233,6 +443,53 @@ def publish_single_post(post_id: int):
             pass
 
 
+def crawl_company_site():
+    """
+    Импорт проектов с сайта компании.
+    Новые проекты сами ставят в очередь создание постов.
+    """
+    try:
+        import django
+        django.setup()
+    except:
+        pass
+    
+    try:
+        from apps.posts.services.site_crawler import crawl_company_site as crawl
+        crawl(queue_posts=True)
+    except Exception as e:
+        logger.error(f"crawl_company_site error: {e}")
+        metrics.job_failed()
+
+
+def create_posts_from_projects(project_ids: list):
+    """
+    Создание постов из проектов, по которым поста ещё нет.
+    
+    Args:
+        project_ids: ID ProjectData
+    """
+    try:
+        import django
+        django.setup()
+    except:
+        pass
+    
+    try:
+        from apps.posts.models import ProjectData
+        from apps.posts.services.content_generator import ContentGenerator
+        
+        posts = ContentGenerator().create_posts_from_projects(
+            ProjectData.objects.filter(id__in=project_ids, is_published=False)
+        )
+        
+        logger.info(f"Created {len(posts)} posts from {len(project_ids)} projects")
+        
+    except Exception as e:
+        logger.error(f"create_posts_from_projects error: {e}")
+        metrics.job_failed()
+
+
 def cleanup_old_publications(days: int = 90):
     """
     Удаление старых записей о публикациях.
@@ -261,6 +518,7 @@ def cleanup_old_publications(days: int = 90):
             
     except Exception as e:
         logger.error(f"cleanup_old_publications error: {e}")
+        metrics.job_failed()
 
 
 def check_api_health():
@@ -288,17 +546,32 @@ def check_api_health():
                 
     except Exception as e:
         logger.error(f"check_api_health error: {e}")
+        metrics.job_failed()
 
 
 def get_scheduler_status() -> dict:
     """
     Получить статус планировщика.
     
+    Список задач есть только в процессе, где планировщик работает. Если он
+    в другом процессе (run_scheduler, другой воркер gunicorn), jobs и
+    job_count - None, а note поясняет, где смотреть задачи.
+    
     Returns:
         Dict со статусом и списком задач
     """
     scheduler = get_scheduler()
     
+    if not scheduler.running:
+        owner = _lock_owner()
+        return {
+            'running': owner is not None,
+            'pid': owner,
+            'job_count': None,
+            'jobs': None,
+            'note': f'Задачи выполняются в процессе {owner}' if owner else None,
+        }
+    
     jobs = []
     for job in scheduler.get_jobs():
         jobs.append({
@@ -309,7 +582,9 @@ def get_scheduler_status() -> dict:
         })
     
     return {
-        'running': scheduler.running,
+        'running': True,
+        'pid': os.getpid(),
         'job_count': len(jobs),
-        'jobs': jobs
+        'jobs': jobs,
+        'note': None,
     }
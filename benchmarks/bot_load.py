@@ -0,0 +1,177 @@
+"""
+Нагрузочный тест бота: N пользователей одновременно проходят /ai и /publish.
+
+Бот запускается в режиме webhook против фейковых Telegram и Mistral
+(benchmarks/fake_telegram.py, benchmarks/fake_mistral.py), сеть не нужна.
+
+Каждый пользователь без пауз отправляет /ai, нажимает «🏊 Новый проект» и
+присылает описание - это проверяет, что обновления одного чата идут по
+порядку. Затем публикует свой одобренный пост через /publish <id>.
+
+Запуск (сравнение последовательной и параллельной обработки):
+    python benchmarks/bot_load.py --users 100 --concurrency 1 32
+
+С --json результаты пишутся ещё и файлом (его читает benchmarks/suite.py).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from fake_mistral import FakeMistral
+from fake_telegram import BOT_DIR, FakeTelegram, start_bot, stop_bot
+
+WORKDIR = tempfile.mkdtemp(prefix="bot_load_")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bot.db"
+os.environ["STORAGE_BACKEND"] = "bot"
+sys.path.insert(0, str(BOT_DIR))
+
+from config import PostStatus  # noqa: E402
+from database import init_db, get_session, User  # noqa: E402
+from storage import get_storage  # noqa: E402
+
+CHANNEL_ID = "@load_test_channel"
+FIRST_USER_ID = 10_000
+
+
+def seed(users: int) -> dict:
+    """Создать админов (могут и генерировать, и публиковать) и по одобренному посту на каждого"""
+    init_db()
+    session = get_session()
+    try:
+        for i in range(users):
+            telegram_id = FIRST_USER_ID + i
+            if not session.query(User).filter(User.telegram_id == telegram_id).first():
+                session.add(User(telegram_id=telegram_id, full_name=f"User {i}",
+                                 role="admin", status="active"))
+        session.commit()
+        db_ids = {
+            user.telegram_id: user.id
+            for user in session.query(User).filter(User.telegram_id >= FIRST_USER_ID)
+        }
+    finally:
+        session.close()
+
+    storage = get_storage()
+    return {
+        telegram_id: storage.create_post(
+            content=f"Нагрузочный пост пользователя {telegram_id}",
+            author_id=db_ids[telegram_id],
+            status=PostStatus.APPROVED,
+            channels=["telegram"],
+        ).id
+        for telegram_id in range(FIRST_USER_ID, FIRST_USER_ID + users)
+    }
+
+
+async def user_session(fake: FakeTelegram, user_id: int, post_id: int, timeout: float) -> dict:
+    ai_done = fake.wait_for(
+        user_id,
+        lambda method, params: method == "sendMessage" and params.get("text", "").startswith("✨"),
+    )
+    started = time.perf_counter()
+    await fake.deliver(fake.command_update(user_id, "/ai"))
+    await fake.deliver(fake.callback_update(user_id, "ai_type:project"))
+    await fake.deliver(fake.message_update(user_id, "бетонный 8x4, подсветка"))
+    ai_at = await asyncio.wait_for(ai_done, timeout)
+
+    published = fake.wait_for(
+        user_id,
+        lambda method, params: method == "editMessageText" and "опубликован!" in params.get("text", ""),
+    )
+    publish_started = time.perf_counter()
+    await fake.deliver(fake.command_update(user_id, f"/publish {post_id}"))
+    publish_at = await asyncio.wait_for(published, timeout)
+
+    return {"ai": ai_at - started, "publish": publish_at - publish_started}
+
+
+def describe(name: str, values: list) -> str:
+    values = sorted(values)
+    p95 = values[max(0, int(len(values) * 0.95) - 1)]
+    return (f"  {name:<8} median {statistics.median(values) * 1000:7.0f} ms"
+            f"   p95 {p95 * 1000:7.0f} ms   max {values[-1] * 1000:7.0f} ms")
+
+
+async def run_once(args, concurrency: int):
+    post_ids = seed(args.users)
+
+    fake = FakeTelegram(latency=args.telegram_latency, error_rate=args.error_rate)
+    mistral = FakeMistral(latency=args.ai_latency, error_rate=args.error_rate)
+    await fake.start()
+    await mistral.start()
+
+    log_path = os.path.join(WORKDIR, f"bot_{concurrency}.log")
+    process = await start_bot(
+        fake, WORKDIR, log_path,
+        # База общая (посты и пользователи из seed), а состояние диалогов - своё
+        # у каждого прогона: иначе следующий начнёт с пользователями в AI_RESULT
+        PERSISTENCE_FILE=os.path.join(WORKDIR, f"conversations_{concurrency}.pickle"),
+        CONCURRENT_UPDATES=concurrency,
+        MISTRAL_API_KEY="fake",
+        MISTRAL_API_BASE=mistral.base_url,
+        TELEGRAM_CHANNEL_ID=CHANNEL_ID,
+    )
+
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(user_session(fake, user_id, post_id, args.timeout) for user_id, post_id in post_ids.items()),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        await stop_bot(process)
+        await mistral.stop()
+        await fake.stop()
+
+    ok = [r for r in results if isinstance(r, dict)]
+    failed = len(results) - len(ok)
+
+    print(f"\nCONCURRENT_UPDATES={concurrency}: {len(ok)}/{len(results)} users done in {elapsed:.1f}s"
+          + (f", {failed} failed/timed out" if failed else ""))
+    if ok:
+        print(describe("/ai", [r["ai"] for r in ok]))
+        print(describe("/publish", [r["publish"] for r in ok]))
+    print(f"  bot log: {log_path}")
+
+    return {
+        "concurrency": concurrency,
+        "users": len(results),
+        "failed": failed,
+        "seconds": elapsed,
+        "ai": sorted(r["ai"] for r in ok),
+        "publish": sorted(r["publish"] for r in ok),
+        "api_errors": fake.errors + mistral.errors,
+    }
+
+
+async def run(args):
+    print(f"{args.users} users, Telegram latency {args.telegram_latency * 1000:.0f} ms, "
+          f"AI latency {args.ai_latency * 1000:.0f} ms")
+    results = [await run_once(args, concurrency) for concurrency in args.concurrency]
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 32],
+                        help="значения CONCURRENT_UPDATES для сравнения")
+    parser.add_argument("--telegram-latency", type=float, default=0.02)
+    parser.add_argument("--ai-latency", type=float, default=0.3)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="доля ответов с ошибкой фейковых Telegram (отправка) и Mistral")
+    parser.add_argument("--json", help="записать результаты в файл JSON")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
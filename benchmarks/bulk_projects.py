@@ -0,0 +1,104 @@
+"""
+Создание постов из проектов: по одному (create_post_from_project) против
+пакетного пути (create_posts_from_projects).
+
+ИИ - фейковый Mistral (benchmarks/fake_mistral.py) с задержкой ответа,
+база - временная SQLite. Считаются время и число SQL-запросов.
+
+Запуск:
+    python benchmarks/bulk_projects.py --projects 100 --ai-latency 0.1
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from crawler_fixture import setup_django
+from fake_mistral import FakeMistral
+
+
+def start_fake_mistral(latency: float) -> FakeMistral:
+    """Фейковый ИИ в отдельном потоке со своим event loop"""
+    mistral = FakeMistral(latency=latency)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(mistral.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+    return mistral
+
+
+def make_projects(count: int) -> list:
+    from apps.posts.models import ProjectData
+    ProjectData.objects.all().delete()
+    return ProjectData.objects.bulk_create([
+        ProjectData(
+            title=f'Бассейн в коттедже №{i}',
+            pool_type='concrete',
+            size='8x4 м',
+            features='Противоток, подсветка',
+            location='Московская область',
+        )
+        for i in range(count)
+    ])
+
+
+def run(args):
+    from django.conf import settings
+    db_path = os.path.join(tempfile.mkdtemp(prefix='bulk_projects_'), 'db.sqlite3')
+    mistral = start_fake_mistral(args.ai_latency)
+    settings.MISTRAL_API_KEY = 'fake'
+    settings.MISTRAL_API_BASE = mistral.base_url
+    setup_django(db_path)
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from apps.posts.models import Post, ProjectData
+    from apps.posts.services.content_generator import ContentGenerator
+
+    generator = ContentGenerator()
+    print(f'{args.projects} projects, AI latency {args.ai_latency * 1000:.0f} ms')
+
+    # Как раньше в админке: по одному проекту, с save() каждого
+    make_projects(args.projects)
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        for project in ProjectData.objects.filter(is_published=False):
+            generator.create_post_from_project(project)
+            project.is_published = True
+            project.save()
+    print(f'  one by one: {time.perf_counter() - started:6.2f}s  {len(queries):5} queries')
+
+    Post.objects.all().delete()
+    make_projects(args.projects)
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        posts = generator.create_posts_from_projects(
+            ProjectData.objects.filter(is_published=False), max_workers=args.workers
+        )
+    print(f'  bulk:       {time.perf_counter() - started:6.2f}s  {len(queries):5} queries '
+          f'(workers={args.workers})')
+
+    assert len(posts) == args.projects
+    assert not ProjectData.objects.filter(is_published=False).exists()
+    assert Post.objects.filter(ai_generated=True).count() == args.projects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--ai-latency', type=float, default=0.1)
+    parser.add_argument('--workers', type=int, default=4)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Офлайн-проверка обхода сайта (apps/posts/services/site_crawler.py).
+
+Поднимает локальный HTTP-сервер с фикстурным сайтом (список проектов с
+пагинацией, страницы проектов с ETag/Last-Modified и задержкой ответа) и
+прогоняет SiteCrawler на временной SQLite-базе:
+
+1. первый обход - все проекты новые (bulk_create);
+2. повторный обход - все страницы отвечают 304;
+3. меняем часть страниц - обновляются только они (bulk_update).
+
+Запуск:
+    python benchmarks/crawler_fixture.py --projects 60 --latency 0.05 --workers 1 8
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+PAGE_SIZE = 20
+POOL_TYPES = ['Бетонный', 'Композитный', 'Каркасный', 'Крытый']
+
+
+class FixtureSite:
+    """Сайт с N проектами; version[i] меняет содержимое страницы проекта"""
+
+    def __init__(self, projects: int, latency: float):
+        self.projects = projects
+        self.latency = latency
+        self.versions = [0] * projects
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def listing(self, page: int) -> str:
+        start = (page - 1) * PAGE_SIZE
+        items = ''.join(
+            f'<li><a href="/projects/{i}/">Проект {i}</a></li>'
+            for i in range(start, min(start + PAGE_SIZE, self.projects))
+        )
+        next_link = f'<a rel="next" href="/projects/?page={page + 1}">Дальше</a>' \
+            if start + PAGE_SIZE < self.projects else ''
+        return f'<html><body><h1>Наши проекты</h1><ul>{items}</ul>{next_link}</body></html>'
+
+    def project(self, i: int) -> str:
+        version = self.versions[i]
+        return f"""<html><head>
+<title>Проект {i} | MOS-POOL</title>
+<meta name="description" content="Бассейн для загородного дома №{i}">
+<meta property="og:image" content="/media/projects/{i}/main.jpg">
+</head><body><main>
+<h1>Бассейн в коттедже №{i}</h1>
+<div class="project-description">Построили бассейн под ключ за {30 + i % 20} дней. Ревизия {version}.</div>
+<dl><dt>Тип бассейна</dt><dd>{POOL_TYPES[i % len(POOL_TYPES)]}</dd></dl>
+<dl><dt>Размер</dt><dd>{6 + i % 5}x{3 + i % 3} м</dd></dl>
+<dl><dt>Особенности</dt><dd>Противоток, подсветка</dd></dl>
+<dl><dt>Локация</dt><dd>Московская область</dd></dl>
+<div class="gallery"><img src="/media/projects/{i}/1.jpg"><img src="/media/projects/{i}/2.jpg"></div>
+</main></body></html>"""
+
+
+def make_handler(site: FixtureSite):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: bytes = b'', headers: dict = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with site._lock:
+                site.requests += 1
+            time.sleep(site.latency)
+
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split('/') if p]
+            if parts == ['projects']:
+                page = int(parse_qs(url.query).get('page', ['1'])[0])
+                return self._send(200, site.listing(page).encode(), {'Content-Type': 'text/html; charset=utf-8'})
+
+            if len(parts) == 2 and parts[0] == 'projects' and parts[1].isdigit() \
+                    and int(parts[1]) < site.projects:
+                i = int(parts[1])
+                body = site.project(i).encode()
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                headers = {
+                    'ETag': etag,
+                    'Last-Modified': formatdate(1_700_000_000 + site.versions[i] * 3600, usegmt=True),
+                    'Content-Type': 'text/html; charset=utf-8',
+                }
+                if self.headers.get('If-None-Match') == etag:
+                    with site._lock:
+                        site.not_modified += 1
+                    return self._send(304, headers=headers)
+                return self._send(200, body, headers)
+
+            self._send(404)
+
+    return Handler
+
+
+def setup_django(db_path: str):
+    settings.DATABASES['default']['NAME'] = db_path
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def run(args):
+    db_path = os.path.join(tempfile.mkdtemp(prefix='crawler_'), 'db.sqlite3')
+    setup_django(db_path)
+
+    from apps.posts.models import ProjectData
+    from apps.posts.services.site_crawler import SiteCrawler
+
+    site = FixtureSite(args.projects, args.latency)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(site))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    site_url = f'http://127.0.0.1:{server.server_address[1]}'
+    print(f'{args.projects} projects, {args.latency * 1000:.0f} ms per response, site {site_url}')
+
+    def crawl(label: str, workers: int):
+        site.requests = site.not_modified = 0
+        crawler = SiteCrawler(site_url=site_url, projects_path='/projects/', workers=workers)
+        started = time.perf_counter()
+        try:
+            result = crawler.crawl(queue_posts=False)
+        finally:
+            crawler.close()
+        elapsed = time.perf_counter() - started
+        print(f'  {label:<28} workers={workers:<3} {elapsed:6.2f}s  '
+              f'requests {site.requests:<4} 304 {site.not_modified:<4} | {result}')
+        return result
+
+    for workers in args.workers:
+        ProjectData.objects.all().delete()
+        site.versions = [0] * args.projects
+        print(f'\nworkers={workers}')
+        first = crawl('first crawl', workers)
+        assert len(first.created_ids) == args.projects, first
+        again = crawl('unchanged site', workers)
+        assert again.not_modified == args.projects and not again.created_ids, again
+
+        changed = max(1, args.projects // 10)
+        for i in range(changed):
+            site.versions[i] += 1
+        third = crawl(f'{changed} pages changed', workers)
+        assert len(third.updated_ids) == changed, third
+
+    sample = ProjectData.objects.order_by('id').first()
+    print(f'\nsample: {sample.title} | {sample.pool_type} | {sample.size} | '
+          f'{sample.location} | {len(sample.images)} images')
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=60)
+    parser.add_argument('--latency', type=float, default=0.05, help='задержка ответа сервера, секунды')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Фейковый Mistral API (OpenAI-совместимый /v1/chat/completions) для офлайн-тестов.
+
+Отвечает фиксированным постом с настраиваемой задержкой - как медленная
+генерация, но без сети и без расхода токенов. error_rate - доля ответов
+500 (клиент openai повторяет их сам, это видно по задержке).
+"""
+import asyncio
+import itertools
+import random
+import time
+
+from aiohttp import web
+
+from fake_telegram import free_port
+
+FAKE_POST = "🏊 Бетонный бассейн 8x4 м сдан заказчику!\n\n#бассейн #mospool #строительство"
+
+
+class FakeMistral:
+    def __init__(self, port: int = None, latency: float = 0.5, error_rate: float = 0.0, seed: int = 0):
+        self.port = port or free_port()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        """Значение для MISTRAL_API_BASE"""
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": {"message": "injected", "type": "server_error"}}, status=500)
+
+        return web.json_response({
+            "id": f"fake-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": FAKE_POST},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
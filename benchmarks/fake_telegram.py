@@ -0,0 +1,368 @@
+"""
+Фейковый Telegram Bot API для офлайн-проверки бота в режиме webhook.
+
+FakeTelegram отвечает на вызовы бота (/bot<token>/<method>) и запоминает их,
+а deliver() отправляет обновление на webhook бота так же, как Telegram -
+с заголовком X-Telegram-Bot-Api-Secret-Token.
+
+Запуск (поднимает bot/main.py подпроцессом, сеть не нужна):
+    python benchmarks/fake_telegram.py --updates 50
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import ClientSession, web
+
+BOT_DIR = Path(__file__).resolve().parent.parent / "bot"
+
+FAKE_TOKEN = "123456:FAKE-TOKEN"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _short_count(count: int) -> str:
+    """Как на t.me: 987, 12.3K, 1.2M"""
+    if count >= 1_000_000:
+        return f"{count / 1_000_000:.1f}M"
+    if count >= 1_000:
+        return f"{count / 1_000:.1f}K"
+    return str(count)
+
+
+class FakeTelegram:
+    """
+    Минимальный Bot API: getMe, setWebhook, sendMessage, editMessageText...
+    и страница публичного канала t.me/s/<канал> с просмотрами постов.
+    """
+
+    # Методы, в которых error_rate имитирует сбой API (служебные вызовы бота не ломаем)
+    FAILING_METHODS = ("sendMessage", "sendPhoto", "sendMediaGroup")
+
+    def __init__(self, port: int = None, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.port = port or free_port()
+        self.latency = latency  # Имитация сетевой задержки на каждый вызов, секунды
+        self.error_rate = error_rate  # Доля вызовов FAILING_METHODS, отвечающих ошибкой 500
+        self.errors = 0
+        self._random = random.Random(seed)
+        self.calls = []  # (время, метод, параметры)
+        self.webhook = {}
+        self.channel_posts = {}  # канал без @ -> {message_id: просмотры}
+        self.widget_requests = 0
+        self._message_ids = itertools.count(1)
+        self._update_ids = itertools.count(1)
+        self._waiters = []  # (chat_id, условие, future)
+        self._runner = None
+        self._session = None
+
+    @property
+    def base_url(self) -> str:
+        """Значение для TELEGRAM_API_BASE_URL"""
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    @property
+    def widget_url(self) -> str:
+        """Значение для TELEGRAM_WIDGET_URL"""
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self):
+        # Как у Bot API: файлы до 50 МБ
+        app = web.Application(client_max_size=50 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        app.router.add_get("/s/{channel}", self._widget)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+        self._session = ClientSession()
+
+    async def stop(self):
+        if self._session:
+            await self._session.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _params(self, request: web.Request) -> dict:
+        if request.content_type == "application/json":
+            return await request.json()
+        params = {}
+        for key, value in (await request.post()).items():
+            if not isinstance(value, str):
+                params[key] = "<file>"
+                continue
+            try:
+                params[key] = json.loads(value)
+            except ValueError:
+                params[key] = value
+        return params
+
+    def _message(self, params: dict, **extra) -> dict:
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": params.get("chat_id"), "type": "private"},
+        }
+        message.update(extra)
+        chat_id = str(params.get("chat_id"))
+        if chat_id.startswith("@"):
+            self.channel_posts.setdefault(chat_id[1:], {})[message["message_id"]] = 0
+        return message
+
+    async def _widget(self, request: web.Request) -> web.Response:
+        """Как t.me/s/<канал>?before=N: до 20 постов с id < N, по возрастанию"""
+        self.widget_requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        channel = request.match_info["channel"]
+        posts = self.channel_posts.get(channel)
+        if posts is None:
+            return web.Response(status=404)
+
+        before = int(request.query.get("before", 2 ** 31))
+        ids = sorted(message_id for message_id in posts if message_id < before)[-20:]
+        html = "".join(
+            f'<div class="tgme_widget_message js-widget_message" data-post="{channel}/{message_id}">'
+            f'<div class="tgme_widget_message_text">Пост {message_id}</div>'
+            f'<span class="tgme_widget_message_views">{_short_count(posts[message_id])}</span>'
+            f'<span class="copyonly"> views</span></div>'
+            for message_id in ids
+        )
+        return web.Response(text=f"<html><body>{html}</body></html>", content_type="text/html")
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._params(request)
+        self.calls.append((time.perf_counter(), method, params))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method in self.FAILING_METHODS and self._random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response(
+                {"ok": False, "error_code": 500, "description": "Internal Server Error: injected"}, status=500
+            )
+
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+        elif method == "setWebhook":
+            self.webhook = params
+            result = True
+        elif method in ("sendMessage", "editMessageText"):
+            result = self._message(params, text=params.get("text", ""))
+        elif method == "sendPhoto":
+            result = self._message(params, photo=[], caption=params.get("caption"))
+        elif method == "sendMediaGroup":
+            result = [self._message(params, photo=[])]
+        else:
+            result = True
+
+        self._notify(method, params)
+        return web.json_response({"ok": True, "result": result})
+
+    def _notify(self, method: str, params: dict):
+        for waiter in list(self._waiters):
+            chat_id, condition, future = waiter
+            if str(chat_id) != str(params.get("chat_id")) or future.done():
+                continue
+            if condition(method, params):
+                future.set_result(time.perf_counter())
+                self._waiters.remove(waiter)
+
+    def wait_for(self, chat_id, condition) -> asyncio.Future:
+        """Future с моментом первого вызова в chat_id, для которого condition(method, params)"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((chat_id, condition, future))
+        return future
+
+    def wait_for_reply(self, chat_id) -> asyncio.Future:
+        """Future с моментом первого сообщения бота в chat_id"""
+        return self.wait_for(
+            chat_id, lambda method, params: method in ("sendMessage", "sendPhoto", "sendMediaGroup")
+        )
+
+    async def wait_for_webhook(self, timeout: float = 30):
+        deadline = time.monotonic() + timeout
+        while not self.webhook:
+            if time.monotonic() > deadline:
+                raise TimeoutError("bot did not call setWebhook")
+            await asyncio.sleep(0.05)
+
+    def command_update(self, user_id: int, text: str) -> dict:
+        """Обновление с командой от пользователя в личном чате"""
+        command = text.split()[0]
+        return {
+            "update_id": next(self._update_ids),
+            "message": {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+                "text": text,
+                "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+            },
+        }
+
+    def message_update(self, user_id: int, text: str) -> dict:
+        """Обычное текстовое сообщение от пользователя"""
+        update = self.command_update(user_id, text)
+        del update["message"]["entities"]
+        return update
+
+    def callback_update(self, user_id: int, data: str) -> dict:
+        """Нажатие inline-кнопки под сообщением бота"""
+        return {
+            "update_id": next(self._update_ids),
+            "callback_query": {
+                "id": str(next(self._update_ids)),
+                "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": next(self._message_ids),
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "from": {"id": 1, "is_bot": True, "first_name": "Fake"},
+                    "text": "...",
+                },
+            },
+        }
+
+    async def deliver(self, update: dict, secret_token: str = None) -> int:
+        """Отправить обновление на webhook бота, вернуть HTTP-статус"""
+        secret = self.webhook.get("secret_token") if secret_token is None else secret_token
+        async with self._session.post(
+            self.webhook["url"], json=update, headers={SECRET_HEADER: secret or ""}
+        ) as response:
+            return response.status
+
+
+def bot_env(fake: FakeTelegram, webhook_port: int, workdir: str, **overrides) -> dict:
+    """Окружение для запуска bot/main.py против фейкового API"""
+    env = dict(os.environ)
+    env.update({
+        "TELEGRAM_BOT_TOKEN": FAKE_TOKEN,
+        "TELEGRAM_API_BASE_URL": fake.base_url,
+        "BOT_MODE": "webhook",
+        "WEBHOOK_URL": f"http://127.0.0.1:{webhook_port}",
+        "WEBHOOK_LISTEN": "127.0.0.1",
+        "WEBHOOK_PORT": str(webhook_port),
+        "WEBHOOK_SECRET_TOKEN": "harness-secret",
+        "DATABASE_URL": f"sqlite:///{workdir}/bot.db",
+        # Состояние диалогов - своё у каждого прогона, иначе оно переживает его
+        "PERSISTENCE_FILE": f"{workdir}/conversations.pickle",
+        "STORAGE_BACKEND": "bot",
+        "TELEGRAM_CHANNEL_ID": "",
+        "VK_ACCESS_TOKEN": "",
+        "MISTRAL_API_KEY": "",
+        "PYTHONUNBUFFERED": "1",
+    })
+    env.update({key: str(value) for key, value in overrides.items()})
+    return env
+
+
+async def start_bot(fake: FakeTelegram, workdir: str, log_path: str, **env):
+    """Запустить бота подпроцессом и дождаться setWebhook (env - доп. переменные окружения)"""
+    webhook_port = free_port()
+    log = open(log_path, "wb")
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "main.py",
+        cwd=BOT_DIR, env=bot_env(fake, webhook_port, workdir, **env),
+        stdout=log, stderr=asyncio.subprocess.STDOUT,
+    )
+    try:
+        await fake.wait_for_webhook()
+        # setWebhook уходит до того, как бот начнёт слушать порт
+        await _wait_for_port(webhook_port)
+    except TimeoutError:
+        await stop_bot(process)
+        raise
+    return process
+
+
+async def _wait_for_port(port: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"webhook port {port} is not listening")
+            await asyncio.sleep(0.05)
+
+
+async def stop_bot(process):
+    if process.returncode is None:
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), 10)
+        except asyncio.TimeoutError:
+            process.kill()
+
+
+async def run(args):
+    fake = FakeTelegram()
+    await fake.start()
+    workdir = tempfile.mkdtemp(prefix="fake_telegram_")
+    log_path = os.path.join(workdir, "bot.log")
+    process = await start_bot(fake, workdir, log_path)
+
+    try:
+        print(f"webhook: {fake.webhook.get('url')}")
+        print(f"allowed_updates: {fake.webhook.get('allowed_updates')}")
+        print(f"max_connections: {fake.webhook.get('max_connections')}")
+
+        status = await fake.deliver(fake.command_update(1, "/help"), secret_token="wrong")
+        print(f"wrong secret -> HTTP {status}")
+        if status != 403:
+            raise SystemExit("webhook accepted an update with a wrong secret token")
+
+        latencies = []
+        for i in range(args.updates):
+            user_id = 1000 + i
+            reply = fake.wait_for_reply(user_id)
+            sent = time.perf_counter()
+            status = await fake.deliver(fake.command_update(user_id, "/help"))
+            if status != 200:
+                raise SystemExit(f"update rejected: HTTP {status}")
+            latencies.append((await asyncio.wait_for(reply, 10) - sent) * 1000)
+
+        latencies.sort()
+        print(f"updates: {len(latencies)}")
+        print(f"latency ms: median {statistics.median(latencies):.1f}  "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f}  max {latencies[-1]:.1f}")
+
+        # Ничего не делаем - в режиме webhook бот не должен ходить в API
+        before = len(fake.calls)
+        await asyncio.sleep(args.idle)
+        print(f"API calls while idle for {args.idle}s: {len(fake.calls) - before}")
+    finally:
+        await stop_bot(process)
+        await fake.stop()
+        print(f"bot log: {log_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=50)
+    parser.add_argument("--idle", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Фейковый VK API для офлайн-тестов.
+
+vk_api ходит на зашитый https://api.vk.ru/method/<метод>; route() подменяет
+транспорт сессии vk_api.VkApi так, что запросы уходят на этот сервер.
+
+Поддерживаются методы, которыми пользуются публикаторы и сбор статистики:
+wall.post, wall.getById, wall.delete, groups.getById, users.get и загрузка
+фото на стену (photos.getWallUploadServer, POST на upload_url,
+photos.saveWallPhoto).
+"""
+import asyncio
+import itertools
+import random
+import threading
+from collections import Counter
+
+import requests
+from aiohttp import web
+
+from fake_telegram import free_port
+
+VK_API_URL = "https://api.vk.ru"
+
+
+class _RedirectAdapter(requests.adapters.HTTPAdapter):
+    """Переписывает адрес VK API на адрес фейкового сервера"""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = request.url.replace(VK_API_URL, self.base_url, 1)
+        return super().send(request, **kwargs)
+
+
+class FakeVK:
+    """
+    Args:
+        port: Порт (по умолчанию - свободный)
+        latency: Задержка ответа (секунды)
+        deleted: Посты, которых "нет" на стене (wall.getById их не вернёт)
+        error_rate: Доля вызовов wall.post, отвечающих ошибкой VK (код 10)
+    """
+
+    def __init__(self, port: int = None, latency: float = 0.0, deleted=(), error_rate: float = 0.0, seed: int = 0):
+        self.port = port or free_port()
+        self.latency = latency
+        self.deleted = set(deleted)
+        self.error_rate = error_rate
+        self.errors = 0
+        self._random = random.Random(seed)
+        self.calls = Counter()
+        self.posts = []
+        self._ids = itertools.count(1)
+        self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def route(self, vk_session):
+        """Направить запросы vk_api.VkApi на этот сервер"""
+        vk_session.http.mount(VK_API_URL, _RedirectAdapter(self.base_url))
+        # Ограничение vk_api 3 запроса/с оставляем: это и есть квота VK
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/method/{method}", self._method)
+        app.router.add_post("/upload", self._upload)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    def start_in_thread(self) -> "FakeVK":
+        """Запустить в отдельном потоке (для синхронного vk_api)"""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=serve, daemon=True).start()
+        started.wait()
+        return self
+
+    async def _method(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == "wall.post" and self._random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": {"error_code": 10, "error_msg": "Internal server error: injected"}})
+
+        handler = getattr(self, "_" + method.replace(".", "_"), None)
+        if handler is None:
+            return web.json_response({"error": {"error_code": 3, "error_msg": f"Unknown method {method}"}})
+        return web.json_response({"response": handler(params)})
+
+    async def _upload(self, request: web.Request) -> web.Response:
+        # Сервер загрузки: принимает файл и отдаёт данные для saveWallPhoto
+        await request.read()
+        self.calls["upload"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response({"server": 1, "photo": "[{}]", "hash": "fake"})
+
+    def _photos_getWallUploadServer(self, params: dict):
+        return {"upload_url": f"{self.base_url}/upload", "album_id": 1, "user_id": 1}
+
+    def _photos_saveWallPhoto(self, params: dict):
+        return [{"id": next(self._ids), "owner_id": -int(params.get("group_id", 1))}]
+
+    def _wall_post(self, params: dict):
+        post_id = next(self._ids)
+        self.posts.append({"id": post_id, **params})
+        return {"post_id": post_id}
+
+    def _wall_getById(self, params: dict):
+        items = []
+        for key in params.get("posts", "").split(","):
+            owner_id, post_id = (int(part) for part in key.rsplit("_", 1))
+            if post_id in self.deleted:
+                continue
+            reads = self.calls["wall.getById"]
+            items.append({
+                "id": post_id,
+                "owner_id": owner_id,
+                "views": {"count": post_id * 10 + reads},
+                "likes": {"count": post_id % 50},
+                "reposts": {"count": post_id % 7},
+                "comments": {"count": post_id % 5},
+            })
+        return items
+
+    def _wall_delete(self, params: dict):
+        return 1
+
+    def _groups_getById(self, params: dict):
+        return [{"id": int(params.get("group_id", 1)), "name": "Fake group"}]
+
+    def _users_get(self, params: dict):
+        return [{"id": 1, "first_name": "Fake", "last_name": "User"}]
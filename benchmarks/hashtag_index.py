@@ -0,0 +1,137 @@
+"""
+Подбор хештегов: индекс по истории публикаций
+(apps/posts/services/hashtag_index.py) против запроса к ИИ
+(MistralClient.generate_hashtags через фейковый Mistral).
+
+На временной SQLite создаются опубликованные посты нескольких тем со
+своими хештегами и успешными публикациями. Считаются: полная сборка
+индекса, инкрементальное дочитывание, время одной рекомендации и доля
+рекомендованных хештегов, совпавших с хештегами темы черновика.
+
+Запуск:
+    python benchmarks/hashtag_index.py --posts 2000 --ai-latency 0.5
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from bulk_projects import start_fake_mistral
+from crawler_fixture import setup_django
+
+COMMON_WORDS = ['бассейн', 'строительство', 'проект', 'заказчик', 'участок', 'коттедж', 'работы']
+
+TOPICS = {
+    'concrete': (
+        ['бетонный', 'монолитный', 'армирование', 'гидроизоляция', 'опалубка', 'мозаика'],
+        ['#бетонныйбассейн', '#монолит', '#мозаика'],
+    ),
+    'composite': (
+        ['композитный', 'чаша', 'стеклопластик', 'монтаж', 'доставка', 'гелькоут'],
+        ['#композитныйбассейн', '#чашабассейна', '#быстрыймонтаж'],
+    ),
+    'spa': (
+        ['хаммам', 'сауна', 'парная', 'джакузи', 'релакс', 'гидромассаж'],
+        ['#спа', '#хаммам', '#сауна'],
+    ),
+    'water': (
+        ['фильтрация', 'хлорирование', 'озонирование', 'дезинфекция', 'насос', 'прозрачная'],
+        ['#чистаявода', '#водоподготовка', '#фильтрация'],
+    ),
+    'service': (
+        ['обслуживание', 'консервация', 'зимовка', 'чистка', 'ремонт', 'диагностика'],
+        ['#обслуживаниебассейнов', '#сервис', '#консервация'],
+    ),
+}
+BRAND_TAGS = ['#бассейн', '#mospool', '#бассейнподключ']
+
+
+def make_text(rng: random.Random, topic: str, with_tags: bool) -> str:
+    words, tags = TOPICS[topic]
+    text = ' '.join(rng.sample(words, 4) + rng.sample(COMMON_WORDS, 3))
+    if with_tags:
+        text += '\n\n' + ' '.join(rng.sample(tags, 2) + rng.sample(BRAND_TAGS, 2))
+    return text
+
+
+def seed(count: int, rng: random.Random, start: int = 0):
+    from apps.posts.models import Platform, Post, Publication
+
+    platform, _ = Platform.objects.get_or_create(name='telegram', defaults={'display_name': 'Telegram'})
+    posts = Post.objects.bulk_create([
+        Post(title=f'Пост {start + i}', content=make_text(rng, rng.choice(list(TOPICS)), True),
+             status='published')
+        for i in range(count)
+    ])
+    Publication.objects.bulk_create([
+        Publication(post=post, platform=platform, status='success')
+        for post in posts if rng.random() < 0.5
+    ])
+
+
+def run(args):
+    from django.conf import settings
+    db_path = os.path.join(tempfile.mkdtemp(prefix='hashtag_index_'), 'db.sqlite3')
+    mistral = start_fake_mistral(args.ai_latency)
+    settings.MISTRAL_API_KEY = 'fake'
+    settings.MISTRAL_API_BASE = mistral.base_url
+    setup_django(db_path)
+
+    from apps.ai_generator.mistral_client import get_mistral_client
+    from apps.posts.services.hashtag_index import HashtagIndex
+
+    rng = random.Random(1)
+    seed(args.posts, rng)
+    print(f'{args.posts} published posts, {len(TOPICS)} topics')
+
+    index = HashtagIndex()
+    started = time.perf_counter()
+    index.refresh()
+    print(f'  full build:        {(time.perf_counter() - started) * 1000:8.1f} ms '
+          f'({index.posts} posts, {len(index)} hashtags)')
+
+    seed(args.posts // 100 or 1, rng, start=args.posts)
+    started = time.perf_counter()
+    index.refresh()
+    print(f'  incremental:       {(time.perf_counter() - started) * 1000:8.1f} ms (+{args.posts // 100 or 1} posts)')
+
+    drafts = [(topic, make_text(rng, topic, False)) for topic in rng.choices(list(TOPICS), k=args.drafts)]
+    started = time.perf_counter()
+    results = [index.recommend(text, 5) for _, text in drafts]
+    per_call = (time.perf_counter() - started) / len(drafts)
+
+    # Хештеги темы и общие хештеги - релевантные, хештеги чужой темы - нет
+    relevant = sum(
+        tag in TOPICS[topic][1] or tag in BRAND_TAGS
+        for (topic, _), tags in zip(drafts, results) for tag in tags
+    )
+    on_topic = sum(
+        any(tag in TOPICS[topic][1] for tag in tags[:2])
+        for (topic, _), tags in zip(drafts, results)
+    )
+    print(f'  recommend:         {per_call * 1e6:8.1f} us per draft')
+    print(f'  relevant:          {relevant / max(1, sum(map(len, results))):8.1%} of recommended tags')
+    print(f'  topic in top 2:    {on_topic / len(drafts):8.1%} of drafts')
+
+    client = get_mistral_client()
+    calls = min(args.ai_calls, len(drafts))
+    started = time.perf_counter()
+    for _, text in drafts[:calls]:
+        client.generate_hashtags(text, 5)
+    ai_per_call = (time.perf_counter() - started) / calls
+    print(f'  AI round-trip:     {ai_per_call * 1e6:8.1f} us per draft ({calls} calls)')
+    print(f'  speedup:           {ai_per_call / per_call:8.0f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--drafts', type=int, default=5000)
+    parser.add_argument('--ai-latency', type=float, default=0.5)
+    parser.add_argument('--ai-calls', type=int, default=5)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Варианты изображений под платформы (apps/posts/services/image_renditions.py).
+
+Создаёт "фото с телефона" (4032x3024, JPEG q95) во временном MEDIA_ROOT
+и сравнивает оригинал с вариантами telegram / vk / admin: байты, время
+первой сборки, время повторного обращения (кэш на диске). Затем
+публикует пост через TelegramPublisher в фейковый Telegram
+(benchmarks/fake_telegram.py) с оригиналом и с вариантом.
+
+Запуск:
+    python benchmarks/image_renditions.py --uplink-mbit 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from fake_telegram import FAKE_TOKEN, FakeTelegram  # noqa: E402
+
+
+def make_photo(path: str, size=(4032, 3024)):
+    """Шумная картинка с градиентом - сжимается так же плохо, как фото"""
+    from PIL import Image, ImageFilter
+
+    noise = Image.effect_noise(size, 60).filter(ImageFilter.GaussianBlur(0.6))
+    gradient = Image.linear_gradient('L').resize(size)
+    image = Image.merge('RGB', (noise, gradient, Image.blend(noise, gradient, 0.5)))
+    image.save(path, 'JPEG', quality=95)
+
+
+def start_fake_telegram() -> FakeTelegram:
+    fake = FakeTelegram()
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(fake.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+    return fake
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uplink-mbit', type=float, default=10.0,
+                        help='Скорость отдачи сервера для оценки времени загрузки')
+    args = parser.parse_args()
+
+    settings.MEDIA_ROOT = tempfile.mkdtemp(prefix='renditions_')
+    django.setup()
+
+    from telegram import Bot
+    from apps.posts.services.image_renditions import RENDITIONS, get_rendition
+    from apps.publishers.telegram_publisher import TelegramPublisher
+
+    source = os.path.join(settings.MEDIA_ROOT, 'photo.jpg')
+    make_photo(source)
+    original = os.path.getsize(source)
+
+    def upload_time(size: int) -> float:
+        return size * 8 / (args.uplink_mbit * 1_000_000)
+
+    print(f'original:  {original / 1024:7.0f} KB  upload {upload_time(original):5.2f}s '
+          f'at {args.uplink_mbit:g} Mbit/s')
+    for name in RENDITIONS:
+        started = time.perf_counter()
+        path = get_rendition(source, name)
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        assert get_rendition(source, name) == path
+        warm = time.perf_counter() - started
+        size = os.path.getsize(path)
+        print(f'{name:<9}  {size / 1024:7.0f} KB  upload {upload_time(size):5.2f}s  '
+              f'({original / size:4.0f}x smaller)  build {cold * 1000:5.0f} ms, cached {warm * 1e6:4.0f} us')
+
+    fake = start_fake_telegram()
+    for label, rendition in (('original', None), ('telegram', 'telegram')):
+        publisher = TelegramPublisher(FAKE_TOKEN, '@renditions_test')
+        publisher.rendition = rendition
+        publisher._bot = Bot(token=FAKE_TOKEN, base_url=fake.base_url)
+        started = time.perf_counter()
+        result = publisher.publish('Бассейн под ключ', image_path=source)
+        assert result['success'], result
+        print(f'publish with {label:<9} {time.perf_counter() - started:5.2f}s (localhost)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Метрики публикации (apps/publishers/metrics.py, эндпоинт /metrics/).
+
+Временная SQLite, платформы Telegram и VK смотрят на FakeTelegram и
+FakeVK с задержкой --latency на вызов. N постов (часть - с фото)
+публикуются через publish_single_post, как это делает планировщик, затем
+/metrics/ забирается тестовым клиентом Django и разбирается парсером
+prometheus_client.
+
+Печатает для каждой платформы и этапа число замеров, среднее и сумму - по
+ним видно, куда уходит время публикации (api должен быть около latency,
+остальное - накладные расходы приложения).
+
+Запуск:
+    python benchmarks/publish_metrics.py --posts 20 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+from collections import defaultdict
+
+from crawler_fixture import setup_django
+from fake_telegram import FAKE_TOKEN, FakeTelegram
+from fake_vk import FakeVK
+from image_renditions import make_photo
+
+
+def start_in_thread(fake) -> asyncio.AbstractEventLoop:
+    """Поднять aiohttp-сервер фейка в отдельном потоке со своим циклом"""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(fake.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+    return loop
+
+
+def route_publishers(telegram: FakeTelegram, vk: FakeVK):
+    """Направить публикаторы веб-приложения на фейковые API"""
+    from telegram import Bot
+    from apps.publishers.telegram_publisher import TelegramPublisher
+    from apps.publishers.vk_publisher import VKPublisher
+
+    def get_bot(publisher):
+        if publisher._bot is None:
+            publisher._bot = Bot(token=publisher.token, base_url=telegram.base_url)
+        return publisher._bot
+
+    original_get_vk = VKPublisher._get_vk
+
+    def get_vk(publisher):
+        routed = publisher._vk_session is not None
+        session, api = original_get_vk(publisher)
+        if not routed:
+            vk.route(session)
+        return session, api
+
+    TelegramPublisher._get_bot = get_bot
+    VKPublisher._get_vk = get_vk
+
+
+def run(args):
+    from django.conf import settings
+    workdir = tempfile.mkdtemp(prefix='publish_metrics_')
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    settings.ALLOWED_HOSTS = ['*']
+    setup_django(os.path.join(workdir, 'db.sqlite3'))
+
+    from django.core.files import File
+    from django.test import Client
+    from prometheus_client.parser import text_string_to_metric_families
+    from apps.posts.models import Platform, Post
+    from apps.scheduler.scheduler import publish_single_post
+
+    telegram = FakeTelegram(latency=args.latency)
+    telegram_loop = start_in_thread(telegram)
+    vk = FakeVK(latency=args.latency).start_in_thread()
+    route_publishers(telegram, vk)
+
+    platforms = [
+        Platform.objects.update_or_create(name='telegram', defaults={
+            'display_name': 'Telegram', 'api_token': FAKE_TOKEN, 'channel_id': '@bench', 'is_active': True,
+        })[0],
+        Platform.objects.update_or_create(name='vk', defaults={
+            'display_name': 'VK', 'api_token': 'vk-token', 'channel_id': '1', 'is_active': True,
+        })[0],
+    ]
+    photo = os.path.join(workdir, 'photo.jpg')
+    make_photo(photo, size=(1600, 1200))
+
+    for i in range(args.posts):
+        post = Post.objects.create(title=f'Пост {i}', content='Бассейн под ключ ' * 40, status='approved')
+        post.platforms.set(platforms)
+        if args.photo_every and i % args.photo_every == 0:
+            with open(photo, 'rb') as f:
+                post.image.save(f'photo_{i}.jpg', File(f))
+        publish_single_post(post.id)
+
+    response = Client().get('/metrics/')
+    assert response.status_code == 200, response.status_code
+    stages = defaultdict(lambda: [0, 0.0])
+    published = {}
+    for family in text_string_to_metric_families(response.content.decode()):
+        for sample in family.samples:
+            if family.name == 'publish_stage_seconds' and sample.name.endswith(('_count', '_sum')):
+                key = (sample.labels['platform'], sample.labels['stage'])
+                stages[key][sample.name.endswith('_sum')] += sample.value
+            elif family.name == 'publish_seconds' and sample.name.endswith(('_count', '_sum')):
+                key = (sample.labels['platform'], 'total')
+                stages[key][sample.name.endswith('_sum')] += sample.value
+            elif family.name == 'publications' and sample.name.endswith('_total'):
+                published[(sample.labels['platform'], sample.labels['result'])] = sample.value
+
+    print(f'{args.posts} posts x {len(platforms)} platforms, {args.latency * 1000:.0f} ms per API call, '
+          f'/metrics/ {len(response.content)} bytes')
+    order = ('db_fetch', 'format', 'media', 'api', 'db_write', 'total')
+    for (platform, stage), (count, total) in sorted(stages.items(), key=lambda i: (i[0][0], order.index(i[0][1]))):
+        print(f'  {platform:<9} {stage:<9} {int(count):5d} x {total / count * 1000 if count else 0:8.2f} ms'
+              f'  = {total:7.3f} s')
+    print('  publications: ' + ', '.join(f'{p} {r} {int(v)}' for (p, r), v in sorted(published.items())))
+    print(f'  fake API calls: telegram {len(telegram.calls)}, vk {sum(vk.calls.values())}')
+
+    telegram_loop.call_soon_threadsafe(telegram_loop.stop)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05, help='Задержка фейковых API на вызов, секунды')
+    parser.add_argument('--photo-every', type=int, default=2, help='Фото у каждого N-го поста (0 - без фото)')
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
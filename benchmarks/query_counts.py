@@ -0,0 +1,201 @@
+"""
+Число SQL-запросов на страницу: веб-интерфейс, API и списки админки.
+
+Временная SQLite заполняется дважды: сначала --small строк, затем база
+дорастает до --rows (посты с публикациями на обе платформы, шаблоны,
+слоты расписания). На каждом размере каждая страница запрашивается
+тестовым клиентом Django под суперпользователем, запросы считаются
+CaptureQueriesContext.
+
+Проверки:
+- число запросов не больше бюджета страницы (BUDGETS);
+- на большой базе запросов столько же, сколько на малой - N+1 (например,
+  post.category без select_related или platforms.all() в строке списка)
+  растёт вместе с числом строк и сразу виден.
+
+При нарушении печатаются запросы страницы и код выхода 1 - скрипт можно
+ставить в CI перед выкладкой.
+
+Запуск:
+    python benchmarks/query_counts.py --small 20 --rows 2000
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from datetime import time as dt_time, timedelta
+
+from crawler_fixture import setup_django
+
+# Страница -> наибольшее допустимое число запросов (с сессией и пользователем)
+BUDGETS = {
+    'dashboard': 12,
+    'post_list': 10,
+    'post_detail': 8,
+    'post_create': 8,
+    'post_edit': 8,
+    'calendar': 6,
+    'settings': 6,
+    'api_posts_list': 2,
+    'api_post_detail': 3,
+    'admin_post_changelist': 12,
+    'admin_post_change': 14,
+    'admin_publication_changelist': 10,
+    'admin_scheduleslot_changelist': 10,
+    'admin_posttemplate_changelist': 10,
+}
+
+CATEGORIES = 5
+
+
+def seed(rows: int):
+    """Дополнить базу до rows постов (и пропорционально шаблонов и слотов)"""
+    from django.utils import timezone
+    from apps.posts.models import Platform, Post, PostCategory, PostTemplate, Publication, ScheduleSlot
+
+    categories = list(PostCategory.objects.order_by('id'))
+    if not categories:
+        categories = PostCategory.objects.bulk_create([
+            PostCategory(slug=f'category-{i}', name=f'Категория {i}') for i in range(CATEGORIES)
+        ])
+    platforms = list(Platform.objects.order_by('id'))
+    if not platforms:
+        platforms = Platform.objects.bulk_create([
+            Platform(name='telegram', display_name='Telegram', channel_id='@bench', is_active=True),
+            Platform(name='vk', display_name='VK', channel_id='1', is_active=True),
+        ])
+
+    have = Post.objects.count()
+    if rows <= have:
+        return
+    now = timezone.now()
+    statuses = [status for status, _ in Post.STATUS_CHOICES]
+    posts = Post.objects.bulk_create([
+        Post(
+            title=f'Пост {i}', content='Бассейн под ключ ' * 20, status=statuses[i % len(statuses)],
+            category=categories[i % len(categories)],
+            scheduled_time=now + timedelta(hours=i % 72 - 36),
+        )
+        for i in range(have, rows)
+    ])
+    Through = Post.platforms.through
+    Through.objects.bulk_create([
+        Through(post_id=post.id, platform_id=platform.id) for post in posts for platform in platforms
+    ])
+    Publication.objects.bulk_create([
+        Publication(post=post, platform=platform, status='success', external_id=str(post.id),
+                    published_at=now - timedelta(hours=post.id % 160))
+        for post in posts for platform in platforms
+    ])
+
+    PostTemplate.objects.bulk_create([
+        PostTemplate(name=f'Шаблон {i}', category=categories[i % len(categories)],
+                     template_text='{content}', is_active=True)
+        for i in range(PostTemplate.objects.count(), max(rows // 10, 1))
+    ])
+    slots = ScheduleSlot.objects.bulk_create([
+        ScheduleSlot(day_of_week=i % 7, time=dt_time(9 + i % 12, i % 60), is_active=True,
+                     preferred_category=categories[i % len(categories)])
+        for i in range(ScheduleSlot.objects.count(), max(rows // 10, 1))
+    ])
+    SlotThrough = ScheduleSlot.platforms.through
+    SlotThrough.objects.bulk_create([
+        SlotThrough(scheduleslot_id=slot.id, platform_id=platform.id) for slot in slots for platform in platforms
+    ])
+
+
+def pages() -> dict:
+    """Имя страницы -> URL (пост - с публикациями на все платформы)"""
+    from django.urls import reverse
+    from apps.posts.models import Post
+
+    post_id = Post.objects.filter(publications__isnull=False).values_list('id', flat=True).first()
+    return {
+        'dashboard': reverse('dashboard'),
+        'post_list': reverse('post_list'),
+        'post_detail': reverse('post_detail', args=[post_id]),
+        'post_create': reverse('post_create'),
+        'post_edit': reverse('post_edit', args=[post_id]),
+        'calendar': reverse('calendar'),
+        'settings': reverse('settings'),
+        'api_posts_list': reverse('api_posts_list'),
+        'api_post_detail': reverse('api_post_detail', args=[post_id]),
+        'admin_post_changelist': reverse('admin:posts_post_changelist'),
+        'admin_post_change': reverse('admin:posts_post_change', args=[post_id]),
+        'admin_publication_changelist': reverse('admin:posts_publication_changelist'),
+        'admin_scheduleslot_changelist': reverse('admin:posts_scheduleslot_changelist'),
+        'admin_posttemplate_changelist': reverse('admin:posts_posttemplate_changelist'),
+    }
+
+
+def measure(client) -> dict:
+    """Имя страницы -> список SQL страницы"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    result = {}
+    for name, url in pages().items():
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        assert response.status_code == 200, f'{name} {url}: {response.status_code}'
+        result[name] = [query['sql'] for query in ctx.captured_queries]
+    return result
+
+
+def print_queries(queries: list):
+    """Запросы страницы; одинаковые по форме (без чисел) - одной строкой с кратностью"""
+    shapes = Counter(re.sub(r'\b\d+\b', 'N', sql) for sql in queries)
+    for shape, count in shapes.most_common():
+        print(f'      {count:4d} x {shape[:160]}')
+
+
+def run(args) -> int:
+    from django.conf import settings
+    workdir = tempfile.mkdtemp(prefix='query_counts_')
+    settings.ALLOWED_HOSTS = ['*']
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    setup_django(os.path.join(workdir, 'db.sqlite3'))
+
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    client = Client()
+    client.force_login(get_user_model().objects.create_superuser('bench', 'bench@example.com', 'bench'))
+
+    seed(args.small)
+    measure(client)  # Прогрев: кеши ContentType, сессии и т.п. - запросы только первого раза
+    small = measure(client)
+    seed(args.rows)
+    large = measure(client)
+
+    failures = 0
+    print(f'{"page":<31} {args.small:>7} {args.rows:>7}  budget')
+    for name, budget in BUDGETS.items():
+        problems = []
+        if len(large[name]) > budget:
+            problems.append('over budget')
+        if len(large[name]) != len(small[name]):
+            problems.append('grows with rows')
+        print(f'  {name:<29} {len(small[name]):7d} {len(large[name]):7d}  {budget:6d}'
+              f'  {", ".join(problems) or "ok"}')
+        if problems:
+            failures += 1
+            print_queries(large[name])
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(f'{failures} of {len(BUDGETS)} pages failed' if failures else 'all pages ok')
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--small', type=int, default=20, help='Постов в малой базе')
+    parser.add_argument('--rows', type=int, default=2000, help='Постов в большой базе')
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
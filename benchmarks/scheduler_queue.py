@@ -0,0 +1,148 @@
+"""
+Метрики планировщика и очереди (apps/scheduler/metrics.py, эндпоинт /metrics/).
+
+Временная SQLite, платформы на FakeTelegram/FakeVK (--latency на вызов).
+Планировщик с --threads потоками получает сразу N публикаций "на сейчас"
+(schedule_post), плюс:
+- задачу с временем на 10 минут раньше - больше misfire_grace_time, пропуск;
+- задачу по интервалу, которая дольше интервала - пропуски max_instances.
+
+Пока очередь разбирается, /metrics/ опрашивается раз в --scrape-interval
+секунд: видно, как растут занятые потоки и ожидающие задачи. В конце -
+опоздание старта (p50/p95 по гистограмме), результаты и пропуски задач,
+посты по статусам.
+
+Запуск:
+    python benchmarks/scheduler_queue.py --posts 40 --threads 4 --latency 0.1
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from crawler_fixture import setup_django
+from fake_telegram import FAKE_TOKEN, FakeTelegram
+from fake_vk import FakeVK
+from publish_metrics import route_publishers, start_in_thread
+
+
+def scrape(client) -> dict:
+    """{(имя сэмпла, метки): значение} с /metrics/"""
+    from prometheus_client.parser import text_string_to_metric_families
+
+    response = client.get('/metrics/')
+    assert response.status_code == 200, response.status_code
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(response.content.decode())
+        for sample in family.samples
+    }
+
+
+def histogram_quantile(samples: dict, name: str, labels: dict, q: float) -> float:
+    """Верхняя граница корзины, в которую попадает квантиль q"""
+    buckets = sorted(
+        (float(dict(key)['le']), value) for (sample, key), value in samples.items()
+        if sample == f'{name}_bucket' and all(dict(key).get(k) == v for k, v in labels.items())
+    )
+    if not buckets or not buckets[-1][1]:
+        return 0.0
+    total = buckets[-1][1]
+    return next(le for le, count in buckets if count >= q * total)
+
+
+def run(args):
+    from django.conf import settings
+    workdir = tempfile.mkdtemp(prefix='scheduler_queue_')
+    settings.ALLOWED_HOSTS = ['*']
+    settings.SCHEDULER_THREADS = args.threads
+    settings.SCHEDULER_LOCK_FILE = os.path.join(workdir, 'scheduler.lock')
+    setup_django(os.path.join(workdir, 'db.sqlite3'))
+
+    from apscheduler.triggers.date import DateTrigger
+    from apscheduler.triggers.interval import IntervalTrigger
+    from django.test import Client
+    from django.utils import timezone
+    from apps.posts.models import Platform, Post
+    from apps.scheduler.scheduler import get_scheduler, schedule_post, stop_scheduler
+
+    telegram = FakeTelegram(latency=args.latency)
+    start_in_thread(telegram)
+    vk = FakeVK(latency=args.latency).start_in_thread()
+    route_publishers(telegram, vk)
+
+    platforms = [
+        Platform.objects.create(name='telegram', display_name='Telegram', api_token=FAKE_TOKEN,
+                                channel_id='@bench', is_active=True),
+        Platform.objects.create(name='vk', display_name='VK', api_token='vk-token', channel_id='1', is_active=True),
+    ]
+    now = timezone.now()
+    posts = Post.objects.bulk_create([
+        Post(title=f'Пост {i}', content='Бассейн под ключ ' * 40, status='scheduled', scheduled_time=now)
+        for i in range(args.posts)
+    ])
+    for post in posts:
+        post.platforms.set(platforms)
+    Post.objects.bulk_create([
+        Post(title=f'Черновик {i}', content='Черновик', status='draft') for i in range(args.posts // 2)
+    ])
+
+    scheduler = get_scheduler()
+    scheduler.start()
+    started = time.perf_counter()
+    for post in posts:
+        schedule_post(post, datetime.now(scheduler.timezone))
+    scheduler.add_job(time.sleep, DateTrigger(run_date=datetime.now(scheduler.timezone) - timedelta(minutes=10)),
+                      args=[0], id='stale_job')
+    scheduler.add_job(time.sleep, IntervalTrigger(seconds=1), args=[2.5], id='slow_job')
+
+    client = Client()
+    print(f'{args.posts} posts, {args.threads} threads, {args.latency * 1000:.0f} ms per API call')
+    print('     t   busy  queued  published')
+    while True:
+        samples = scrape(client)
+        published = samples.get(('posts', (('status', 'published'),)), 0)
+        print(f'  {time.perf_counter() - started:4.1f}s  {samples[("scheduler_threads_busy", ())]:4.0f}'
+              f'  {samples[("scheduler_jobs_queued", ())]:6.0f}  {published:9.0f}')
+        if published >= args.posts:
+            break
+        time.sleep(args.scrape_interval)
+    elapsed = time.perf_counter() - started
+    stop_scheduler(wait=True)
+
+    samples = scrape(client)
+    print(f'  queue drained in {elapsed:.1f}s ({args.posts / elapsed:.1f} posts/s)')
+    for job in ('publish_post', 'slow_job'):
+        print(f'  {job:<13} lag p50 <= {histogram_quantile(samples, "scheduler_job_lag_seconds", {"job": job}, 0.5):g}s, '
+              f'p95 <= {histogram_quantile(samples, "scheduler_job_lag_seconds", {"job": job}, 0.95):g}s')
+    totals = defaultdict(dict)
+    for (name, labels), value in samples.items():
+        labels = dict(labels)
+        if name == 'scheduler_jobs_total':
+            totals[labels['job']][labels['result']] = int(value)
+        elif name == 'scheduler_misfires_total':
+            totals[labels['job']][f'misfire:{labels["reason"]}'] = int(value)
+    for job, counts in sorted(totals.items()):
+        print(f'  {job:<13} ' + ', '.join(f'{k} {v}' for k, v in sorted(counts.items())))
+    print('  post lag p95 <= {:g}s; posts: {}'.format(
+        histogram_quantile(samples, 'post_publish_lag_seconds', {}, 0.95),
+        ', '.join(f'{dict(labels)["status"]} {int(value)}' for (name, labels), value in sorted(samples.items())
+                  if name == 'posts' and value),
+    ))
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=40)
+    parser.add_argument('--threads', type=int, default=4, help='SCHEDULER_THREADS')
+    parser.add_argument('--latency', type=float, default=0.1, help='Задержка фейковых API на вызов, секунды')
+    parser.add_argument('--scrape-interval', type=float, default=1.0)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
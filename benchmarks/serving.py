@@ -0,0 +1,199 @@
+"""
+runserver против gunicorn + WhiteNoise (config/gunicorn.py).
+
+Во временном каталоге: SQLite с N постами, collectstatic, настройки
+поверх config.settings (DEBUG выключен у обоих; runserver отдаёт статику
+с --insecure, как это делает DEBUG). Каждый сервер поднимается отдельным
+процессом и нагружается C клиентами с keep-alive в течение D секунд по
+смеси страниц: дашборд, список постов, CSS.
+
+Печатает запросы в секунду и задержки p50/p95 (смесь, только страница,
+только статика), затем для gunicorn:
+сколько воркеров запустили планировщик (должен один), заголовки
+статики (хеш в имени, сжатие, Cache-Control).
+
+Запуск:
+    python benchmarks/serving.py --clients 16 --duration 10
+"""
+import argparse
+import http.client
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SETTINGS = '''
+from config.settings import *  # noqa
+
+DEBUG = False
+DATABASES['default']['NAME'] = {workdir!r} + '/db.sqlite3'
+STATIC_ROOT = {workdir!r} + '/static'
+MEDIA_ROOT = {workdir!r} + '/media'
+SCHEDULER_LOCK_FILE = {workdir!r} + '/scheduler.lock'
+LOGGING['handlers']['file']['filename'] = {workdir!r} + '/app.log'
+'''
+
+SEED = '''
+from apps.posts.models import Post, PostCategory
+category, _ = PostCategory.objects.get_or_create(slug='project', defaults={{'name': 'Проект'}})
+Post.objects.bulk_create([
+    Post(title=f'Пост {{i}}', content='Бассейн под ключ ' * 40, category=category,
+         status=('draft', 'approved', 'published')[i % 3])
+    for i in range({posts})
+])
+'''
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def load(port: int, paths: list, clients: int, duration: float) -> tuple:
+    """(запросов, ошибок, задержки в секундах)"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset: int):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local, failed, i = [], 0, offset
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            local.append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), errors[0], sorted(latencies)
+
+
+def percentile(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=50)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=None, help='GUNICORN_WORKERS (по умолчанию из конфига)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='serving_')
+    Path(workdir, 'bench_settings.py').write_text(SETTINGS.format(workdir=workdir))
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='bench_settings',
+               PYTHONPATH=os.pathsep.join([workdir, str(ROOT)]))
+    if args.workers:
+        env['GUNICORN_WORKERS'] = str(args.workers)
+
+    def manage(*command):
+        subprocess.run([sys.executable, 'manage.py', *command], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    manage('migrate')
+    manage('collectstatic', '--noinput')
+    manage('shell', '-c', SEED.format(posts=args.posts))
+
+    servers = {
+        'runserver': [sys.executable, 'manage.py', 'runserver', '--noreload', '--insecure'],
+        'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'config/gunicorn.py', 'config.wsgi'],
+    }
+    print(f'{args.posts} posts, {args.clients} clients, {args.duration:g}s per server')
+    for name, command in servers.items():
+        port = free_port()
+        if name == 'runserver':
+            command = command + [f'127.0.0.1:{port}']
+        server_env = dict(env, GUNICORN_BIND=f'127.0.0.1:{port}', GUNICORN_ACCESS_LOG='/dev/null')
+        log_path = os.path.join(workdir, f'{name}.log')
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(command, cwd=ROOT, env=server_env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            wait_for_port(port)
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            conn.request('GET', '/posts/')
+            html = conn.getresponse().read().decode()
+            css = re.search(r'href="(/static/css/[^"]+)"', html).group(1)
+            if name == 'runserver':
+                # runserver отдаёт исходники (finders), а не собранные файлы с хешем
+                css = '/static/css/style.css'
+            load(port, ['/', '/posts/', css], args.clients, 1)  # прогрев
+
+            for label, paths in (('mix', ['/', '/posts/', css]), ('/posts/', ['/posts/']), ('css', [css])):
+                count, failed, latencies = load(port, paths, args.clients, args.duration)
+                print(f'  {name:<10} {label:<8} {count / args.duration:7.0f} req/s  '
+                      f'p50 {percentile(latencies, 0.5) * 1000:6.1f} ms  '
+                      f'p95 {percentile(latencies, 0.95) * 1000:6.1f} ms  errors {failed}')
+
+            if name == 'gunicorn':
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                conn.request('GET', css, headers={'Accept-Encoding': 'br, gzip'})
+                response = conn.getresponse()
+                body = response.read()
+                original = os.path.getsize(ROOT / 'static' / 'css' / 'style.css')
+                print(f'  static     {css}: {original} -> {len(body)} bytes, '
+                      f'Content-Encoding {response.getheader("Content-Encoding")}, '
+                      f'Cache-Control {response.getheader("Cache-Control")}')
+        finally:
+            process.terminate()
+            process.wait()
+
+        if name == 'gunicorn':
+            # Воркеры перезапускаются по max_requests - планировщик переходит к другому,
+            # но одновременно работать должен только один
+            running = overlap = started = 0
+            output = Path(log_path).read_text()
+            for line in output.splitlines():
+                if 'Scheduler started successfully' in line:
+                    started += 1
+                    running += 1
+                    overlap = max(overlap, running)
+                elif 'Scheduler stopped' in line:
+                    running -= 1
+            print(f'  scheduler  started {started} time(s) over {output.count("Booting worker")} worker boots, '
+                  f'at most {overlap} running at once')
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
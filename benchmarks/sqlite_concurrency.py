@@ -0,0 +1,134 @@
+"""
+Бенчмарк конкурентного чтения/записи SQLite: настройки по умолчанию против
+тюнинга из config/sqlite.py (WAL, synchronous=NORMAL...; ожидание блокировки - timeout соединения).
+
+Имитирует планировщик, пишущий Publication, пока веб-запросы читают.
+
+Запуск:
+    python benchmarks/sqlite_concurrency.py --seconds 5 --readers 4
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config.sqlite import SQLITE_PRAGMAS, apply_sqlite_pragmas  # noqa: E402
+
+
+def connect(path: str, tuned: bool) -> sqlite3.Connection:
+    # "По умолчанию" - 5 с, как у sqlite3.connect и Django без OPTIONS['timeout']
+    conn = sqlite3.connect(path, timeout=20 if tuned else 5.0, isolation_level=None,
+                           check_same_thread=False)
+    if tuned:
+        cursor = conn.cursor()
+        apply_sqlite_pragmas(cursor, SQLITE_PRAGMAS)
+        cursor.close()
+    return conn
+
+
+def setup(path: str, tuned: bool, rows: int):
+    conn = connect(path, tuned)
+    conn.execute(
+        "CREATE TABLE publication (id INTEGER PRIMARY KEY, post_id INTEGER, "
+        "status TEXT, external_id TEXT, published_at REAL)"
+    )
+    conn.execute("CREATE INDEX publication_post ON publication(post_id)")
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO publication (post_id, status, external_id, published_at) VALUES (?, ?, ?, ?)",
+        ((i % 500, 'success', str(i), time.time()) for i in range(rows)),
+    )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def run(tuned: bool, seconds: float, readers: int, rows: int) -> dict:
+    tmpdir = tempfile.mkdtemp(prefix='sqlite_bench_')
+    path = os.path.join(tmpdir, 'bench.db')
+    setup(path, tuned, rows)
+
+    stop = threading.Event()
+    counters = {'writes': 0, 'reads': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def bump(key):
+        with lock:
+            counters[key] += 1
+
+    def writer():
+        conn = connect(path, tuned)
+        i = 0
+        while not stop.is_set():
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "INSERT INTO publication (post_id, status, external_id, published_at) "
+                    "VALUES (?, 'success', ?, ?)",
+                    (i % 500, str(i), time.time()),
+                )
+                conn.execute("COMMIT")
+                bump('writes')
+            except sqlite3.OperationalError:
+                bump('locked')
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.OperationalError:
+                    pass
+            i += 1
+        conn.close()
+
+    def reader(n):
+        conn = connect(path, tuned)
+        i = n
+        while not stop.is_set():
+            try:
+                conn.execute(
+                    "SELECT status, COUNT(*) FROM publication WHERE post_id = ? GROUP BY status",
+                    (i % 500,),
+                ).fetchall()
+                bump('reads')
+            except sqlite3.OperationalError:
+                bump('locked')
+            i += 1
+        conn.close()
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return {
+        'mode': 'tuned' if tuned else 'default',
+        'writes_per_sec': counters['writes'] / seconds,
+        'reads_per_sec': counters['reads'] / seconds,
+        'locked_errors': counters['locked'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'writes/s':>10} {'reads/s':>10} {'locked':>8}")
+    for tuned in (False, True):
+        r = run(tuned, args.seconds, args.readers, args.rows)
+        print(f"{r['mode']:<8} {r['writes_per_sec']:>10.0f} {r['reads_per_sec']:>10.0f} {r['locked_errors']:>8}")
+
+
+if __name__ == '__main__':
+    main()
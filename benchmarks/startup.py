@@ -0,0 +1,123 @@
+"""
+Время холодного старта процессов по `python -X importtime`.
+
+Сценарии:
+- check      - manage.py check;
+- web        - воркер gunicorn: config.wsgi и URLconf (планировщик вынесен,
+               SCHEDULER_IN_PROCESS=False, как в deploy/);
+- bot-help   - bot/main.py --help;
+- bot        - всё, что импортирует main() бота перед запуском.
+
+Каждый сценарий запускается --runs раз отдельным процессом; печатается
+медиана суммарного времени импорта, время процесса целиком и самые
+тяжёлые пакеты. Бюджет: время импорта не больше BUDGETS_MS и ни одного
+тяжёлого SDK из FORBIDDEN (они должны грузиться при первом
+использовании). При нарушении - код выхода 1, так что скрипт годится
+как проверка в CI.
+
+Запуск:
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BOT_DIR = ROOT / 'bot'
+
+SCENARIOS = {
+    'check': (ROOT, ['manage.py', 'check']),
+    'web': (ROOT, ['-c', 'import config.wsgi; from django.urls import get_resolver; get_resolver().url_patterns']),
+    'bot-help': (BOT_DIR, ['main.py', '--help']),
+    'bot': (BOT_DIR, ['-c', 'import main, handlers, scheduler, stats_collector, update_processor, telegram.ext']),
+}
+
+# Суммарное время импорта, мс (с запасом на медленный диск)
+BUDGETS_MS = {
+    'check': 1200,
+    'web': 1200,
+    'bot-help': 300,
+    'bot': 1500,
+}
+
+# Пакеты, которые в сценарии грузиться не должны
+# (check импортирует PIL сам: проверка моделей с ImageField)
+FORBIDDEN = {
+    'check': ('openai', 'vk_api', 'telegram', 'apscheduler'),
+    'web': ('openai', 'vk_api', 'telegram', 'PIL', 'apscheduler'),
+    'bot-help': ('openai', 'vk_api', 'telegram', 'sqlalchemy', 'PIL'),
+    'bot': ('openai', 'vk_api', 'PIL'),
+}
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def run_once(cwd: Path, args: list) -> tuple:
+    """(время процесса, с; {пакет верхнего уровня: мкс}; все модули)"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='config.settings', SCHEDULER_IN_PROCESS='False',
+               PYTHONPATH=str(ROOT))
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=cwd, env=env,
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f'{args} failed:\n{result.stderr[-2000:]}')
+
+    packages = defaultdict(int)
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        modules.add(name)
+        if not indent:
+            # Строки без отступа - импорты верхнего уровня (в т.ч. отложенные), их cumulative не пересекаются
+            packages[name.split('.')[0]] += int(cumulative)
+    return elapsed, packages, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=5, help='Сколько самых тяжёлых пакетов показать')
+    parser.add_argument('--only', choices=list(SCENARIOS), action='append')
+    args = parser.parse_args()
+
+    failures = []
+    for name, (cwd, command) in SCENARIOS.items():
+        if args.only and name not in args.only:
+            continue
+        runs = [run_once(cwd, command) for _ in range(args.runs)]
+        import_ms = statistics.median(sum(packages.values()) for _, packages, _ in runs) / 1000
+        process_ms = statistics.median(elapsed for elapsed, _, _ in runs) * 1000
+        loaded = set().union(*(modules for _, _, modules in runs))
+        forbidden = sorted(p for p in FORBIDDEN[name] if any(m == p or m.startswith(p + '.') for m in loaded))
+
+        ok = import_ms <= BUDGETS_MS[name] and not forbidden
+        print(f'{name:<9} imports {import_ms:7.1f} ms (budget {BUDGETS_MS[name]}), '
+              f'process {process_ms:7.1f} ms  {"OK" if ok else "OVER BUDGET"}')
+        heaviest = defaultdict(list)
+        for _, packages, _ in runs:
+            for package, micros in packages.items():
+                heaviest[package].append(micros)
+        top = sorted(heaviest.items(), key=lambda item: -statistics.median(item[1]))[:args.top]
+        print('          ' + ', '.join(f'{p} {statistics.median(v) / 1000:.0f}' for p, v in top))
+        if forbidden:
+            print(f'          heavy SDKs loaded eagerly: {", ".join(forbidden)}')
+        if not ok:
+            failures.append(name)
+
+    if failures:
+        print(f'startup budget exceeded: {", ".join(failures)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
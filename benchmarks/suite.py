@@ -0,0 +1,333 @@
+"""
+Набор бенчмарков конвейера публикации с фейковыми Telegram, VK и Mistral.
+
+Временная SQLite заполняется --posts постами (с публикациями и
+черновиками - масштаб базы, 1k-100k), фейковые API отвечают с задержкой
+--latency / --ai-latency и долей ошибок --error-rate. Сценарии:
+
+- publish_post    - apps.publishers.manager.publish_post для --ops
+                    одобренных постов (Telegram + VK);
+- check_scheduled - один проход check_scheduled_posts по --ops просроченным
+                    постам (операция - публикация одного поста);
+- generate        - ContentGenerator.create_post_from_project для --ops
+                    проектов;
+- bot             - benchmarks/bot_load.py подпроцессом: --bot-users
+                    пользователей проходят /ai и /publish (операция - /publish).
+
+Для каждого сценария: число операций и ошибок, время, пропускная
+способность (операций в секунду), задержка p50/p99 и число SQL-запросов
+(всего и на операцию; у бота - своя база в подпроцессе, не считается).
+
+Результат пишется в JSON (--output, по умолчанию
+benchmarks/results/<коммит>.json). С --compare старый файл сравнивается с
+новым: изменения печатаются, при регрессии больше --threshold - код выхода 1.
+
+Запуск:
+    python benchmarks/suite.py --posts 10000 --ops 200
+    python benchmarks/suite.py --posts 10000 --ops 200 --compare benchmarks/results/2932b5f.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from crawler_fixture import setup_django
+from fake_mistral import FakeMistral
+from fake_telegram import FAKE_TOKEN, FakeTelegram
+from fake_vk import FakeVK
+from publish_metrics import route_publishers, start_in_thread
+
+ROOT = Path(__file__).resolve().parent.parent
+SCENARIOS = ('publish_post', 'check_scheduled', 'generate', 'bot')
+BATCH_SIZE = 5000
+
+
+def git_commit() -> tuple:
+    """(короткий хеш HEAD, есть ли незакоммиченные изменения)"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return git('rev-parse', '--short', 'HEAD') or 'unknown', bool(git('status', '--porcelain', '--untracked-files=no'))
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def summarize(latencies: list, seconds: float, errors: int, queries=None) -> dict:
+    ops = len(latencies)
+    return {
+        'ops': ops,
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'throughput': round(ops / seconds, 2) if seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'queries': queries,
+        'queries_per_op': round(queries / ops, 2) if queries is not None and ops else None,
+    }
+
+
+def seed(posts: int, platforms: list):
+    """Фон для масштаба: опубликованные посты с записями Publication и черновики"""
+    from apps.posts.models import Post, Publication
+
+    now = datetime.now().astimezone()
+    Through = Post.platforms.through
+    for start in range(0, posts, BATCH_SIZE):
+        batch = Post.objects.bulk_create([
+            Post(title=f'Архив {i}', content='Бассейн под ключ ' * 40,
+                 status='published' if i % 4 else 'draft',
+                 scheduled_time=now - timedelta(days=i % 365) if i % 4 else None)
+            for i in range(start, min(start + BATCH_SIZE, posts))
+        ])
+        Through.objects.bulk_create([
+            Through(post_id=post.id, platform_id=p.id) for post in batch for p in platforms
+        ])
+        Publication.objects.bulk_create([
+            Publication(post=post, platform=p, status='success', external_id=str(post.id))
+            for post in batch if post.status == 'published' for p in platforms
+        ])
+
+
+def make_posts(count: int, platforms: list, **fields) -> list:
+    from apps.posts.models import Post
+
+    posts = Post.objects.bulk_create([
+        Post(title=f'Пост {i}', content='Бассейн под ключ ' * 40, **fields) for i in range(count)
+    ])
+    Through = Post.platforms.through
+    Through.objects.bulk_create([Through(post_id=post.id, platform_id=p.id) for post in posts for p in platforms])
+    return posts
+
+
+class QueryCounter:
+    """Число SQL-запросов основного соединения (без хранения самих запросов)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(label: str, run) -> dict:
+    """run(latencies) -> число ошибок; считает время и запросы"""
+    from django.db import connection
+
+    counter = QueryCounter()
+    latencies = []
+    started = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        errors = run(latencies)
+    result = summarize(latencies, time.perf_counter() - started, errors, counter.count)
+    print(f'  {label:<16} {result["ops"]:6d} ops  {result["throughput"]:8.1f} ops/s  '
+          f'p50 {result["p50_ms"]:8.1f} ms  p99 {result["p99_ms"]:8.1f} ms  '
+          f'{result["queries_per_op"]:6.1f} queries/op  errors {result["errors"]}')
+    return result
+
+
+def scenario_publish_post(args, platforms) -> dict:
+    from apps.publishers.manager import publish_post
+
+    posts = make_posts(args.ops, platforms, status='approved')
+
+    def run(latencies):
+        errors = 0
+        for post in posts:
+            started = time.perf_counter()
+            results = publish_post(post)
+            latencies.append(time.perf_counter() - started)
+            errors += sum(1 for r in results if not r['success'])
+        return errors
+
+    return measure('publish_post', run)
+
+
+def scenario_check_scheduled(args, platforms) -> dict:
+    from django.utils import timezone
+    from apps.scheduler import scheduler
+
+    posts = make_posts(args.ops, platforms, status='scheduled', scheduled_time=timezone.now() - timedelta(minutes=1))
+    publish_single_post = scheduler.publish_single_post
+
+    def run(latencies):
+        # check_scheduled_posts вызывает publish_single_post из глобалов модуля - замеряем каждый вызов
+        def timed_publish(post_id):
+            started = time.perf_counter()
+            try:
+                publish_single_post(post_id)
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+        scheduler.publish_single_post = timed_publish
+        try:
+            scheduler.check_scheduled_posts()
+        finally:
+            scheduler.publish_single_post = publish_single_post
+
+        from apps.posts.models import Publication
+        return Publication.objects.filter(post__in=posts, status='failed').count()
+
+    return measure('check_scheduled', run)
+
+
+def scenario_generate(args, mistral: FakeMistral) -> dict:
+    from apps.posts.models import ProjectData
+    from apps.posts.services.content_generator import ContentGenerator
+
+    projects = ProjectData.objects.bulk_create([
+        ProjectData(title=f'Бассейн в коттедже №{i}', pool_type='concrete', size='8x4 м',
+                    features='Противоток, подсветка', location='Московская область')
+        for i in range(args.ops)
+    ])
+    generator = ContentGenerator()
+    errors_before = mistral.errors
+
+    def run(latencies):
+        for project in projects:
+            started = time.perf_counter()
+            generator.create_post_from_project(project)
+            latencies.append(time.perf_counter() - started)
+        return mistral.errors - errors_before
+
+    return measure('generate', run)
+
+
+def scenario_bot(args, workdir: str) -> dict:
+    """bot_load.py подпроцессом: у бота свой config и своя база, с Django в одном процессе не уживается"""
+    output = os.path.join(workdir, 'bot_load.json')
+    subprocess.run([
+        sys.executable, str(ROOT / 'benchmarks' / 'bot_load.py'),
+        '--users', str(args.bot_users), '--concurrency', str(args.bot_concurrency),
+        '--telegram-latency', str(args.latency), '--ai-latency', str(args.ai_latency),
+        '--error-rate', str(args.error_rate), '--timeout', '60', '--json', output,
+    ], check=True, stdout=subprocess.DEVNULL)
+    with open(output) as f:
+        run = json.load(f)[0]
+    result = summarize(run['publish'], run['seconds'], run['failed'] + run['api_errors'])
+    result['users'] = run['users']
+    result['ai_p50_ms'] = round(percentile(run['ai'], 0.5) * 1000, 2)
+    result['ai_p99_ms'] = round(percentile(run['ai'], 0.99) * 1000, 2)
+    print(f'  {"bot":<16} {result["ops"]:6d} ops  {result["throughput"]:8.1f} ops/s  '
+          f'p50 {result["p50_ms"]:8.1f} ms  p99 {result["p99_ms"]:8.1f} ms  '
+          f'/ai p99 {result["ai_p99_ms"]:.1f} ms  errors {result["errors"]}')
+    return result
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Печатает изменения по сценариям; возвращает список регрессий"""
+    regressions = []
+    print(f'compared with {baseline["commit"]} ({baseline["created_at"]}):')
+    for name, new in current['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if not old:
+            continue
+        changes = []
+        # (метрика, больше - лучше)
+        for metric, higher_is_better in (('throughput', True), ('p50_ms', False), ('p99_ms', False),
+                                         ('queries_per_op', False)):
+            if old.get(metric) in (None, 0) or new.get(metric) is None:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            changes.append(f'{metric} {old[metric]:g} -> {new[metric]:g} ({change:+.0%})')
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f'{name}.{metric}')
+        print(f'  {name:<16} ' + ', '.join(changes))
+    return regressions
+
+
+def run(args):
+    from django.conf import settings
+    workdir = tempfile.mkdtemp(prefix='suite_')
+    # У каждого фейка свой seed - ошибки в разных сервисах не совпадают по номеру вызова
+    telegram = FakeTelegram(latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    start_in_thread(telegram)
+    vk = FakeVK(latency=args.latency, error_rate=args.error_rate, seed=args.seed + 1).start_in_thread()
+    mistral = FakeMistral(latency=args.ai_latency, error_rate=args.error_rate, seed=args.seed + 2)
+    start_in_thread(mistral)
+
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    settings.MISTRAL_API_KEY = 'fake'
+    settings.MISTRAL_API_BASE = mistral.base_url
+    setup_django(os.path.join(workdir, 'db.sqlite3'))
+    route_publishers(telegram, vk)
+
+    from apps.posts.models import Platform
+    platforms = [
+        Platform.objects.create(name='telegram', display_name='Telegram', api_token=FAKE_TOKEN,
+                                channel_id='@bench', is_active=True),
+        Platform.objects.create(name='vk', display_name='VK', api_token='vk-token', channel_id='1', is_active=True),
+    ]
+
+    started = time.perf_counter()
+    seed(args.posts, platforms)
+    seed_seconds = time.perf_counter() - started
+    print(f'{args.posts} posts seeded in {seed_seconds:.1f}s; {args.ops} ops per scenario, '
+          f'API latency {args.latency * 1000:.0f} ms, AI {args.ai_latency * 1000:.0f} ms, '
+          f'error rate {args.error_rate:.0%}')
+
+    scenarios = {}
+    for name in args.scenarios:
+        if name == 'publish_post':
+            scenarios[name] = scenario_publish_post(args, platforms)
+        elif name == 'check_scheduled':
+            scenarios[name] = scenario_check_scheduled(args, platforms)
+        elif name == 'generate':
+            scenarios[name] = scenario_generate(args, mistral)
+        elif name == 'bot':
+            scenarios[name] = scenario_bot(args, workdir)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    commit, dirty = git_commit()
+    params = {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}
+    return {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'params': params,
+        'seed_seconds': round(seed_seconds, 1),
+        'scenarios': scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=1000, help='Постов в базе до начала замеров')
+    parser.add_argument('--ops', type=int, default=100, help='Операций в каждом сценарии')
+    parser.add_argument('--latency', type=float, default=0.02, help='Задержка Telegram/VK на вызов, секунды')
+    parser.add_argument('--ai-latency', type=float, default=0.1, help='Задержка Mistral на запрос, секунды')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов с ошибкой у всех фейков')
+    parser.add_argument('--seed', type=int, default=1, help='Seed для ошибок фейков (повторяемость)')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--bot-users', type=int, default=50)
+    parser.add_argument('--bot-concurrency', type=int, default=32, help='CONCURRENT_UPDATES бота')
+    parser.add_argument('--output', help='Файл JSON (по умолчанию benchmarks/results/<коммит>.json)')
+    parser.add_argument('--compare', help='Предыдущий файл JSON для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Допустимое ухудшение (доля)')
+    args = parser.parse_args()
+
+    result = run(args)
+    output = Path(args.output or ROOT / 'benchmarks' / 'results' / f'{result["commit"]}.json')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f'results: {output}')
+
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text()), result, args.threshold)
+        if regressions:
+            print(f'regressions over {args.threshold:.0%}: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Сбор просмотров постов Telegram-канала (bot/stats_collector.py).
+
+Просмотры берутся со страницы публичного канала t.me/s/<канал>
+(фейковая - benchmarks/fake_telegram.py): одна страница - до 20 постов.
+Публикации бота - каждый третий пост канала (остальное - альбомы и посты
+не из бота), возраст 0..45 дней, часть постов удалена из канала.
+
+1. Один проход: запросов к t.me, сколько публикаций обновлено.
+2. Сутки работы (проходы раз в STATS_INTERVAL): запросов, обновлений и
+   снимков во временном ряду против запроса на каждый пост каждый проход.
+3. Реакции: обновление message_reaction_count записывается в статистику.
+
+Запуск:
+    python benchmarks/telegram_stats.py --publications 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fake_telegram import BOT_DIR, FakeTelegram
+
+CHANNEL = "mospool_test"
+FAKE = FakeTelegram()
+WORKDIR = tempfile.mkdtemp(prefix="telegram_stats_")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bot.db"
+os.environ["STORAGE_BACKEND"] = "bot"
+os.environ["TELEGRAM_WIDGET_URL"] = FAKE.widget_url
+sys.path.insert(0, str(BOT_DIR))
+
+from config import STATS_INTERVAL, STATS_MAX_AGE_DAYS  # noqa: E402
+from database import init_db, get_session, Post, Publication, PublicationStat  # noqa: E402
+from stats_collector import collect_channel_stats, reaction_count_callback  # noqa: E402
+
+
+def start_fake():
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(FAKE.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+
+
+def seed(count: int, now: datetime) -> list:
+    """Посты канала и публикации бота (каждый третий пост)"""
+    rng = random.Random(1)
+    message_ids = [3 * (i + 1) for i in range(count)]
+    FAKE.channel_posts[CHANNEL] = {
+        message_id: message_id * 7 for message_id in range(1, 3 * count + 1)
+        if message_id % 301  # Удалённые из канала
+    }
+
+    init_db()
+    session = get_session()
+    try:
+        post = Post(content="Бассейн под ключ", status="published", channels=["telegram"])
+        session.add(post)
+        session.flush()
+        # Чем больше id, тем новее пост
+        ages = sorted((rng.uniform(0, 45 * 86400) for _ in range(count)), reverse=True)
+        session.bulk_insert_mappings(Publication, [
+            {
+                "post_id": post.id, "channel_type": "telegram", "channel_id": f"@{CHANNEL}",
+                "status": "success", "external_id": str(message_id),
+                "published_at": now - timedelta(seconds=age),
+            }
+            for message_id, age in zip(message_ids, ages)
+        ])
+        session.commit()
+    finally:
+        session.close()
+    return message_ids
+
+
+def count(query_filter=None, model=Publication) -> int:
+    session = get_session()
+    try:
+        query = session.query(model)
+        return (query.filter(query_filter) if query_filter is not None else query).count()
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--publications", type=int, default=2000)
+    args = parser.parse_args()
+
+    start_fake()
+    now = datetime.utcnow()
+    message_ids = seed(args.publications, now)
+    eligible = count(Publication.published_at >= now - timedelta(days=STATS_MAX_AGE_DAYS))
+    print(f"{args.publications} Telegram publications ({eligible} younger than {STATS_MAX_AGE_DAYS} days), "
+          f"pass every {STATS_INTERVAL}s")
+
+    started = time.perf_counter()
+    updated = collect_channel_stats("telegram", now=now)
+    print(f"  one pass:   {time.perf_counter() - started:6.2f}s, {FAKE.widget_requests} requests, "
+          f"{updated} publications")
+
+    FAKE.widget_requests = 0
+    refreshed = 0
+    passes = 86400 // STATS_INTERVAL
+    for i in range(1, passes + 1):
+        refreshed += collect_channel_stats("telegram", now=now + timedelta(seconds=i * STATS_INTERVAL))
+    print(f"  24 hours:   {FAKE.widget_requests} requests, {refreshed} refreshes, "
+          f"{count(model=PublicationStat)} snapshots, "
+          f"{count(Publication.stats_updated_at != None)} publications have stats")
+    print(f"  naive:      {passes * eligible} requests (every publication every pass, one by one)")
+
+    session = get_session()
+    try:
+        latest = session.query(Publication).filter(Publication.external_id == str(message_ids[-1])).one()
+        assert latest.stats["views"] == message_ids[-1] * 7, latest.stats
+        # Самая свежая удалённая из канала публикация бота
+        deleted_id = max(message_id for message_id in message_ids if message_id % 301 == 0)
+        deleted = session.query(Publication).filter(Publication.external_id == str(deleted_id)).one()
+        assert deleted.stats.get("deleted"), deleted.stats
+    finally:
+        session.close()
+
+    # Реакции: Telegram присылает итоговые счётчики поста
+    update = SimpleNamespace(message_reaction_count=SimpleNamespace(
+        chat=SimpleNamespace(id=-100123, username=CHANNEL),
+        message_id=message_ids[-1],
+        reactions=[SimpleNamespace(total_count=5), SimpleNamespace(total_count=2)],
+    ))
+    asyncio.run(reaction_count_callback(update, None))
+    session = get_session()
+    try:
+        latest = session.query(Publication).filter(Publication.external_id == str(message_ids[-1])).one()
+        print(f"  reactions:  {latest.stats}")
+        assert latest.stats["reactions"] == 7
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
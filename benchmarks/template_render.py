@@ -0,0 +1,89 @@
+"""
+Скорость рендера шаблонов постов: прежний TemplateEngine.generate
+(str.format + разбиение на строки при каждом вызове) против
+предкомпилированных шаблонов (apps/posts/services/template_renderer.py).
+
+Запуск:
+    python benchmarks/template_render.py --renders 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+from apps.posts.services.content_generator import TemplateEngine  # noqa: E402
+from apps.posts.services.template_renderer import compile_templates  # noqa: E402
+
+DATA = {
+    'title': 'Бассейн в коттедже',
+    'description': 'Построили бетонный бассейн под ключ за 45 дней.',
+    'pool_type': 'Бетонный',
+    'size': '8x4 м',
+    'features': '',  # Пустое поле - будут пустые строки для схлопывания
+    'location': 'Истра',
+    'hashtags': '#бассейн #бассейнподключ #бетонныйбассейн',
+}
+
+DEFAULTS = {
+    'title': 'Новый пост', 'description': '', 'content': '', 'pool_type': 'бассейн',
+    'size': '', 'features': '', 'location': 'Москва и МО',
+}
+
+
+def legacy_render(template: str, data: dict) -> str:
+    """Прежний алгоритм TemplateEngine.generate (без выбора хештегов)"""
+    data = dict(data)
+    for key, default_value in DEFAULTS.items():
+        if key not in data or not data[key]:
+            data[key] = default_value
+    result = template.format(**data)
+    lines = result.split('\n')
+    cleaned_lines = []
+    prev_empty = False
+    for line in lines:
+        is_empty = not line.strip()
+        if not (is_empty and prev_empty):
+            cleaned_lines.append(line)
+        prev_empty = is_empty
+    return '\n'.join(cleaned_lines)
+
+
+def measure(name: str, render, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        render()
+    elapsed = time.perf_counter() - started
+    print(f'  {name:<12} {count / elapsed:>12,.0f} renders/s')
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--renders', type=int, default=200_000)
+    args = parser.parse_args()
+
+    texts = [text for group in TemplateEngine.TEMPLATES.values() for text in group]
+    compiled = [r for group in compile_templates(TemplateEngine.TEMPLATES).values() for r in group]
+
+    # Результаты должны совпадать
+    for text, renderer in zip(texts, compiled):
+        assert legacy_render(text, DATA) == renderer.render(DATA), renderer
+
+    pairs = list(zip(texts, compiled))
+    random.seed(1)
+    picks = [random.choice(pairs) for _ in range(1024)]
+
+    print(f'{len(texts)} templates, {args.renders:,} renders')
+    i = iter(range(10 ** 12))
+    legacy = measure('legacy', lambda: legacy_render(picks[next(i) & 1023][0], DATA), args.renders)
+    new = measure('compiled', lambda: picks[next(i) & 1023][1].render(DATA), args.renders)
+    print(f'  speedup      {new / legacy:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
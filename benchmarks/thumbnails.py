@@ -0,0 +1,101 @@
+"""
+Превью в списках постов (apps/posts/services/thumbnails.py).
+
+Временные SQLite и MEDIA_ROOT: N постов с "фото с телефона" (несколько
+разных картинок, часть постов делит одну - проверка дедупликации по
+содержимому). Сохранение поста ставит сборку превью в пул; считается:
+
+- сколько байт картинок тянет страница /posts/ с оригиналами и с превью;
+- время ответа страницы (сборка превью идёт вне запроса);
+- время до готовности всех превью и число файлов превью;
+- заголовки ответа на превью (Cache-Control).
+
+Запуск:
+    python benchmarks/thumbnails.py --posts 24 --photos 6
+"""
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from crawler_fixture import setup_django
+from image_renditions import make_photo
+
+
+def page_image_bytes(html: str, media_root: str, media_url: str) -> int:
+    """Сумма размеров картинок, на которые ссылается страница (<img src>)"""
+    total = 0
+    for url in re.findall(r'<img src="([^"]+)"', html):
+        path = os.path.join(media_root, url.split(media_url, 1)[1])
+        total += os.path.getsize(path)
+    return total
+
+
+def run(args):
+    from django.conf import settings
+    workdir = tempfile.mkdtemp(prefix='thumbnails_')
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    settings.ALLOWED_HOSTS = ['*']
+    setup_django(os.path.join(workdir, 'db.sqlite3'))
+
+    from django.core.files import File
+    from django.test import Client
+    from apps.posts.models import Post
+    from apps.posts.services import thumbnails
+
+    photos = []
+    for i in range(args.photos):
+        path = os.path.join(workdir, f'photo{i}.jpg')
+        make_photo(path)
+        photos.append(path)
+
+    started = time.perf_counter()
+    for i in range(args.posts):
+        post = Post(title=f'Пост {i}', content='Бассейн под ключ')
+        with open(photos[i % len(photos)], 'rb') as f:
+            post.image.save(f'photo{i}.jpg', File(f), save=True)
+    print(f'{args.posts} posts with {args.photos} distinct photos, saved in {time.perf_counter() - started:.2f}s')
+
+    client = Client()
+    media_url = settings.MEDIA_URL
+
+    started = time.perf_counter()
+    client.get('/posts/')
+    first = time.perf_counter() - started
+
+    started = time.perf_counter()
+    while thumbnails._pending:
+        time.sleep(0.01)
+    ready = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = client.get('/posts/')
+    warm = time.perf_counter() - started
+    html = response.content.decode()
+
+    originals = sum(os.path.getsize(post.image.path) for post in Post.objects.all())
+    thumbs = page_image_bytes(html, settings.MEDIA_ROOT, media_url)
+    thumb_files = [name for _, _, names in os.walk(thumbnails.thumbs_root()) for name in names
+                   if name.endswith(('.webp', '.jpg'))]
+    print(f'  page images: originals {originals / 1e6:7.2f} MB -> thumbnails (jpg) {thumbs / 1e3:7.1f} KB')
+    print(f'  /posts/ first {first * 1000:6.1f} ms (placeholders), after build {warm * 1000:6.1f} ms')
+    print(f'  thumbnails ready {ready:5.2f}s after the first request; '
+          f'{len(thumb_files)} files (webp + jpg) for {args.photos} distinct photos')
+
+    url = re.search(r'<img src="([^"]+)"', html).group(1)
+    response = client.get(url)
+    print(f'  GET {url[:40]}... {response.status_code} Cache-Control: {response["Cache-Control"]}')
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=24)
+    parser.add_argument('--photos', type=int, default=6)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Приём загрузок (apps/posts/services/uploads.py).
+
+Временные SQLite и MEDIA_ROOT. Через тестовый клиент Django:
+
+1. Одно и то же "фото с телефона" загружается в N постов: пик памяти
+   Python на запрос (tracemalloc, тело запроса собрано заранее) и сколько
+   байт легло в MEDIA_ROOT против N копий.
+2. Файл больше UPLOAD_MAX_SIZE и "пиксельная бомба" (PNG на 20000x20000,
+   весит килобайты) - отклоняются, ничего не сохраняется.
+
+Запуск:
+    python benchmarks/uploads.py --posts 10
+"""
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from crawler_fixture import setup_django
+from image_renditions import make_photo
+
+
+def prepared_request(client, path: str, data: dict) -> dict:
+    """Окружение WSGI для POST-запроса (тело закодировано заранее)"""
+    captured = {}
+    client.request = lambda **request: captured.update(request)
+    try:
+        client.post(path, data)
+    finally:
+        del client.request
+    return captured
+
+
+def media_bytes(root: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name))
+               for path, _, names in os.walk(root) for name in names
+               if not path.startswith(os.path.join(root, 'thumbs')))
+
+
+def run(args):
+    from django.conf import settings
+    workdir = tempfile.mkdtemp(prefix='uploads_')
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    settings.ALLOWED_HOSTS = ['*']
+    setup_django(os.path.join(workdir, 'db.sqlite3'))
+
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from apps.posts.models import Post
+
+    setup_test_environment()  # response.context - для сообщений об отклонении
+
+    photo = os.path.join(workdir, 'photo.jpg')
+    make_photo(photo)
+    size = os.path.getsize(photo)
+    client = Client()
+
+    peaks, elapsed = [], []
+    for i in range(args.posts):
+        with open(photo, 'rb') as f:
+            request = prepared_request(client, '/posts/create/', {'title': f'Пост {i}', 'image': f})
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = client.request(**request)
+        elapsed.append(time.perf_counter() - started)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert response.status_code == 302, response.status_code
+
+    names = set(Post.objects.values_list('image', flat=True))
+    stored = media_bytes(settings.MEDIA_ROOT)
+    print(f'{args.posts} uploads of one {size / 1e6:.1f} MB photo')
+    print(f'  per request: {sum(elapsed) / len(elapsed) * 1000:6.1f} ms, '
+          f'peak Python memory {max(peaks) / 1e6:5.2f} MB')
+    print(f'  MEDIA_ROOT: {stored / 1e6:6.1f} MB in {len(names)} file(s), '
+          f'without dedup {args.posts * size / 1e6:6.1f} MB')
+
+    from PIL import Image
+    bomb = io.BytesIO()
+    Image.new('1', (20000, 20000)).save(bomb, 'PNG')
+    bomb.name = 'bomb.png'
+    big = io.BytesIO(open(photo, 'rb').read() * (settings.UPLOAD_MAX_SIZE // size + 1))
+    big.name = 'big.jpg'
+
+    for label, upload in (('pixel bomb', bomb), ('oversized', big)):
+        upload.seek(0)
+        before = Post.objects.exclude(image='').count()
+        started = time.perf_counter()
+        response = client.post('/posts/create/', {'title': label, 'image': upload}, follow=True)
+        errors = [str(m) for m in response.context['messages'] if m.level_tag == 'error']
+        assert Post.objects.exclude(image='').count() == before
+        print(f'  {label:<10} {len(upload.getvalue()) / 1e6:6.2f} MB rejected in '
+              f'{(time.perf_counter() - started) * 1000:6.1f} ms: {errors[0]}')
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=10)
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Сбор статистики VK-публикаций бота (bot/stats_collector.py) против
+прежнего get_post_stats - одного wall.getById на пост.
+
+VK - фейковый (benchmarks/fake_vk.py), ограничение vk_api 3 запроса/с
+сохраняется. Публикации равномерно распределены по возрасту 0..45 дней,
+часть постов "удалена" со стены.
+
+1. Прежний способ: время на выборку постов, экстраполяция на все.
+2. Один проход сборщика: запросы, время, сколько записано.
+3. Сутки работы (проходы раз в STATS_INTERVAL, без задержки vk_api):
+   запросов к VK и обновлений против опроса всех публикаций каждый проход.
+
+Запуск:
+    python benchmarks/vk_stats.py --publications 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fake_telegram import BOT_DIR
+from fake_vk import FakeVK
+
+WORKDIR = tempfile.mkdtemp(prefix="vk_stats_")
+GROUP_ID = 12345
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bot.db"
+os.environ["STORAGE_BACKEND"] = "bot"
+os.environ["VK_ACCESS_TOKEN"] = "fake"
+os.environ["VK_GROUP_ID"] = str(GROUP_ID)
+sys.path.insert(0, str(BOT_DIR))
+
+from config import STATS_INTERVAL, STATS_MAX_AGE_DAYS  # noqa: E402
+from database import init_db, get_session, Post, Publication  # noqa: E402
+from stats_collector import collect_channel_stats  # noqa: E402
+from utils.vk_client import get_vk_client  # noqa: E402
+
+
+def seed(count: int, now: datetime) -> list:
+    """Публикации возрастом 0..45 дней; возвращает ID постов VK"""
+    init_db()
+    session = get_session()
+    try:
+        post = Post(content="Бассейн под ключ", status="published", channels=["vk"])
+        session.add(post)
+        session.flush()
+        rng = random.Random(1)
+        session.bulk_insert_mappings(Publication, [
+            {
+                "post_id": post.id, "channel_type": "vk", "channel_id": str(GROUP_ID),
+                "status": "success", "external_id": str(i + 1),
+                "published_at": now - timedelta(seconds=rng.uniform(0, 45 * 86400)),
+            }
+            for i in range(count)
+        ])
+        session.commit()
+    finally:
+        session.close()
+    return list(range(1, count + 1))
+
+
+def collected() -> int:
+    session = get_session()
+    try:
+        return session.query(Publication).filter(Publication.stats_updated_at != None).count()
+    finally:
+        session.close()
+
+
+def eligible(now: datetime) -> int:
+    """Публикации не старше STATS_MAX_AGE_DAYS"""
+    session = get_session()
+    try:
+        return session.query(Publication).filter(
+            Publication.published_at >= now - timedelta(days=STATS_MAX_AGE_DAYS)
+        ).count()
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--publications", type=int, default=2000)
+    parser.add_argument("--legacy-sample", type=int, default=20)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    post_ids = seed(args.publications, now)
+    fake = FakeVK(deleted=post_ids[::97]).start_in_thread()
+    client = get_vk_client()
+    fake.route(client.session)
+    print(f"{args.publications} VK publications, max age {STATS_MAX_AGE_DAYS} days, "
+          f"pass every {STATS_INTERVAL}s")
+
+    started = time.perf_counter()
+    for post_id in post_ids[:args.legacy_sample]:
+        client.get_post_stats(post_id)
+    per_post = (time.perf_counter() - started) / args.legacy_sample
+    print(f"  per post:   {per_post * 1000:6.0f} ms/request -> "
+          f"{per_post * args.publications:6.1f}s and {args.publications} requests for all")
+
+    fake.calls.clear()
+    started = time.perf_counter()
+    updated = collect_channel_stats("vk", now=now)
+    print(f"  one pass:   {time.perf_counter() - started:6.1f}s, {fake.calls['wall.getById']} requests, "
+          f"{updated} publications")
+
+    # Сутки проходов: без задержки vk_api, считаем запросы
+    client.session.RPS_DELAY = 0
+    fake.calls.clear()
+    refreshed = 0
+    passes = 86400 // STATS_INTERVAL
+    for i in range(1, passes + 1):
+        refreshed += collect_channel_stats("vk", now=now + timedelta(seconds=i * STATS_INTERVAL))
+    print(f"  24 hours:   {fake.calls['wall.getById']} requests, {refreshed} refreshes "
+          f"({collected()} publications have stats)")
+
+    print(f"  naive:      {passes * eligible(now)} requests "
+          f"(every publication every pass, one by one)")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,17 @@ DATA_DIR.mkdir(exist_ok=True)
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHANNEL_ID = os.getenv("TELEGRAM_CHANNEL_ID", "")
 TELEGRAM_TEST_CHANNEL_ID = os.getenv("TELEGRAM_TEST_CHANNEL_ID", "")
+# Свой адрес Bot API (например, локальный фейковый сервер для тестов)
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "")
+
+# Режим получения обновлений: polling или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # Публичный адрес, например https://bot.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", os.getenv("PORT", "8443")))
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
 
 # VK
 VK_ACCESS_TOKEN = os.getenv("VK_ACCESS_TOKEN", "")
@@ -24,7 +35,7 @@ VK_GROUP_ID = os.getenv("VK_GROUP_ID", "")
 
 # Mistral AI
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY", "")
-MISTRAL_API_BASE = "https://api.mistral.ai/v1"
+MISTRAL_API_BASE = os.getenv("MISTRAL_API_BASE", "https://api.mistral.ai/v1")
 MISTRAL_MODEL = "mistral-small-latest"
 
 # Admin
@@ -33,12 +44,77 @@ ADMIN_TELEGRAM_ID = int(os.getenv("ADMIN_TELEGRAM_ID", "0"))
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DATA_DIR}/bot.db")
 
+# Хранилище постов: "bot" - собственные таблицы бота,
+# "django" - общие таблицы веб-приложения (один планировщик и одна очередь)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "bot")
+DJANGO_DATABASE_URL = os.getenv(
+    "DJANGO_DATABASE_URL", f"sqlite:///{BASE_DIR.parent / 'db.sqlite3'}"
+)
+DJANGO_MEDIA_ROOT = Path(os.getenv("DJANGO_MEDIA_ROOT", BASE_DIR.parent / "media"))
+
+# SQLite: ожидание блокировки (секунды; busy_timeout задаёт именно он, не PRAGMA)
+# и PRAGMA для каждого соединения (те же, что в config/sqlite.py веб-приложения)
+SQLITE_TIMEOUT = int(os.getenv("SQLITE_TIMEOUT", "20"))
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,
+    "temp_store": "MEMORY",
+}
+
 # Лимиты
 MAX_POSTS_PER_DAY = 10
 MIN_POST_LENGTH = 20
 MAX_POST_LENGTH = 4096
 MAX_MEDIA_FILES = 10
 
+# Планировщик публикаций: интервал проверки (секунды) и размер пачки
+SCHEDULER_INTERVAL = int(os.getenv("SCHEDULER_INTERVAL", "60"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "10"))
+# Через сколько секунд взятая, но не завершённая публикация (бот упал) снова в очереди
+SCHEDULER_CLAIM_TIMEOUT = int(os.getenv("SCHEDULER_CLAIM_TIMEOUT", "600"))
+# Публикация, не ушедшая ни в один канал: повтор через SCHEDULER_RETRY_DELAY секунд
+# (удваивается с каждой попыткой), после SCHEDULER_MAX_ATTEMPTS попыток - отказ
+SCHEDULER_RETRY_DELAY = int(os.getenv("SCHEDULER_RETRY_DELAY", "300"))
+SCHEDULER_MAX_ATTEMPTS = int(os.getenv("SCHEDULER_MAX_ATTEMPTS", "5"))
+
+# Сбор статистики публикаций (просмотры, лайки): задача раз в STATS_INTERVAL
+# секунд. Свежие публикации обновляются часто, старые - всё реже (период -
+# десятая часть возраста, от STATS_MIN_REFRESH до STATS_MAX_REFRESH секунд),
+# старше STATS_MAX_AGE_DAYS дней - больше не обновляются. За один проход -
+# не больше STATS_VK_REQUESTS запросов к VK (до 100 постов в каждом).
+# Снимки статистики копятся в таблице publication_stats.
+STATS_INTERVAL = int(os.getenv("STATS_INTERVAL", "300"))
+STATS_MIN_REFRESH = int(os.getenv("STATS_MIN_REFRESH", "600"))
+STATS_MAX_REFRESH = int(os.getenv("STATS_MAX_REFRESH", "86400"))
+STATS_MAX_AGE_DAYS = int(os.getenv("STATS_MAX_AGE_DAYS", "30"))
+STATS_VK_REQUESTS = int(os.getenv("STATS_VK_REQUESTS", "5"))
+# Telegram: Bot API не отдаёт просмотры, их берём со страницы публичного
+# канала https://t.me/s/<канал> (до 20 постов за запрос); реакции приходят
+# обновлениями message_reaction_count (бот - администратор канала)
+STATS_TELEGRAM_REQUESTS = int(os.getenv("STATS_TELEGRAM_REQUESTS", "10"))
+TELEGRAM_WIDGET_URL = os.getenv("TELEGRAM_WIDGET_URL", "https://t.me")
+
+# Параллельная обработка обновлений: сколько одновременно (1 - последовательно).
+# Обновления одного чата всё равно обрабатываются по порядку.
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "32"))
+
+# Состояние диалогов (context.user_data и шаги ConversationHandler) переживает
+# перезапуск: хранится в файле и сбрасывается на диск раз в PERSISTENCE_INTERVAL
+# секунд и при остановке. Пустой PERSISTENCE_FILE - только в памяти.
+PERSISTENCE_FILE = os.getenv("PERSISTENCE_FILE", str(DATA_DIR / "conversations.pickle"))
+PERSISTENCE_INTERVAL = int(os.getenv("PERSISTENCE_INTERVAL", "30"))
+# Незавершённый диалог (/ai, /new, /register) сбрасывается через CONVERSATION_TIMEOUT
+# секунд бездействия (0 - не сбрасывать); его команда входа всегда начинает заново
+CONVERSATION_TIMEOUT = int(os.getenv("CONVERSATION_TIMEOUT", "1800"))
+
+# Метрики Prometheus (время этапов публикации): порт HTTP /metrics, 0 - выключено
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Кэш пользователей для проверки прав (секунды)
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+
 # Роли
 class Role:
     ADMIN = "admin"
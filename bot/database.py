@@ -1,14 +1,38 @@
 """
 MOS-POOL Bot - Модели базы данных
 """
+import time
 from datetime import datetime
-from typing import Optional, List
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON
+from typing import Optional, List, Dict, Tuple
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
-from config import DATABASE_URL
+from config import DATABASE_URL, USER_CACHE_TTL, SQLITE_TIMEOUT, SQLITE_PRAGMAS
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL и прочие PRAGMA для каждого соединения"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str):
+    """Создать engine; для SQLite - с таймаутом блокировки и PRAGMA"""
+    is_sqlite = url.startswith("sqlite")
+    db_engine = create_engine(
+        url,
+        echo=False,
+        connect_args={"timeout": SQLITE_TIMEOUT} if is_sqlite else {},
+    )
+    if is_sqlite:
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
 
 # База
-engine = create_engine(DATABASE_URL, echo=False)
+engine = create_db_engine(DATABASE_URL)
 Base = declarative_base()
 Session = sessionmaker(bind=engine)
 
@@ -92,6 +116,10 @@ class Post(Base):
 class Publication(Base):
     """Запись о публикации"""
     __tablename__ = "publications"
+    __table_args__ = (
+        # Выборка для сбора статистики: канал + свежие публикации
+        Index("ix_publications_channel_published", "channel_type", "published_at"),
+    )
     
     id = Column(Integer, primary_key=True)
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
@@ -106,11 +134,31 @@ class Publication(Base):
     
     published_at = Column(DateTime, default=datetime.utcnow)
     stats = Column(JSON, default=dict)  # Статистика: views, likes и т.д.
+    stats_updated_at = Column(DateTime)  # Когда статистика собрана последний раз
     
     # Связи
     post = relationship("Post", back_populates="publications")
 
 
+class PublicationStat(Base):
+    """Снимок статистики публикации (временной ряд)"""
+    __tablename__ = "publication_stats"
+    __table_args__ = (
+        Index("ix_publication_stats_publication", "publication_id", "collected_at"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    publication_id = Column(Integer, ForeignKey("publications.id"), nullable=False)
+    collected_at = Column(DateTime, nullable=False)
+    
+    # Чего нет на платформе - NULL (в Telegram нет лайков, в VK - реакций)
+    views = Column(Integer)
+    likes = Column(Integer)
+    reactions = Column(Integer)
+    reposts = Column(Integer)
+    comments = Column(Integer)
+
+
 class Template(Base):
     """Шаблон поста"""
     __tablename__ = "templates"
@@ -145,6 +193,10 @@ class Log(Base):
 class ScheduledPost(Base):
     """Запланированная публикация"""
     __tablename__ = "scheduled_posts"
+    __table_args__ = (
+        # Выборка "пора публиковать": is_processed = 0 AND scheduled_time <= now
+        Index("ix_scheduled_posts_due", "is_processed", "scheduled_time"),
+    )
     
     id = Column(Integer, primary_key=True)
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
@@ -152,13 +204,34 @@ class ScheduledPost(Base):
     channels = Column(JSON, default=list)
     
     is_processed = Column(Boolean, default=False)
+    # Взята планировщиком в работу (is_processed - только после публикации)
+    claimed_at = Column(DateTime)
+    # Неудачные попытки публикации и время следующей
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
 # Создание таблиц
+def _add_missing_columns(table):
+    """Добавить в существующую таблицу колонки, появившиеся в модели"""
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name not in existing:
+                column_type = column.type.compile(engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+
 def init_db():
     """Инициализация базы данных"""
     Base.metadata.create_all(engine)
+    # create_all не добавляет колонки и индексы в уже существующие таблицы
+    _add_missing_columns(Publication.__table__)
+    _add_missing_columns(ScheduledPost.__table__)
+    for table in (ScheduledPost.__table__, Publication.__table__):
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 
 def get_session():
@@ -166,14 +239,40 @@ def get_session():
     return Session()
 
 
+# Кэш пользователей: telegram_id -> (истекает, User или None)
+_user_cache: Dict[int, Tuple[float, Optional[User]]] = {}
+
+
+def invalidate_user_cache(telegram_id: int = None):
+    """Сбросить кэш пользователя (или весь кэш, если ID не указан)"""
+    if telegram_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(telegram_id, None)
+
+
 # Вспомогательные функции
 def get_user_by_telegram_id(telegram_id: int) -> Optional[User]:
-    """Получить пользователя по Telegram ID"""
+    """
+    Получить пользователя по Telegram ID.
+    
+    Результат (в том числе отсутствие пользователя) кэшируется на
+    USER_CACHE_TTL секунд, поэтому проверки прав в хендлерах не ходят в БД.
+    После изменения роли/статуса нужно вызвать invalidate_user_cache().
+    """
+    now = time.monotonic()
+    cached = _user_cache.get(telegram_id)
+    if cached and cached[0] > now:
+        return cached[1]
+    
     session = get_session()
     try:
-        return session.query(User).filter(User.telegram_id == telegram_id).first()
+        user = session.query(User).filter(User.telegram_id == telegram_id).first()
     finally:
         session.close()
+    
+    _user_cache[telegram_id] = (now + USER_CACHE_TTL, user)
+    return user
 
 
 def create_user(telegram_id: int, username: str = None, full_name: str = None) -> User:
@@ -189,6 +288,7 @@ def create_user(telegram_id: int, username: str = None, full_name: str = None) -
         session.add(user)
         session.commit()
         session.refresh(user)
+        invalidate_user_cache(telegram_id)
         return user
     finally:
         session.close()
@@ -212,6 +312,7 @@ def approve_user(user_id: int, role: str = "editor") -> bool:
             user.status = "active"
             user.role = role
             session.commit()
+            invalidate_user_cache(user.telegram_id)
             return True
         return False
     finally:
@@ -1,11 +1,13 @@
 """
 MOS-POOL Bot - AI генерация контента
 """
+import asyncio
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from database import get_user_by_telegram_id, get_session, Post
+from database import get_user_by_telegram_id
+from storage import get_storage
 from keyboards import ai_options_keyboard, ai_result_keyboard, cancel_keyboard, main_menu_keyboard
 from utils.mistral_client import get_mistral_client
 from config import PostStatus
@@ -117,12 +119,13 @@ async def ai_input_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
     ai_mode = context.user_data.get("ai_mode")
     
     if ai_mode == "improve":
-        result = client.improve_text(text)
+        result = await asyncio.to_thread(client.improve_text, text)
     elif ai_mode == "hashtags":
-        result = client.generate_hashtags(text)
+        result = await asyncio.to_thread(client.generate_hashtags, text)
     elif ai_type:
         # Парсим данные для генерации
-        result = client.generate_post(
+        result = await asyncio.to_thread(
+            client.generate_post,
             post_type=ai_type,
             pool_type=text if ai_type == "project" else None,
             topic=text if ai_type == "tip" else None,
@@ -158,21 +161,14 @@ async def ai_result_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     
     if data.startswith("ai_use:"):
         # Создаём пост из результата
-        session = get_session()
-        try:
-            post = Post(
-                content=result,
-                title=result[:50] + "..." if len(result) > 50 else result,
-                author_id=user.id,
-                status=PostStatus.DRAFT,
-                channels=["telegram"],
-                ai_generated=True
-            )
-            session.add(post)
-            session.commit()
-            post_id = post.id
-        finally:
-            session.close()
+        post = get_storage().create_post(
+            content=result,
+            author_id=user.id,
+            status=PostStatus.DRAFT,
+            channels=["telegram"],
+            ai_generated=True
+        )
+        post_id = post.id
         
         context.user_data.clear()
         
@@ -192,7 +188,7 @@ async def ai_result_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
         ai_type = context.user_data.get("ai_type", "project")
         ai_input = context.user_data.get("ai_input", "")
         
-        result = client.generate_post(post_type=ai_type, pool_type=ai_input)
+        result = await asyncio.to_thread(client.generate_post, post_type=ai_type, pool_type=ai_input)
         
         if result:
             context.user_data["ai_result"] = result
@@ -232,7 +228,7 @@ async def ai_quick_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("⏳ Генерирую...")
     
     client = get_mistral_client()
-    result = client.generate_post(post_type="project", pool_type=args)
+    result = await asyncio.to_thread(client.generate_post, post_type="project", pool_type=args)
     
     if result:
         await update.message.reply_text(
@@ -265,7 +261,7 @@ async def ai_improve_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await update.message.reply_text("⏳ Улучшаю текст...")
     
     client = get_mistral_client()
-    result = client.improve_text(text)
+    result = await asyncio.to_thread(client.improve_text, text)
     
     if result:
         await update.message.reply_text(
@@ -291,7 +287,7 @@ async def ai_hashtags_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     text = " ".join(context.args)
     
     client = get_mistral_client()
-    result = client.generate_hashtags(text)
+    result = await asyncio.to_thread(client.generate_hashtags, text)
     
     if result:
         await update.message.reply_text(f"#️⃣ Хештеги:\n\n{result}")
@@ -7,7 +7,7 @@ from telegram.ext import ContextTypes, ConversationHandler
 
 from database import (
     get_user_by_telegram_id, create_user, get_session, User,
-    get_pending_users, approve_user
+    get_pending_users, approve_user, invalidate_user_cache
 )
 from keyboards import main_menu_keyboard, user_management_keyboard
 from config import ADMIN_TELEGRAM_ID, Role, UserStatus
@@ -88,6 +88,8 @@ async def receive_position(update: Update, context: ContextTypes.DEFAULT_TYPE):
     finally:
         session.close()
     
+    invalidate_user_cache(user.id)
+    
     await update.message.reply_text(
         "✅ **Заявка отправлена!**\n\n"
         f"👤 ФИО: {fullname}\n"
@@ -210,6 +212,7 @@ async def approve_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             user.status = UserStatus.ACTIVE
             user.role = role
             session.commit()
+            invalidate_user_cache(user.telegram_id)
             
             # Уведомляем пользователя
             try:
@@ -260,13 +263,15 @@ async def reject_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 return
             
             # Удаляем или помечаем как отклоненного
+            telegram_id = user.telegram_id
             session.delete(user)
             session.commit()
+            invalidate_user_cache(telegram_id)
             
             # Уведомляем пользователя
             try:
                 await context.bot.send_message(
-                    chat_id=user.telegram_id,
+                    chat_id=telegram_id,
                     text="❌ К сожалению, ваша заявка отклонена."
                 )
             except Exception as e:
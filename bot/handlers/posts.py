@@ -2,11 +2,11 @@
 MOS-POOL Bot - Работа с постами
 """
 import logging
-from datetime import datetime
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from database import get_user_by_telegram_id, get_session, Post, get_user_posts
+from database import get_user_by_telegram_id
+from storage import get_storage
 from keyboards import (
     main_menu_keyboard, post_actions_keyboard, cancel_keyboard,
     channels_keyboard, posts_list_keyboard
@@ -133,25 +133,18 @@ async def save_post(update: Update, context: ContextTypes.DEFAULT_TYPE):
     content = post_data.get("content", "")
     channels = context.user_data.get("selected_channels", [])
     
-    session = get_session()
-    try:
-        # Если админ - сразу approved, иначе draft
-        status = PostStatus.APPROVED if user.can_publish() else PostStatus.DRAFT
-        
-        post = Post(
-            content=content,
-            title=content[:50] + "..." if len(content) > 50 else content,
-            author_id=user.id,
-            status=status,
-            channels=channels,
-            media_urls=[]
-        )
-        session.add(post)
-        session.commit()
-        post_id = post.id
-        post_status = post.status
-    finally:
-        session.close()
+    # Если админ - сразу approved, иначе draft
+    status = PostStatus.APPROVED if user.can_publish() else PostStatus.DRAFT
+    
+    post = get_storage().create_post(
+        content=content,
+        author_id=user.id,
+        status=status,
+        channels=channels,
+        media_urls=[]
+    )
+    post_id = post.id
+    post_status = post.status
     
     # Очищаем данные
     context.user_data.clear()
@@ -197,7 +190,7 @@ async def drafts_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ У вас нет доступа.")
         return
     
-    posts = get_user_posts(user.id, status=PostStatus.DRAFT)
+    posts = get_storage().list_posts(author_id=user.id, statuses=[PostStatus.DRAFT])
     
     if not posts:
         await update.message.reply_text(
@@ -221,33 +214,28 @@ async def queue_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ У вас нет доступа.")
         return
     
-    session = get_session()
-    try:
-        posts = session.query(Post).filter(
-            Post.status.in_([PostStatus.APPROVED, PostStatus.PENDING]),
-            Post.scheduled_for != None
-        ).order_by(Post.scheduled_for).all()
-        
-        if not posts:
-            await update.message.reply_text(
-                "📭 Очередь публикаций пуста."
-            )
-            return
-        
-        text = "📅 **Очередь публикаций:**\n\n"
-        
-        for post in posts:
-            status_emoji = "⏳" if post.status == PostStatus.PENDING else "✅"
-            scheduled = post.scheduled_for.strftime("%d.%m %H:%M") if post.scheduled_for else "—"
-            
-            text += f"{status_emoji} #{post.id}\n"
-            text += f"   📝 {post.content[:40]}...\n"
-            text += f"   🕐 {scheduled}\n\n"
+    posts = get_storage().list_posts(
+        statuses=[PostStatus.APPROVED, PostStatus.PENDING],
+        scheduled_only=True
+    )
+    
+    if not posts:
+        await update.message.reply_text(
+            "📭 Очередь публикаций пуста."
+        )
+        return
+    
+    text = "📅 **Очередь публикаций:**\n\n"
+    
+    for post in posts:
+        status_emoji = "⏳" if post.status == PostStatus.PENDING else "✅"
+        scheduled = post.scheduled_for.strftime("%d.%m %H:%M") if post.scheduled_for else "—"
         
-        await update.message.reply_text(text, parse_mode="Markdown")
+        text += f"{status_emoji} #{post.id}\n"
+        text += f"   📝 {post.content[:40]}...\n"
+        text += f"   🕐 {scheduled}\n\n"
     
-    finally:
-        session.close()
+    await update.message.reply_text(text, parse_mode="Markdown")
 
 
 async def post_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -292,7 +280,7 @@ async def post_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await delete_post(query, post_id, user)
     
     elif data == "posts_list":
-        posts = get_user_posts(user.id) if user else []
+        posts = get_storage().list_posts(author_id=user.id) if user else []
         await query.edit_message_text(
             "📋 **Ваши посты:**",
             reply_markup=posts_list_keyboard(posts),
@@ -302,113 +290,81 @@ async def post_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def publish_post_now(query, post_id: int, user, context):
     """Публикация поста прямо сейчас"""
-    from config import TELEGRAM_CHANNEL_ID
-    from utils.vk_client import get_vk_client
+    from publishing import publish_to_channels, format_result
     
     if not user or not user.can_publish():
         await query.answer("Нет прав на публикацию", show_alert=True)
         return
     
-    session = get_session()
-    try:
-        post = session.query(Post).filter(Post.id == post_id).first()
-        
-        if not post:
-            await query.answer("Пост не найден", show_alert=True)
-            return
-        
-        results = []
-        channels = post.channels or ["telegram"]
-        
-        # Публикация в Telegram
-        if "telegram" in channels and TELEGRAM_CHANNEL_ID:
-            try:
-                await context.bot.send_message(
-                    chat_id=TELEGRAM_CHANNEL_ID,
-                    text=post.content
-                )
-                results.append("✅ Telegram: опубликовано")
-            except Exception as e:
-                results.append(f"❌ Telegram: {e}")
-        
-        # Публикация в VK
-        if "vk" in channels:
-            vk_client = get_vk_client()
-            if vk_client.is_configured():
-                result = vk_client.publish_post(post.content)
-                if result:
-                    results.append(f"✅ VK: {result.get('url', 'опубликовано')}")
-                else:
-                    results.append("❌ VK: ошибка")
-            else:
-                results.append("⚠️ VK: не настроен")
-        
-        # Обновляем статус
-        post.status = PostStatus.PUBLISHED
-        post.published_at = datetime.utcnow()
-        session.commit()
-        
-        result_text = "\n".join(results)
-        await query.edit_message_text(
-            f"📤 **Пост #{post_id} опубликован!**\n\n{result_text}",
-            parse_mode="Markdown"
-        )
-    finally:
-        session.close()
+    post = get_storage().get_post(post_id)
+    
+    if not post:
+        await query.answer("Пост не найден", show_alert=True)
+        return
+    
+    header = f"⏳ Публикую пост #{post_id}..."
+    await query.edit_message_text(header)
+    lines = []
+    
+    async def on_result(result):
+        lines.append(format_result(result))
+        await query.edit_message_text(header + "\n\n" + "\n".join(lines))
+    
+    results = await publish_to_channels(context.bot, post, on_result)
+    
+    result_text = "\n".join(lines)
+    if any(r["success"] for r in results):
+        title = f"📤 **Пост #{post_id} опубликован!**"
+    else:
+        title = f"❌ **Пост #{post_id} не опубликован**"
+    
+    await query.edit_message_text(f"{title}\n\n{result_text}", parse_mode="Markdown")
 
 
 async def show_post(query, post_id: int, user):
     """Показать детали поста"""
-    session = get_session()
-    try:
-        post = session.query(Post).filter(Post.id == post_id).first()
-        
-        if not post:
-            await query.answer("Пост не найден", show_alert=True)
-            return
-        
-        status_text = {
-            PostStatus.DRAFT: "📝 Черновик",
-            PostStatus.PENDING: "⏳ На проверке",
-            PostStatus.APPROVED: "✅ Одобрен",
-            PostStatus.PUBLISHED: "📤 Опубликован",
-            PostStatus.REJECTED: "❌ Отклонён",
-        }.get(post.status, post.status)
-        
-        text = f"📄 **Пост #{post.id}**\n\n"
-        text += f"📊 Статус: {status_text}\n"
-        text += f"📢 Каналы: {', '.join(post.channels or [])}\n"
-        text += f"📅 Создан: {post.created_at.strftime('%d.%m.%Y %H:%M')}\n\n"
-        text += f"📝 **Текст:**\n{post.content}"
-        
-        await query.edit_message_text(
-            text,
-            reply_markup=post_actions_keyboard(post.id, post.status, user.can_publish() if user else False),
-            parse_mode="Markdown"
-        )
-    finally:
-        session.close()
+    post = get_storage().get_post(post_id)
+    
+    if not post:
+        await query.answer("Пост не найден", show_alert=True)
+        return
+    
+    status_text = {
+        PostStatus.DRAFT: "📝 Черновик",
+        PostStatus.PENDING: "⏳ На проверке",
+        PostStatus.APPROVED: "✅ Одобрен",
+        PostStatus.PUBLISHED: "📤 Опубликован",
+        PostStatus.REJECTED: "❌ Отклонён",
+    }.get(post.status, post.status)
+    
+    text = f"📄 **Пост #{post.id}**\n\n"
+    text += f"📊 Статус: {status_text}\n"
+    text += f"📢 Каналы: {', '.join(post.channels or [])}\n"
+    text += f"📅 Создан: {post.created_at.strftime('%d.%m.%Y %H:%M')}\n\n"
+    text += f"📝 **Текст:**\n{post.content}"
+    
+    await query.edit_message_text(
+        text,
+        reply_markup=post_actions_keyboard(post.id, post.status, user.can_publish() if user else False),
+        parse_mode="Markdown"
+    )
 
 
 async def submit_post_for_review(query, post_id: int, user, context):
     """Отправить пост на проверку"""
-    session = get_session()
-    try:
-        post = session.query(Post).filter(Post.id == post_id).first()
+    storage = get_storage()
+    post = storage.get_post(post_id)
+    
+    if post and post.author_id == user.id:
+        storage.update_post(post_id, status=PostStatus.PENDING)
         
-        if post and post.author_id == user.id:
-            post.status = PostStatus.PENDING
-            session.commit()
-            
-            await query.edit_message_text(
-                f"✅ Пост #{post_id} отправлен на проверку!",
-                reply_markup=post_actions_keyboard(post_id, PostStatus.PENDING, False)
-            )
-            
-            # Уведомляем админов
-            # TODO: Уведомление админам
-    finally:
-        session.close()
+        await query.edit_message_text(
+            f"✅ Пост #{post_id} отправлен на проверку!",
+            reply_markup=post_actions_keyboard(post_id, PostStatus.PENDING, False)
+        )
+        
+        # Уведомляем админов
+        # TODO: Уведомление админам
 
 
 async def approve_post(query, post_id: int, user):
@@ -417,34 +373,20 @@ async def approve_post(query, post_id: int, user):
         await query.answer("Нет прав", show_alert=True)
         return
     
-    session = get_session()
-    try:
-        post = session.query(Post).filter(Post.id == post_id).first()
-        
-        if post:
-            post.status = PostStatus.APPROVED
-            post.approved_by_id = user.id
-            session.commit()
-            
-            await query.edit_message_text(
-                f"✅ Пост #{post_id} одобрен!\n\n"
-                "Теперь его можно опубликовать или запланировать.",
-                reply_markup=post_actions_keyboard(post_id, PostStatus.APPROVED, True)
-            )
-    finally:
-        session.close()
+    if get_storage().update_post(post_id, status=PostStatus.APPROVED, approved_by_id=user.id):
+        await query.edit_message_text(
+            f"✅ Пост #{post_id} одобрен!\n\n"
+            "Теперь его можно опубликовать или запланировать.",
+            reply_markup=post_actions_keyboard(post_id, PostStatus.APPROVED, True)
+        )
 
 
 async def delete_post(query, post_id: int, user):
     """Удалить пост"""
-    session = get_session()
-    try:
-        post = session.query(Post).filter(Post.id == post_id).first()
+    storage = get_storage()
+    post = storage.get_post(post_id)
+    
+    if post and (post.author_id == user.id or user.is_admin()):
+        storage.delete_post(post_id)
         
-        if post and (post.author_id == user.id or user.is_admin()):
-            session.delete(post)
-            session.commit()
-            
-            await query.edit_message_text(f"🗑️ Пост #{post_id} удалён.")
-    finally:
-        session.close()
+        await query.edit_message_text(f"🗑️ Пост #{post_id} удалён.")
@@ -6,9 +6,11 @@ from datetime import datetime, timedelta
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from database import get_user_by_telegram_id, get_session, Post, Publication, get_scheduled_posts
+from database import get_user_by_telegram_id
+from storage import get_storage
+from publishing import publish_to_channels, format_result
+from scheduler import wake_at
 from keyboards import channels_keyboard, schedule_keyboard, post_actions_keyboard
-from utils.vk_client import get_vk_client
 from config import PostStatus, TELEGRAM_CHANNEL_ID, TELEGRAM_TEST_CHANNEL_ID
 
 logger = logging.getLogger(__name__)
@@ -26,28 +28,22 @@ async def publish_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     if not args:
         # Показываем одобренные посты
-        session = get_session()
-        try:
-            posts = session.query(Post).filter(
-                Post.status == PostStatus.APPROVED
-            ).order_by(Post.created_at.desc()).limit(10).all()
-            
-            if not posts:
-                await update.message.reply_text(
-                    "📭 Нет одобренных постов для публикации.\n\n"
-                    "Сначала создайте и одобрите пост."
-                )
-                return
-            
-            text = "📤 **Посты, готовые к публикации:**\n\n"
-            for post in posts:
-                text += f"• #{post.id}: {post.content[:40]}...\n"
-            
-            text += "\nДля публикации: /publish [ID]"
-            
-            await update.message.reply_text(text, parse_mode="Markdown")
-        finally:
-            session.close()
+        posts = get_storage().list_posts(statuses=[PostStatus.APPROVED], limit=10)
+        
+        if not posts:
+            await update.message.reply_text(
+                "📭 Нет одобренных постов для публикации.\n\n"
+                "Сначала создайте и одобрите пост."
+            )
+            return
+        
+        text = "📤 **Посты, готовые к публикации:**\n\n"
+        for post in posts:
+            text += f"• #{post.id}: {post.content[:40]}...\n"
+        
+        text += "\nДля публикации: /publish [ID]"
+        
+        await update.message.reply_text(text, parse_mode="Markdown")
         return
     
     # Публикуем конкретный пост
@@ -62,92 +58,33 @@ async def publish_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def publish_post(update: Update, context: ContextTypes.DEFAULT_TYPE, post_id: int):
     """Публикация поста"""
-    user = get_user_by_telegram_id(update.effective_user.id)
+    post = get_storage().get_post(post_id)
     
-    session = get_session()
-    try:
-        post = session.query(Post).filter(Post.id == post_id).first()
-        
-        if not post:
-            await update.message.reply_text("❌ Пост не найден.")
-            return
-        
-        if post.status != PostStatus.APPROVED:
-            await update.message.reply_text("❌ Пост не одобрен для публикации.")
-            return
-        
-        channels = post.channels or ["telegram"]
-        results = []
-        
-        # Публикация в Telegram
-        if "telegram" in channels and TELEGRAM_CHANNEL_ID:
-            try:
-                message = await context.bot.send_message(
-                    chat_id=TELEGRAM_CHANNEL_ID,
-                    text=post.content,
-                    parse_mode="HTML"
-                )
-                
-                pub = Publication(
-                    post_id=post.id,
-                    channel_type="telegram",
-                    channel_id=TELEGRAM_CHANNEL_ID,
-                    status="success",
-                    external_id=str(message.message_id),
-                    published_at=datetime.utcnow()
-                )
-                session.add(pub)
-                results.append(f"✅ Telegram: опубликовано")
-                
-            except Exception as e:
-                logger.error(f"Telegram publish error: {e}")
-                pub = Publication(
-                    post_id=post.id,
-                    channel_type="telegram",
-                    channel_id=TELEGRAM_CHANNEL_ID,
-                    status="failed",
-                    error_message=str(e)
-                )
-                session.add(pub)
-                results.append(f"❌ Telegram: {e}")
-        
-        # Публикация в VK
-        if "vk" in channels:
-            vk_client = get_vk_client()
-            
-            if vk_client.is_configured():
-                result = vk_client.publish_post(post.content)
-                
-                if result:
-                    pub = Publication(
-                        post_id=post.id,
-                        channel_type="vk",
-                        channel_id=str(vk_client.group_id),
-                        status="success",
-                        external_id=str(result["post_id"]),
-                        external_url=result["url"],
-                        published_at=datetime.utcnow()
-                    )
-                    session.add(pub)
-                    results.append(f"✅ VK: {result['url']}")
-                else:
-                    results.append("❌ VK: ошибка публикации")
-            else:
-                results.append("⚠️ VK: не настроен")
-        
-        # Обновляем статус поста
-        post.status = PostStatus.PUBLISHED
-        post.published_at = datetime.utcnow()
-        session.commit()
-        
-        result_text = "\n".join(results)
-        await update.message.reply_text(
-            f"📤 **Пост #{post_id} опубликован!**\n\n{result_text}",
-            parse_mode="Markdown"
-        )
-        
-    finally:
-        session.close()
+    if not post:
+        await update.message.reply_text("❌ Пост не найден.")
+        return
+    
+    if post.status != PostStatus.APPROVED:
+        await update.message.reply_text("❌ Пост не одобрен для публикации.")
+        return
+    
+    header = f"⏳ Публикую пост #{post_id}..."
+    status_message = await update.message.reply_text(header)
+    lines = []
+    
+    async def on_result(result):
+        lines.append(format_result(result))
+        await status_message.edit_text(header + "\n\n" + "\n".join(lines))
+    
+    results = await publish_to_channels(context.bot, post, on_result)
+    
+    result_text = "\n".join(lines)
+    if any(r["success"] for r in results):
+        title = f"📤 **Пост #{post_id} опубликован!**"
+    else:
+        title = f"❌ **Пост #{post_id} не опубликован**"
+    
+    await status_message.edit_text(f"{title}\n\n{result_text}", parse_mode="Markdown")
 
 
 async def schedule_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -218,31 +155,25 @@ async def schedule_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     if scheduled_time:
-        await set_schedule(query, post_id, scheduled_time)
+        await set_schedule(query, post_id, scheduled_time, context)
         context.user_data.clear()
 
 
-async def set_schedule(query, post_id: int, scheduled_time: datetime):
+async def set_schedule(query, post_id: int, scheduled_time: datetime, context=None):
     """Установка времени публикации"""
-    session = get_session()
-    try:
-        post = session.query(Post).filter(Post.id == post_id).first()
+    if get_storage().schedule_post(post_id, scheduled_time):
+        if context is not None:
+            wake_at(context.job_queue, scheduled_time)
         
-        if post:
-            post.scheduled_for = scheduled_time
-            session.commit()
-            
-            await query.edit_message_text(
-                f"✅ Пост #{post_id} запланирован на:\n\n"
-                f"📅 {scheduled_time.strftime('%d.%m.%Y %H:%M')}"
-            )
-    finally:
-        session.close()
+        await query.edit_message_text(
+            f"✅ Пост #{post_id} запланирован на:\n\n"
+            f"📅 {scheduled_time.strftime('%d.%m.%Y %H:%M')}"
+        )
 
 
 async def queue_scheduled_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Показать очередь запланированных постов"""
-    posts = get_scheduled_posts()
+    posts = get_storage().get_scheduled_posts()
     
     if not posts:
         await update.message.reply_text("📭 Очередь публикаций пуста.")
@@ -281,26 +212,21 @@ async def test_publish_command(update: Update, context: ContextTypes.DEFAULT_TYP
     try:
         post_id = int(args[0])
         
-        session = get_session()
-        try:
-            post = session.query(Post).filter(Post.id == post_id).first()
-            
-            if not post:
-                await update.message.reply_text("❌ Пост не найден.")
-                return
-            
-            message = await context.bot.send_message(
-                chat_id=TELEGRAM_TEST_CHANNEL_ID,
-                text=f"🧪 ТЕСТ\n\n{post.content}",
-                parse_mode="HTML"
-            )
-            
-            await update.message.reply_text(
-                f"✅ Тестовая публикация отправлена в {TELEGRAM_TEST_CHANNEL_ID}"
-            )
-            
-        finally:
-            session.close()
+        post = get_storage().get_post(post_id)
+        
+        if not post:
+            await update.message.reply_text("❌ Пост не найден.")
+            return
+        
+        message = await context.bot.send_message(
+            chat_id=TELEGRAM_TEST_CHANNEL_ID,
+            text=f"🧪 ТЕСТ\n\n{post.content}",
+            parse_mode="HTML"
+        )
+        
+        await update.message.reply_text(
+            f"✅ Тестовая публикация отправлена в {TELEGRAM_TEST_CHANNEL_ID}"
+        )
     
     except ValueError:
         await update.message.reply_text("❌ Неверный ID поста.")
@@ -5,7 +5,7 @@ import logging
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from database import get_user_by_telegram_id, create_user, get_session, User
+from database import get_user_by_telegram_id, create_user, get_session, User, invalidate_user_cache
 from keyboards import main_menu_keyboard
 from config import ADMIN_TELEGRAM_ID, Role, UserStatus
 
@@ -37,6 +37,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 db_user = new_user
             finally:
                 session.close()
+            invalidate_user_cache(telegram_id)
             
             await update.message.reply_text(
                 f"👋 Добро пожаловать, {user.first_name}!\n\n"
@@ -4,34 +4,18 @@ MOS-POOL Telegram Bot
 Бот для управления публикациями в социальных сетях компании MOS-POOL.
 
 Запуск: python main.py
+Webhook: BOT_MODE=webhook WEBHOOK_URL=https://... python main.py
+Только создать/обновить таблицы БД: python main.py --init-db
+
+telegram, обработчики, SQLAlchemy и клиенты API импортируются внутри
+main(): --help и --init-db не платят за загрузку всего бота.
 """
+import argparse
 import logging
-from telegram import Update
-from telegram.ext import (
-    Application, CommandHandler, MessageHandler, CallbackQueryHandler,
-    ConversationHandler, filters
-)
 
-from config import TELEGRAM_BOT_TOKEN
-from database import init_db
-from handlers import (
-    # Start & Help
-    start_command, help_command, cancel_command, handle_menu_button,
-    # Auth
-    register_command, receive_fullname, receive_position, cancel_registration,
-    users_command, approve_command, reject_command,
-    WAITING_FULLNAME, WAITING_POSITION,
-    # Posts
-    new_post_command, receive_content, drafts_command, queue_command,
-    post_callback, select_channels_callback, cancel_post_creation,
-    WAITING_CONTENT, WAITING_CHANNELS,
-    # AI
-    ai_command, ai_select_type, ai_input_data, ai_result_callback,
-    ai_quick_command, ai_improve_command, ai_hashtags_command,
-    AI_SELECT_TYPE, AI_INPUT_DATA, AI_RESULT,
-    # Publish
-    publish_command, schedule_command, schedule_callback,
-    queue_scheduled_command, test_publish_command,
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_API_BASE_URL, BOT_MODE, CONCURRENT_UPDATES,
+    PERSISTENCE_FILE, PERSISTENCE_INTERVAL, CONVERSATION_TIMEOUT,
 )
 
 # Logging - create data dir first
@@ -55,9 +39,43 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+# Бот обрабатывает сообщения, нажатия inline-кнопок и счётчики реакций
+# на посты канала - остальные типы обновлений Telegram присылать не нужно
+# (значения Update.MESSAGE, Update.CALLBACK_QUERY, Update.MESSAGE_REACTION_COUNT)
+ALLOWED_UPDATES = ["message", "callback_query", "message_reaction_count"]
+
 
 def main():
     """Запуск бота"""
+    from telegram import Update
+    from telegram.ext import (
+        Application, CommandHandler, MessageHandler, CallbackQueryHandler,
+        ConversationHandler, PicklePersistence, PersistenceInput, filters
+    )
+    
+    from metrics import start_metrics_server
+    from scheduler import setup_scheduler
+    from stats_collector import setup_stats_collector
+    from update_processor import ChatOrderedUpdateProcessor
+    from handlers import (
+        # Start & Help
+        start_command, help_command, cancel_command, handle_menu_button,
+        # Auth
+        register_command, receive_fullname, receive_position, cancel_registration,
+        users_command, approve_command, reject_command,
+        WAITING_FULLNAME, WAITING_POSITION,
+        # Posts
+        new_post_command, receive_content, drafts_command, queue_command,
+        post_callback, select_channels_callback, cancel_post_creation,
+        WAITING_CONTENT, WAITING_CHANNELS,
+        # AI
+        ai_command, ai_select_type, ai_input_data, ai_result_callback,
+        ai_quick_command, ai_improve_command, ai_hashtags_command,
+        AI_SELECT_TYPE, AI_INPUT_DATA, AI_RESULT,
+        # Publish
+        publish_command, schedule_command, schedule_callback,
+        queue_scheduled_command, test_publish_command,
+    )
     
     # Проверка токена
     if not TELEGRAM_BOT_TOKEN:
@@ -67,14 +85,32 @@ def main():
         return
     
     # Инициализация БД
-    init_db()
-    logger.info("✅ Database initialized")
+    init_db_command()
     
     # Создание приложения
-    app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    builder = Application.builder().token(TELEGRAM_BOT_TOKEN)
+    if TELEGRAM_API_BASE_URL:
+        builder = builder.base_url(TELEGRAM_API_BASE_URL)
+    if CONCURRENT_UPDATES > 1:
+        builder = builder.concurrent_updates(ChatOrderedUpdateProcessor(CONCURRENT_UPDATES))
+    if PERSISTENCE_FILE:
+        # Храним только user_data и шаги диалогов; запись - пачкой раз в интервал
+        builder = builder.persistence(PicklePersistence(
+            filepath=PERSISTENCE_FILE,
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=PERSISTENCE_INTERVAL,
+        ))
+    app = builder.build()
     
     # ============ CONVERSATION HANDLERS ============
     
+    # Диалог, брошенный на середине (в т.ч. восстановленный из PERSISTENCE_FILE
+    # после перезапуска), не должен глотать команду входа - она начинает заново
+    conversation_options = {
+        "allow_reentry": True,
+        "conversation_timeout": CONVERSATION_TIMEOUT or None,
+    }
+    
     # Регистрация
     registration_handler = ConversationHandler(
         entry_points=[CommandHandler("register", register_command)],
@@ -86,6 +122,9 @@ def main():
             CommandHandler("cancel", cancel_registration),
             MessageHandler(filters.Regex("^❌ Отмена$"), cancel_registration),
         ],
+        name="registration",
+        persistent=bool(PERSISTENCE_FILE),
+        **conversation_options,
     )
     
     # Создание поста
@@ -102,6 +141,9 @@ def main():
             CommandHandler("cancel", cancel_post_creation),
             MessageHandler(filters.Regex("^❌ Отмена$"), cancel_post_creation),
         ],
+        name="new_post",
+        persistent=bool(PERSISTENCE_FILE),
+        **conversation_options,
     )
     
     # AI генерация
@@ -118,6 +160,9 @@ def main():
         fallbacks=[
             CommandHandler("cancel", cancel_command),
         ],
+        name="ai",
+        persistent=bool(PERSISTENCE_FILE),
+        **conversation_options,
     )
     
     # ============ COMMAND HANDLERS ============
@@ -164,6 +209,12 @@ def main():
     
     app.add_handler(CallbackQueryHandler(cancel_callback, pattern="^cancel$"))
     
+    # ============ ПЛАНИРОВЩИК ============
+    
+    setup_scheduler(app)
+    setup_stats_collector(app)
+    start_metrics_server()
+    
     # ============ MESSAGE HANDLERS ============
     
     # Обработка кнопок меню
@@ -183,8 +234,26 @@ def main():
     print("📱 Откройте бота в Telegram и отправьте /start")
     print("\n🛑 Для остановки нажмите Ctrl+C\n")
     
-    app.run_polling(allowed_updates=Update.ALL_TYPES)
+    if BOT_MODE == "webhook":
+        from webhook import run_webhook
+        run_webhook(app, allowed_updates=ALLOWED_UPDATES)
+    else:
+        app.run_polling(allowed_updates=ALLOWED_UPDATES)
+
+
+def init_db_command():
+    """Создать недостающие таблицы, колонки и индексы и выйти"""
+    from database import init_db
+    init_db()
+    logger.info("✅ Database initialized")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="MOS-POOL Telegram Bot")
+    parser.add_argument("--init-db", action="store_true", help="Только инициализировать БД и выйти")
+    args = parser.parse_args()
+    
+    if args.init_db:
+        init_db_command()
+    else:
+        main()
@@ -0,0 +1,59 @@
+"""
+MOS-POOL Bot - Метрики Prometheus
+=================================
+Те же метрики публикации, что и у веб-приложения (apps/publishers/metrics.py),
+чтобы в Prometheus бот и веб были на одних графиках (различаются по job).
+
+Этапы (stage): db_fetch, media (открытие файлов, загрузка фото в VK),
+api (запрос публикации), db_write (Publication и статус поста). Общие для
+всех каналов этапы - с platform="all".
+
+Отдаются по HTTP на METRICS_PORT (0 - выключено), см. start_metrics_server().
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram, start_http_server
+
+from config import METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+# Секунды: от записи в SQLite до загрузки фото и таймаута API
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+PUBLISH_STAGE_SECONDS = Histogram(
+    "publish_stage_seconds", "Длительность этапа публикации",
+    ["platform", "stage"], buckets=DURATION_BUCKETS,
+)
+PUBLISH_SECONDS = Histogram(
+    "publish_seconds", "Публикация на платформу целиком (без записи в БД)",
+    ["platform"], buckets=DURATION_BUCKETS,
+)
+PUBLICATIONS_TOTAL = Counter(
+    "publications", "Публикации по платформе и результату (success / failed)",
+    ["platform", "result"],
+)
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Записать длительность блока в гистограмму (и при исключении тоже)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - started)
+
+
+def stage(platform: str, name: str):
+    """Замер этапа публикации: with stage("vk", "api"): ..."""
+    return timed(PUBLISH_STAGE_SECONDS, platform=platform, stage=name)
+
+
+def start_metrics_server():
+    """HTTP-сервер /metrics в фоновом потоке (если задан METRICS_PORT)"""
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT)
+        logger.info(f"📈 Метрики: http://0.0.0.0:{METRICS_PORT}/metrics")
@@ -0,0 +1,219 @@
+"""
+MOS-POOL Bot - Публикация постов
+================================
+Общий конвейер для /publish и кнопки «🚀 Опубликовать»:
+- каналы публикуются параллельно;
+- медиа из post.media_urls уходят вместе с постом;
+- результат каждого канала записывается в Publication сразу по готовности
+  и передаётся в on_result, чтобы хендлер мог обновлять ответ пользователю.
+"""
+import asyncio
+import logging
+import os
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from telegram import Bot, InputMediaPhoto
+
+from config import PostStatus, TELEGRAM_CHANNEL_ID, MAX_MEDIA_FILES
+from metrics import PUBLICATIONS_TOTAL, PUBLISH_SECONDS, stage, timed
+from storage import get_storage, PostRecord
+from utils.vk_client import get_vk_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_NAMES = {
+    "telegram": "Telegram",
+    "vk": "VK",
+}
+
+# Лимит подписи к фото в Telegram
+TELEGRAM_CAPTION_LIMIT = 1024
+
+ResultCallback = Callable[[dict], Awaitable[None]]
+
+
+def _result(channel: str, channel_id: str = None, success: bool = False, **extra) -> dict:
+    result = {
+        "channel": channel,
+        "channel_id": channel_id,
+        "success": success,
+        "skipped": False,
+        "external_id": None,
+        "external_url": None,
+        "error": None,
+    }
+    result.update(extra)
+    return result
+
+
+async def _publish_telegram(bot: Bot, post: PostRecord) -> dict:
+    """Публикация в Telegram-канал (текст, фото или альбом)"""
+    if not TELEGRAM_CHANNEL_ID:
+        return _result("telegram", skipped=True, error="не настроен")
+
+    media = post.media_urls[:MAX_MEDIA_FILES]
+    text = post.content
+
+    try:
+        with ExitStack() as stack:
+            # Локальные файлы открываем, URL и file_id передаём как есть
+            with stage("telegram", "media"):
+                photos = [
+                    stack.enter_context(open(item, "rb")) if os.path.isfile(item) else item
+                    for item in media
+                ]
+            caption = text if len(text) <= TELEGRAM_CAPTION_LIMIT else None
+            # Фото уходят в тех же запросах, что и текст - это этап api
+            stack.enter_context(stage("telegram", "api"))
+
+            if len(photos) > 1:
+                messages = await bot.send_media_group(
+                    chat_id=TELEGRAM_CHANNEL_ID,
+                    media=[
+                        InputMediaPhoto(photo, caption=caption if i == 0 else None, parse_mode="HTML")
+                        for i, photo in enumerate(photos)
+                    ],
+                )
+                message = messages[0]
+            elif photos:
+                message = await bot.send_photo(
+                    chat_id=TELEGRAM_CHANNEL_ID,
+                    photo=photos[0],
+                    caption=caption,
+                    parse_mode="HTML",
+                )
+            else:
+                message = None
+
+            # Длинный текст не помещается в подпись - отправляем отдельно
+            if message is None or caption is None:
+                text_message = await bot.send_message(
+                    chat_id=TELEGRAM_CHANNEL_ID,
+                    text=text,
+                    parse_mode="HTML",
+                )
+                message = message or text_message
+
+        external_url = None
+        if str(TELEGRAM_CHANNEL_ID).startswith("@"):
+            external_url = f"https://t.me/{TELEGRAM_CHANNEL_ID[1:]}/{message.message_id}"
+
+        return _result(
+            "telegram", TELEGRAM_CHANNEL_ID, success=True,
+            external_id=str(message.message_id), external_url=external_url,
+        )
+
+    except Exception as e:
+        logger.error(f"Telegram publish error: {e}")
+        return _result("telegram", TELEGRAM_CHANNEL_ID, error=str(e))
+
+
+def _publish_vk_sync(post: PostRecord) -> dict:
+    vk_client = get_vk_client()
+    if not vk_client.is_configured():
+        return _result("vk", skipped=True, error="не настроен")
+
+    photo_paths = [item for item in post.media_urls if os.path.isfile(item)]
+    result = vk_client.publish_post(post.content, photo_paths=photo_paths or None)
+    if not result:
+        return _result("vk", str(vk_client.group_id), error="ошибка публикации")
+
+    return _result(
+        "vk", str(vk_client.group_id), success=True,
+        external_id=str(result["post_id"]), external_url=result["url"],
+    )
+
+
+async def _publish_vk(bot: Bot, post: PostRecord) -> dict:
+    """Публикация в VK (vk_api синхронный - выполняем в потоке)"""
+    try:
+        return await asyncio.to_thread(_publish_vk_sync, post)
+    except Exception as e:
+        logger.error(f"VK publish error: {e}")
+        return _result("vk", error=str(e))
+
+
+_PUBLISHERS = {
+    "telegram": _publish_telegram,
+    "vk": _publish_vk,
+}
+
+
+async def _timed_publish(channel: str, bot: Bot, post: PostRecord) -> dict:
+    """Публикация в канал с замером времени (без записи в БД)"""
+    with timed(PUBLISH_SECONDS, platform=channel):
+        return await _PUBLISHERS[channel](bot, post)
+
+
+def format_result(result: dict) -> str:
+    """Строка результата для ответа пользователю"""
+    name = CHANNEL_NAMES.get(result["channel"], result["channel"])
+    if result["skipped"]:
+        return f"⚠️ {name}: {result['error']}"
+    if result["success"]:
+        return f"✅ {name}: {result['external_url'] or 'опубликовано'}"
+    return f"❌ {name}: {result['error']}"
+
+
+async def publish_to_channels(
+    bot: Bot,
+    post: PostRecord,
+    on_result: Optional[ResultCallback] = None,
+) -> List[dict]:
+    """
+    Опубликовать пост во все его каналы.
+
+    Args:
+        bot: Telegram Bot (context.bot)
+        post: Пост из хранилища
+        on_result: Корутина, вызываемая для каждого канала по мере готовности
+
+    Returns:
+        Список результатов по каналам
+    """
+    storage = get_storage()
+    channels = post.channels or ["telegram"]
+
+    tasks = [
+        asyncio.create_task(_timed_publish(channel, bot, post))
+        for channel in channels if channel in _PUBLISHERS
+    ]
+
+    results = []
+    for future in asyncio.as_completed(tasks):
+        result = await future
+        results.append(result)
+
+        if not result["skipped"]:
+            PUBLICATIONS_TOTAL.labels(
+                platform=result["channel"], result="success" if result["success"] else "failed"
+            ).inc()
+            with stage(result["channel"], "db_write"):
+                await asyncio.to_thread(
+                    storage.add_publication,
+                    post_id=post.id,
+                    channel_type=result["channel"],
+                    channel_id=result["channel_id"],
+                    status="success" if result["success"] else "failed",
+                    external_id=result["external_id"],
+                    external_url=result["external_url"],
+                    error_message=result["error"],
+                )
+
+        if on_result:
+            try:
+                await on_result(result)
+            except Exception as e:
+                logger.warning(f"Progress callback failed: {e}")
+
+    # Хотя бы один канал - пост опубликован; иначе остаётся одобренным для повтора
+    if any(r["success"] for r in results):
+        with stage("all", "db_write"):
+            await asyncio.to_thread(
+                storage.update_post, post.id,
+                status=PostStatus.PUBLISHED, published_at=datetime.utcnow(),
+            )
+
+    return results
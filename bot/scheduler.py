@@ -0,0 +1,266 @@
+"""
+MOS-POOL Bot - Планировщик публикаций
+=====================================
+Выполняет запланированные посты из таблицы scheduled_posts на
+Application.job_queue:
+
+- каждые SCHEDULER_INTERVAL секунд проверяет индексированный запрос
+  "is_processed = 0 AND scheduled_time <= now" и публикует до
+  SCHEDULER_BATCH_SIZE постов за раз;
+- при /schedule ставит разовую задачу точно на время публикации;
+- при старте восстанавливает разовые задачи из таблицы, поэтому
+  перезапуск бота ничего не теряет.
+
+Выборка атомарно берёт запись в работу (claimed_at), поэтому два прохода
+не опубликуют пост дважды. Дальше запись:
+- выполняется (is_processed) после публикации хотя бы в один канал, а
+  также если пост удалён, уже опубликован, отклонён или возвращён в
+  черновики - публиковать по этой записи больше нечего;
+- освобождается, если пост ещё на модерации - выйдет после одобрения;
+- откладывается, если все каналы с ошибкой или публикация упала: повтор
+  через SCHEDULER_RETRY_DELAY секунд с удвоением, после
+  SCHEDULER_MAX_ATTEMPTS попыток запись закрывается с ошибкой в логе.
+Запись, взятая больше SCHEDULER_CLAIM_TIMEOUT секунд назад и так и не
+завершённая (бот упал посреди публикации), тоже снова в очереди.
+
+Работает только с хранилищем "bot": в режиме "django" запланированные
+посты публикует планировщик веб-приложения.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import and_, or_
+from telegram.ext import Application, ContextTypes, JobQueue
+
+from database import get_session, ScheduledPost
+from storage import get_storage
+from metrics import stage
+from publishing import publish_to_channels
+from config import (
+    PostStatus, STORAGE_BACKEND, SCHEDULER_INTERVAL, SCHEDULER_BATCH_SIZE, SCHEDULER_CLAIM_TIMEOUT,
+    SCHEDULER_RETRY_DELAY, SCHEDULER_MAX_ATTEMPTS,
+)
+
+logger = logging.getLogger(__name__)
+
+SWEEP_JOB_NAME = "scheduled_posts_sweep"
+WAKE_JOB_NAME = "scheduled_posts_wake"
+
+# Итог обработки записи
+DONE, WAIT, FAILED = "done", "wait", "failed"
+
+
+def _claimable(now: datetime):
+    """Запись не выполнена, не взята в работу (или взята слишком давно) и не отложена"""
+    return and_(
+        ScheduledPost.is_processed == False,
+        or_(
+            ScheduledPost.claimed_at == None,
+            ScheduledPost.claimed_at < now - timedelta(seconds=SCHEDULER_CLAIM_TIMEOUT),
+        ),
+        or_(ScheduledPost.next_attempt_at == None, ScheduledPost.next_attempt_at <= now),
+    )
+
+
+def _claim_due_posts(limit: int, exclude: Iterable[int] = ()) -> List[Tuple[int, int]]:
+    """
+    Выбрать созревшие записи и взять их в работу.
+
+    Args:
+        exclude: ID записей, уже освобождённых в этом проходе
+
+    Returns:
+        [(ID записи, ID поста)] для публикации
+    """
+    now = datetime.now()
+    exclude = list(exclude)
+    session = get_session()
+    try:
+        query = session.query(ScheduledPost.id, ScheduledPost.post_id).filter(
+            _claimable(now),
+            ScheduledPost.scheduled_time <= now
+        )
+        if exclude:
+            query = query.filter(ScheduledPost.id.notin_(exclude))
+        rows = query.order_by(ScheduledPost.scheduled_time).limit(limit).all()
+
+        claims = []
+        for row_id, post_id in rows:
+            claimed = session.query(ScheduledPost).filter(
+                ScheduledPost.id == row_id,
+                _claimable(now)
+            ).update({ScheduledPost.claimed_at: now}, synchronize_session=False)
+            if claimed:
+                claims.append((row_id, post_id))
+
+        session.commit()
+        return claims
+    finally:
+        session.close()
+
+
+def _finish_claims(done: List[int], waiting: List[int], failed: List[int]):
+    """
+    Закрыть взятые записи.
+
+    Args:
+        done: Выполненные - is_processed
+        waiting: Пост ещё не одобрен - вернуть в очередь
+        failed: Публикация не удалась - отложить с удвоением задержки
+            или закрыть после SCHEDULER_MAX_ATTEMPTS попыток
+    """
+    now = datetime.now()
+    session = get_session()
+    try:
+        if done:
+            session.query(ScheduledPost).filter(ScheduledPost.id.in_(done)).update(
+                {ScheduledPost.is_processed: True}, synchronize_session=False
+            )
+        if waiting:
+            session.query(ScheduledPost).filter(ScheduledPost.id.in_(waiting)).update(
+                {ScheduledPost.claimed_at: None}, synchronize_session=False
+            )
+        if failed:
+            for row in session.query(ScheduledPost).filter(ScheduledPost.id.in_(failed)):
+                row.attempts = (row.attempts or 0) + 1
+                row.claimed_at = None
+                if row.attempts >= SCHEDULER_MAX_ATTEMPTS:
+                    row.is_processed = True
+                    logger.error(f"Scheduled post {row.post_id}: giving up after {row.attempts} attempts")
+                else:
+                    delay = SCHEDULER_RETRY_DELAY * 2 ** (row.attempts - 1)
+                    row.next_attempt_at = now + timedelta(seconds=delay)
+                    logger.error(f"Scheduled post {row.post_id}: attempt {row.attempts} failed, retry in {delay}s")
+        session.commit()
+    finally:
+        session.close()
+
+
+def _pending_times() -> List[datetime]:
+    """Время всех ещё не выполненных публикаций"""
+    session = get_session()
+    try:
+        rows = session.query(ScheduledPost.scheduled_time).filter(
+            ScheduledPost.is_processed == False
+        ).order_by(ScheduledPost.scheduled_time).all()
+        return [row.scheduled_time for row in rows]
+    finally:
+        session.close()
+
+
+def _backfill_scheduled_posts():
+    """Посты, запланированные до появления планировщика, без записи в scheduled_posts"""
+    storage = get_storage()
+    session = get_session()
+    try:
+        known = {
+            row.post_id for row in
+            session.query(ScheduledPost.post_id).filter(ScheduledPost.is_processed == False)
+        }
+    finally:
+        session.close()
+
+    for post in storage.get_scheduled_posts():
+        if post.id not in known:
+            storage.schedule_post(post.id, post.scheduled_for)
+
+
+async def _publish_scheduled(context: ContextTypes.DEFAULT_TYPE, post_id: int) -> str:
+    """
+    Опубликовать запланированный пост.
+
+    Returns:
+        DONE - запись выполнена; WAIT - пост на модерации; FAILED - ни один канал не принял
+    """
+    with stage("all", "db_fetch"):
+        post = await asyncio.to_thread(get_storage().get_post, post_id)
+
+    if not post:
+        logger.warning(f"Scheduled post {post_id} not found")
+        return DONE
+    if post.status == PostStatus.PENDING:
+        # Опубликуется в первый проход после одобрения
+        logger.info(f"Scheduled post {post_id} is pending moderation - waiting")
+        return WAIT
+    if post.status != PostStatus.APPROVED:
+        # Уже опубликован (/publish), отклонён или возвращён в черновики
+        logger.warning(f"Scheduled post {post_id} is '{post.status}' - schedule closed")
+        return DONE
+
+    results = await publish_to_channels(context.bot, post)
+    success_count = sum(1 for r in results if r["success"])
+    if not success_count:
+        logger.error(f"Scheduled post {post_id}: all {len(results)} channels failed")
+        return FAILED
+    logger.info(f"Scheduled post {post_id}: {success_count}/{len(results)} channels succeeded")
+    return DONE
+
+
+async def check_scheduled_posts(context: ContextTypes.DEFAULT_TYPE):
+    """Опубликовать созревшие посты пачками"""
+    # Освобождённые записи в этом проходе больше не берём - иначе цикл по ним
+    released = []
+    while True:
+        claims = await asyncio.to_thread(_claim_due_posts, SCHEDULER_BATCH_SIZE, released)
+        if not claims:
+            return
+
+        results = await asyncio.gather(
+            *(_publish_scheduled(context, post_id) for _, post_id in claims),
+            return_exceptions=True
+        )
+        outcomes = {DONE: [], WAIT: [], FAILED: []}
+        for (row_id, post_id), result in zip(claims, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to publish scheduled post {post_id}: {result}")
+                result = FAILED
+            outcomes[result].append(row_id)
+        await asyncio.to_thread(_finish_claims, outcomes[DONE], outcomes[WAIT], outcomes[FAILED])
+        released.extend(outcomes[WAIT])
+
+        if len(claims) < SCHEDULER_BATCH_SIZE:
+            return
+
+
+def wake_at(job_queue: JobQueue, when: datetime):
+    """Поставить разовую проверку точно на время публикации (локальное время)"""
+    if job_queue is None or STORAGE_BACKEND != "bot":
+        return
+    job_queue.run_once(check_scheduled_posts, when=when.astimezone(), name=WAKE_JOB_NAME)
+
+
+async def _rehydrate(context: ContextTypes.DEFAULT_TYPE):
+    """Восстановить разовые задачи из scheduled_posts после перезапуска"""
+    await asyncio.to_thread(_backfill_scheduled_posts)
+
+    now = datetime.now()
+    times = await asyncio.to_thread(_pending_times)
+    for when in sorted(set(times)):
+        if when > now:
+            wake_at(context.job_queue, when)
+
+    logger.info(f"Scheduler rehydrated: {len(times)} pending publications")
+    # Просроченные за время простоя - сразу
+    await check_scheduled_posts(context)
+
+
+def setup_scheduler(app: Application):
+    """Подключить планировщик к приложению"""
+    if STORAGE_BACKEND != "bot":
+        logger.info("Bot scheduler disabled: scheduled posts are published by the web app")
+        return
+
+    if app.job_queue is None:
+        logger.error("JobQueue unavailable. Install python-telegram-bot[job-queue]")
+        return
+
+    app.job_queue.run_once(_rehydrate, when=0, name="scheduled_posts_rehydrate")
+    app.job_queue.run_repeating(
+        check_scheduled_posts,
+        interval=SCHEDULER_INTERVAL,
+        first=SCHEDULER_INTERVAL,
+        name=SWEEP_JOB_NAME
+    )
+    logger.info(f"✅ Scheduler started (every {SCHEDULER_INTERVAL}s)")
@@ -0,0 +1,357 @@
+"""
+MOS-POOL Bot - Сбор статистики публикаций
+=========================================
+Раз в STATS_INTERVAL секунд обновляет Publication.stats (просмотры,
+лайки, репосты, комментарии) успешных публикаций:
+
+- период обновления растёт с возрастом публикации: десятая часть
+  возраста, от STATS_MIN_REFRESH до STATS_MAX_REFRESH; публикации старше
+  STATS_MAX_AGE_DAYS не обновляются;
+- из созревших первыми идут самые просроченные (никогда не собранные -
+  раньше всех), за проход - не больше квоты канала;
+- VK: один wall.getById на 100 постов вместо запроса на каждый;
+- Telegram: Bot API просмотров не отдаёт, поэтому они берутся со страницы
+  публичного канала t.me/s/<канал> - до 20 постов за запрос; реакции
+  приходят сами обновлениями message_reaction_count;
+- результаты записываются одним bulk update, а снимок каждого замера
+  добавляется во временной ряд publication_stats.
+
+Работает только с хранилищем "bot": в таблицах Django статистики нет.
+"""
+import asyncio
+import heapq
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes, MessageReactionHandler
+
+from database import get_session, Publication, PublicationStat
+from utils.vk_client import get_vk_client, WALL_GET_BY_ID_LIMIT
+from config import (
+    STORAGE_BACKEND, STATS_INTERVAL, STATS_MIN_REFRESH, STATS_MAX_REFRESH,
+    STATS_MAX_AGE_DAYS, STATS_VK_REQUESTS, STATS_TELEGRAM_REQUESTS, TELEGRAM_WIDGET_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+STATS_JOB_NAME = "publication_stats"
+
+# Период обновления - такая доля возраста публикации
+AGE_FACTOR = 0.1
+
+# Постов на странице t.me/s/<канал>
+WIDGET_PAGE_SIZE = 20
+_WIDGET_POST_RE = re.compile(r'data-post="[^"/]+/(\d+)"')
+_WIDGET_VIEWS_RE = re.compile(r'class="tgme_widget_message_views">([^<]+)<')
+_SERIES_FIELDS = ("views", "likes", "reactions", "reposts", "comments")
+
+_http = None  # requests.Session
+
+
+def refresh_interval(age: timedelta) -> timedelta:
+    """Как часто обновлять статистику публикации такого возраста"""
+    seconds = age.total_seconds() * AGE_FACTOR
+    return timedelta(seconds=min(max(seconds, STATS_MIN_REFRESH), STATS_MAX_REFRESH))
+
+
+def _due_publications(channel_type: str, limit: int, now: datetime,
+                      accepts: Callable = lambda row: True) -> list:
+    """
+    Публикации канала, которым пора обновить статистику.
+
+    Args:
+        accepts: Можно ли собрать статистику этой публикации (остальные пропускаются)
+
+    Returns:
+        До limit строк (id, channel_id, external_id, stats), самые просроченные первыми
+    """
+    session = get_session()
+    try:
+        rows = session.query(
+            Publication.id, Publication.channel_id, Publication.external_id,
+            Publication.published_at, Publication.stats_updated_at, Publication.stats,
+        ).filter(
+            Publication.channel_type == channel_type,
+            Publication.published_at >= now - timedelta(days=STATS_MAX_AGE_DAYS),
+            Publication.status == "success",
+            Publication.external_id != None,
+        ).all()
+    finally:
+        session.close()
+
+    due = []
+    for row in rows:
+        if (row.stats or {}).get("deleted") or not accepts(row):
+            continue
+        if row.stats_updated_at is None:
+            overdue = float("inf")
+        else:
+            overdue = (now - row.stats_updated_at) / refresh_interval(now - row.published_at)
+            if overdue < 1:
+                continue
+        due.append((overdue, row.published_at, row))
+
+    return [row for _, _, row in heapq.nlargest(limit, due, key=lambda item: item[:2])]
+
+
+def _save_stats(rows: list, stats: Dict[int, dict], now: datetime):
+    """
+    Записать статистику одним bulk update и добавить снимки во временной ряд.
+
+    Текущая stats перечитывается в той же транзакции, что и запись: пока шёл
+    сбор, reaction_count_callback мог записать реакции - их не затираем.
+
+    Args:
+        rows: Проверенные публикации
+        stats: {publication_id: stats}; проверенных, но отсутствующих - пометить удалёнными
+    """
+    session = get_session()
+    try:
+        current = dict(session.query(Publication.id, Publication.stats).filter(
+            Publication.id.in_([row.id for row in rows])
+        ))
+
+        mappings, snapshots = [], []
+        for row in rows:
+            if row.id not in current:
+                continue  # Публикацию удалили, пока шёл сбор
+            if row.id in stats:
+                # Поверх текущих: реакции Telegram приходят отдельно от просмотров
+                merged = {**(current[row.id] or {}), **stats[row.id]}
+                snapshots.append({
+                    "publication_id": row.id, "collected_at": now,
+                    **{field: merged.get(field) for field in _SERIES_FIELDS},
+                })
+            else:
+                # Пост удалён из канала: оставляем последние цифры и больше не опрашиваем
+                merged = {**(current[row.id] or {}), "deleted": True}
+            mappings.append({"id": row.id, "stats": merged, "stats_updated_at": now})
+
+        session.bulk_update_mappings(Publication, mappings)
+        session.bulk_insert_mappings(PublicationStat, snapshots)
+        session.commit()
+    finally:
+        session.close()
+
+
+def _collect_vk(rows: list) -> Tuple[list, Dict[int, dict]]:
+    """
+    Статистика VK-публикаций.
+
+    Returns:
+        (проверенные строки, {publication_id: stats})
+    """
+    vk_client = get_vk_client()
+    checked, stats = [], {}
+    if not vk_client.is_configured():
+        return checked, stats
+
+    by_wall = defaultdict(list)
+    for row in rows:
+        by_wall[-int(row.channel_id.lstrip("-"))].append(row)
+
+    for owner_id, wall_rows in by_wall.items():
+        for start in range(0, len(wall_rows), WALL_GET_BY_ID_LIMIT):
+            chunk = wall_rows[start:start + WALL_GET_BY_ID_LIMIT]
+            posts = vk_client.get_posts_stats([int(row.external_id) for row in chunk], owner_id=owner_id)
+            if posts is None:
+                # Ошибка API (квота, сеть) - остальное в следующий проход
+                return checked, stats
+            checked.extend(chunk)
+            stats.update(
+                (row.id, posts[int(row.external_id)])
+                for row in chunk if int(row.external_id) in posts
+            )
+    return checked, stats
+
+
+def _get_http():
+    global _http
+    if _http is None:
+        import requests
+        _http = requests.Session()
+    return _http
+
+
+def _parse_count(text: str) -> int:
+    """Число со страницы канала: 987, 12.3K, 1.2M"""
+    text = text.strip().upper()
+    multiplier = {"K": 1_000, "M": 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier > 1 else text
+    return int(float(number) * multiplier)
+
+
+def _fetch_widget_page(channel: str, before: int) -> Optional[Dict[int, dict]]:
+    """
+    Посты публичного канала с id меньше before (до WIDGET_PAGE_SIZE).
+
+    Returns:
+        {message_id: stats} или None при ошибке (в т.ч. 429 - квота исчерпана)
+    """
+    import requests
+
+    try:
+        response = _get_http().get(f"{TELEGRAM_WIDGET_URL}/s/{channel}",
+                                   params={"before": before}, timeout=10)
+    except requests.RequestException as e:
+        logger.error(f"Telegram stats error: {e}")
+        return None
+    if response.status_code != 200:
+        logger.warning(f"Telegram stats: HTTP {response.status_code} for {channel}")
+        return None
+
+    posts = {}
+    html = response.text
+    starts = [(m.start(), int(m.group(1))) for m in _WIDGET_POST_RE.finditer(html)]
+    for i, (start, message_id) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(html)
+        views = _WIDGET_VIEWS_RE.search(html, start, end)
+        posts[message_id] = {"views": _parse_count(views.group(1)) if views else 0}
+    return posts
+
+
+def _collect_telegram(rows: list) -> Tuple[list, Dict[int, dict]]:
+    """
+    Просмотры постов публичных каналов.
+
+    Страница t.me/s/<канал>?before=N содержит посты, предшествующие N, поэтому
+    один запрос покрывает все наши публикации в диапазоне её постов; идём
+    от самого нового несобранного поста вниз.
+
+    Returns:
+        (проверенные строки, {publication_id: stats})
+    """
+    checked, stats = [], {}
+    budget = STATS_TELEGRAM_REQUESTS
+
+    by_channel = defaultdict(dict)
+    for row in rows:
+        by_channel[row.channel_id.lstrip("@")][int(row.external_id)] = row
+
+    for channel, pending in by_channel.items():
+        first_page = True
+        while pending and budget > 0:
+            top = max(pending)
+            posts = _fetch_widget_page(channel, before=top + 1)
+            budget -= 1
+            if posts is None:
+                return checked, stats
+            if not posts:
+                # Превью канала выключено, редирект или сменилась разметка - по пустой
+                # странице удалённые посты не определить, публикации не трогаем
+                if first_page:
+                    logger.warning(f"Telegram stats: empty channel page for {channel}")
+                    return checked, stats
+                break
+            first_page = False
+
+            # Удалённым считается только id внутри диапазона постов страницы
+            low = min(posts)
+            for message_id in [mid for mid in pending if mid in posts or low < mid <= top]:
+                row = pending.pop(message_id)
+                checked.append(row)
+                if message_id in posts:
+                    stats[row.id] = posts[message_id]
+    return checked, stats
+
+
+class Collector(NamedTuple):
+    collect: Callable[[list], Tuple[list, Dict[int, dict]]]
+    limit: Callable[[], int]  # Публикаций за проход
+    accepts: Callable  # Можно ли собрать статистику публикации
+
+
+_COLLECTORS: Dict[str, Collector] = {
+    "vk": Collector(
+        _collect_vk,
+        lambda: STATS_VK_REQUESTS * WALL_GET_BY_ID_LIMIT,
+        lambda row: row.external_id.isdigit() and (row.channel_id or "").lstrip("-").isdigit(),
+    ),
+    # Просмотры видны только у публичных каналов (@username)
+    "telegram": Collector(
+        _collect_telegram,
+        lambda: STATS_TELEGRAM_REQUESTS * WIDGET_PAGE_SIZE,
+        lambda row: row.external_id.isdigit() and (row.channel_id or "").startswith("@"),
+    ),
+}
+
+
+def collect_channel_stats(channel_type: str, now: datetime = None) -> int:
+    """
+    Один проход сбора статистики канала.
+
+    Returns:
+        Сколько публикаций обновлено
+    """
+    collector = _COLLECTORS[channel_type]
+    now = now or datetime.utcnow()
+
+    rows = _due_publications(channel_type, collector.limit(), now, collector.accepts)
+    if not rows:
+        return 0
+
+    checked, stats = collector.collect(rows)
+    if checked:
+        _save_stats(checked, stats, now)
+    return len(checked)
+
+
+async def collect_stats(context: ContextTypes.DEFAULT_TYPE):
+    """Задача JobQueue: собрать статистику по всем каналам"""
+    for channel_type in _COLLECTORS:
+        try:
+            updated = await asyncio.to_thread(collect_channel_stats, channel_type)
+            if updated:
+                logger.info(f"Stats collected for {updated} {channel_type} publications")
+        except Exception as e:
+            logger.error(f"Stats collection failed for {channel_type}: {e}")
+
+
+def _save_reactions(chat_ids: List[str], message_id: int, total: int) -> int:
+    session = get_session()
+    try:
+        publications = session.query(Publication).filter(
+            Publication.channel_type == "telegram",
+            Publication.channel_id.in_(chat_ids),
+            Publication.external_id == str(message_id),
+        ).all()
+        for publication in publications:
+            publication.stats = {**(publication.stats or {}), "reactions": total}
+        session.commit()
+        return len(publications)
+    finally:
+        session.close()
+
+
+async def reaction_count_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Реакции на пост канала: Telegram присылает итоговые счётчики сам"""
+    event = update.message_reaction_count
+    chat_ids = [str(event.chat.id)]
+    if event.chat.username:
+        chat_ids.append(f"@{event.chat.username}")
+
+    total = sum(reaction.total_count for reaction in event.reactions)
+    await asyncio.to_thread(_save_reactions, chat_ids, event.message_id, total)
+
+
+def setup_stats_collector(app: Application):
+    """Подключить сбор статистики к приложению"""
+    if STORAGE_BACKEND != "bot" or not STATS_INTERVAL:
+        return
+
+    app.add_handler(MessageReactionHandler(
+        reaction_count_callback,
+        message_reaction_types=MessageReactionHandler.MESSAGE_REACTION_COUNT_UPDATED,
+    ))
+
+    if app.job_queue is None:
+        logger.error("JobQueue unavailable. Install python-telegram-bot[job-queue]")
+        return
+
+    app.job_queue.run_repeating(collect_stats, interval=STATS_INTERVAL, first=STATS_INTERVAL,
+                                name=STATS_JOB_NAME)
+    logger.info(f"✅ Stats collector started (every {STATS_INTERVAL}s)")
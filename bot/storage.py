@@ -0,0 +1,562 @@
+"""
+MOS-POOL Bot - Хранилище постов
+===============================
+Единая точка доступа к постам и публикациям для хендлеров.
+
+Бэкенды (STORAGE_BACKEND в .env):
+- "bot"    - собственные таблицы бота (posts, publications из database.py)
+- "django" - таблицы веб-приложения (posts_post, posts_publication...)
+             в DJANGO_DATABASE_URL. Бот и веб-интерфейс видят одни и те же
+             посты, а запланированные публикует планировщик Django.
+
+Пользователи бота всегда хранятся в БД бота.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, List, Iterable, Tuple
+
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, BigInteger, String, Text, DateTime, Boolean, JSON,
+    select, insert, update, delete,
+)
+
+from database import get_session, create_db_engine, Post, Publication, ScheduledPost
+from config import PostStatus, STORAGE_BACKEND, DJANGO_DATABASE_URL, DJANGO_MEDIA_ROOT
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PostRecord:
+    """Пост в формате, не зависящем от бэкенда"""
+    id: int
+    content: str
+    status: str
+    title: Optional[str] = None
+    channels: List[str] = field(default_factory=list)
+    media_urls: List[str] = field(default_factory=list)
+    author_id: Optional[int] = None
+    scheduled_for: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    published_at: Optional[datetime] = None
+    ai_generated: bool = False
+
+    def is_draft(self) -> bool:
+        return self.status == PostStatus.DRAFT
+
+    def is_approved(self) -> bool:
+        return self.status == PostStatus.APPROVED
+
+    def is_published(self) -> bool:
+        return self.status == PostStatus.PUBLISHED
+
+
+# ============ БЭКЕНД: ТАБЛИЦЫ БОТА ============
+
+class BotStorage:
+    """Посты в собственной БД бота"""
+
+    @staticmethod
+    def _to_record(post: Post) -> PostRecord:
+        return PostRecord(
+            id=post.id,
+            content=post.content,
+            status=post.status,
+            title=post.title,
+            channels=list(post.channels or []),
+            media_urls=list(post.media_urls or []),
+            author_id=post.author_id,
+            scheduled_for=post.scheduled_for,
+            created_at=post.created_at,
+            published_at=post.published_at,
+            ai_generated=bool(post.ai_generated),
+        )
+
+    def create_post(
+        self,
+        content: str,
+        author_id: int,
+        status: str = PostStatus.DRAFT,
+        channels: List[str] = None,
+        title: str = None,
+        media_urls: List[str] = None,
+        ai_generated: bool = False,
+    ) -> PostRecord:
+        """Создать пост"""
+        session = get_session()
+        try:
+            post = Post(
+                content=content,
+                title=title or _make_title(content),
+                author_id=author_id,
+                status=status,
+                channels=channels or [],
+                media_urls=media_urls or [],
+                ai_generated=ai_generated,
+            )
+            session.add(post)
+            session.commit()
+            return self._to_record(post)
+        finally:
+            session.close()
+
+    def get_post(self, post_id: int) -> Optional[PostRecord]:
+        """Получить пост по ID"""
+        session = get_session()
+        try:
+            post = session.query(Post).filter(Post.id == post_id).first()
+            return self._to_record(post) if post else None
+        finally:
+            session.close()
+
+    def list_posts(
+        self,
+        author_id: int = None,
+        statuses: Iterable[str] = None,
+        scheduled_only: bool = False,
+        limit: int = None,
+    ) -> List[PostRecord]:
+        """
+        Список постов.
+
+        Запланированные (scheduled_only) сортируются по времени публикации,
+        остальные - от новых к старым.
+        """
+        session = get_session()
+        try:
+            query = session.query(Post)
+            if author_id is not None:
+                query = query.filter(Post.author_id == author_id)
+            if statuses:
+                query = query.filter(Post.status.in_(list(statuses)))
+            if scheduled_only:
+                query = query.filter(Post.scheduled_for != None).order_by(Post.scheduled_for)
+            else:
+                query = query.order_by(Post.created_at.desc())
+            if limit:
+                query = query.limit(limit)
+            return [self._to_record(p) for p in query.all()]
+        finally:
+            session.close()
+
+    def get_scheduled_posts(self) -> List[PostRecord]:
+        """Одобренные посты с временем публикации, ещё не опубликованные"""
+        session = get_session()
+        try:
+            posts = session.query(Post).filter(
+                Post.status == PostStatus.APPROVED,
+                Post.scheduled_for != None,
+                Post.published_at == None
+            ).order_by(Post.scheduled_for).all()
+            return [self._to_record(p) for p in posts]
+        finally:
+            session.close()
+
+    def update_post(self, post_id: int, **fields) -> bool:
+        """Обновить поля поста (status, scheduled_for, published_at, approved_by_id)"""
+        session = get_session()
+        try:
+            post = session.query(Post).filter(Post.id == post_id).first()
+            if not post:
+                return False
+            for name, value in fields.items():
+                setattr(post, name, value)
+            session.commit()
+            return True
+        finally:
+            session.close()
+
+    def schedule_post(self, post_id: int, scheduled_for: datetime) -> bool:
+        """
+        Запланировать публикацию: время в посте + запись в scheduled_posts,
+        которую выполнит планировщик бота (scheduler.py).
+        """
+        session = get_session()
+        try:
+            post = session.query(Post).filter(Post.id == post_id).first()
+            if not post:
+                return False
+            post.scheduled_for = scheduled_for
+            # Перепланирование заменяет ещё не выполненную запись
+            session.query(ScheduledPost).filter(
+                ScheduledPost.post_id == post_id,
+                ScheduledPost.is_processed == False
+            ).delete()
+            session.add(ScheduledPost(
+                post_id=post_id,
+                scheduled_time=scheduled_for,
+                channels=list(post.channels or []),
+            ))
+            session.commit()
+            return True
+        finally:
+            session.close()
+
+    def delete_post(self, post_id: int) -> bool:
+        """Удалить пост вместе с записями о публикациях"""
+        session = get_session()
+        try:
+            post = session.query(Post).filter(Post.id == post_id).first()
+            if not post:
+                return False
+            session.query(Publication).filter(Publication.post_id == post_id).delete()
+            session.query(ScheduledPost).filter(ScheduledPost.post_id == post_id).delete()
+            session.delete(post)
+            session.commit()
+            return True
+        finally:
+            session.close()
+
+    def add_publication(
+        self,
+        post_id: int,
+        channel_type: str,
+        channel_id: str,
+        status: str,
+        external_id: str = None,
+        external_url: str = None,
+        error_message: str = None,
+    ):
+        """Записать результат публикации в канал"""
+        session = get_session()
+        try:
+            session.add(Publication(
+                post_id=post_id,
+                channel_type=channel_type,
+                channel_id=channel_id,
+                status=status,
+                external_id=external_id,
+                external_url=external_url,
+                error_message=error_message,
+                published_at=datetime.utcnow(),
+            ))
+            session.commit()
+        finally:
+            session.close()
+
+
+# ============ БЭКЕНД: ТАБЛИЦЫ DJANGO ============
+
+_metadata = MetaData()
+
+dj_platform = Table(
+    "posts_platform", _metadata,
+    Column("id", BigInteger, primary_key=True),
+    Column("name", String(50)),
+    Column("channel_id", String(100)),
+    Column("is_active", Boolean),
+)
+
+dj_post = Table(
+    "posts_post", _metadata,
+    Column("id", BigInteger, primary_key=True),
+    Column("title", String(200)),
+    Column("content", Text),
+    Column("content_telegram", Text),
+    Column("content_vk", Text),
+    Column("image", String(100)),
+    Column("bot_media", JSON),
+    Column("status", String(20)),
+    Column("scheduled_time", DateTime),
+    Column("ai_generated", Boolean),
+    Column("ai_prompt_used", Text),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("published_at", DateTime),
+    Column("bot_author_id", BigInteger),
+)
+
+dj_post_platforms = Table(
+    "posts_post_platforms", _metadata,
+    Column("id", Integer, primary_key=True),
+    Column("post_id", BigInteger),
+    Column("platform_id", BigInteger),
+)
+
+dj_publication = Table(
+    "posts_publication", _metadata,
+    Column("id", BigInteger, primary_key=True),
+    Column("post_id", BigInteger),
+    Column("platform_id", BigInteger),
+    Column("status", String(20)),
+    Column("external_id", String(100)),
+    Column("external_url", String(200)),
+    Column("error_message", Text),
+    Column("published_at", DateTime),
+)
+
+# Статусы веб-приложения -> статусы бота
+_FROM_DJANGO_STATUS = {
+    "scheduled": PostStatus.APPROVED,
+    "publishing": PostStatus.APPROVED,
+    "failed": PostStatus.APPROVED,
+}
+_DJANGO_STATUSES = (
+    "draft", "pending", "approved", "scheduled", "publishing", "published", "failed", "rejected",
+)
+
+
+def _media_root_path(item: str) -> Optional[str]:
+    """Путь файла относительно DJANGO_MEDIA_ROOT или None, если это не файл оттуда"""
+    try:
+        relative = Path(item).resolve().relative_to(DJANGO_MEDIA_ROOT.resolve())
+    except (ValueError, OSError):
+        return None
+    return relative.as_posix() if (DJANGO_MEDIA_ROOT / relative).is_file() else None
+
+
+def _split_media(media_urls: Iterable[str]) -> Tuple[Optional[str], List[str]]:
+    """
+    Медиа бота -> (posts_post.image, posts_post.bot_media).
+
+    В ImageField попадает только файл из DJANGO_MEDIA_ROOT: file_id Telegram
+    и URL веб-публикаторы и миниатюры открыть не смогут.
+    """
+    image, other = None, []
+    for item in media_urls:
+        path = _media_root_path(item) if image is None else None
+        if path:
+            image = path
+        else:
+            other.append(item)
+    return image, other
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _local_to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Бот задаёт время публикации в локальном времени, Django хранит UTC"""
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _utc_to_local(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+class DjangoStorage:
+    """Посты в таблицах веб-приложения (apps.posts.models)"""
+
+    def __init__(self, url: str = DJANGO_DATABASE_URL):
+        self.engine = create_db_engine(url)
+
+    # --- преобразования ---
+
+    @staticmethod
+    def _django_status(status: str) -> str:
+        """Статус бота для записи в веб-приложение; неизвестный - ошибка, а не черновик"""
+        if status not in _DJANGO_STATUSES:
+            raise ValueError(f"Unknown post status: {status}")
+        return status
+
+    @staticmethod
+    def _django_statuses(statuses: Iterable[str]) -> List[str]:
+        wanted = set(statuses)
+        return [s for s in _DJANGO_STATUSES if _FROM_DJANGO_STATUS.get(s, s) in wanted]
+
+    @staticmethod
+    def _to_record(row, channels: List[str]) -> PostRecord:
+        return PostRecord(
+            id=row.id,
+            content=row.content,
+            status=_FROM_DJANGO_STATUS.get(row.status, row.status),
+            title=row.title,
+            channels=channels,
+            media_urls=([str(DJANGO_MEDIA_ROOT / row.image)] if row.image else []) + list(row.bot_media or []),
+            author_id=row.bot_author_id,
+            scheduled_for=_utc_to_local(row.scheduled_time),
+            created_at=row.created_at,
+            published_at=row.published_at,
+            ai_generated=bool(row.ai_generated),
+        )
+
+    def _platform_ids(self, conn, names: Iterable[str]) -> dict:
+        names = list(names)
+        if not names:
+            return {}
+        rows = conn.execute(
+            select(dj_platform.c.id, dj_platform.c.name).where(dj_platform.c.name.in_(names))
+        ).all()
+        return {row.name: row.id for row in rows}
+
+    def _channels_for(self, conn, post_ids: List[int]) -> dict:
+        """Каналы для набора постов одним запросом"""
+        channels = {post_id: [] for post_id in post_ids}
+        if not post_ids:
+            return channels
+        rows = conn.execute(
+            select(dj_post_platforms.c.post_id, dj_platform.c.name)
+            .join(dj_platform, dj_platform.c.id == dj_post_platforms.c.platform_id)
+            .where(dj_post_platforms.c.post_id.in_(post_ids))
+        ).all()
+        for row in rows:
+            channels[row.post_id].append(row.name)
+        return channels
+
+    def _fetch(self, conn, query) -> List[PostRecord]:
+        rows = conn.execute(query).all()
+        channels = self._channels_for(conn, [row.id for row in rows])
+        return [self._to_record(row, channels[row.id]) for row in rows]
+
+    # --- API хранилища ---
+
+    def create_post(
+        self,
+        content: str,
+        author_id: int,
+        status: str = PostStatus.DRAFT,
+        channels: List[str] = None,
+        title: str = None,
+        media_urls: List[str] = None,
+        ai_generated: bool = False,
+    ) -> PostRecord:
+        now = _utcnow()
+        channels = channels or []
+        image, bot_media = _split_media(media_urls or [])
+        with self.engine.begin() as conn:
+            post_id = conn.execute(insert(dj_post).values(
+                title=(title or _make_title(content))[:200],
+                content=content,
+                content_telegram="",
+                content_vk="",
+                image=image,
+                bot_media=bot_media,
+                status=self._django_status(status),
+                ai_generated=ai_generated,
+                ai_prompt_used="",
+                created_at=now,
+                updated_at=now,
+                bot_author_id=author_id,
+            )).inserted_primary_key[0]
+
+            platform_ids = self._platform_ids(conn, channels)
+            if platform_ids:
+                conn.execute(insert(dj_post_platforms), [
+                    {"post_id": post_id, "platform_id": pid} for pid in platform_ids.values()
+                ])
+
+            row = conn.execute(select(dj_post).where(dj_post.c.id == post_id)).one()
+        return self._to_record(row, [name for name in channels if name in platform_ids])
+
+    def get_post(self, post_id: int) -> Optional[PostRecord]:
+        with self.engine.connect() as conn:
+            records = self._fetch(conn, select(dj_post).where(dj_post.c.id == post_id))
+        return records[0] if records else None
+
+    def list_posts(
+        self,
+        author_id: int = None,
+        statuses: Iterable[str] = None,
+        scheduled_only: bool = False,
+        limit: int = None,
+    ) -> List[PostRecord]:
+        query = select(dj_post)
+        if author_id is not None:
+            query = query.where(dj_post.c.bot_author_id == author_id)
+        if statuses:
+            query = query.where(dj_post.c.status.in_(self._django_statuses(statuses)))
+        if scheduled_only:
+            query = query.where(dj_post.c.scheduled_time.is_not(None)).order_by(dj_post.c.scheduled_time)
+        else:
+            query = query.order_by(dj_post.c.created_at.desc())
+        if limit:
+            query = query.limit(limit)
+        with self.engine.connect() as conn:
+            return self._fetch(conn, query)
+
+    def get_scheduled_posts(self) -> List[PostRecord]:
+        query = select(dj_post).where(
+            dj_post.c.status.in_(("approved", "scheduled")),
+            dj_post.c.scheduled_time.is_not(None),
+            dj_post.c.published_at.is_(None),
+        ).order_by(dj_post.c.scheduled_time)
+        with self.engine.connect() as conn:
+            return self._fetch(conn, query)
+
+    def update_post(self, post_id: int, **fields) -> bool:
+        values = {"updated_at": _utcnow()}
+
+        if "status" in fields:
+            values["status"] = self._django_status(fields["status"])
+        if "published_at" in fields:
+            values["published_at"] = fields["published_at"]
+        if "scheduled_for" in fields:
+            values["scheduled_time"] = _local_to_utc(fields["scheduled_for"])
+        # approved_by_id и прочие поля бота в веб-приложении не хранятся
+
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                select(dj_post.c.status).where(dj_post.c.id == post_id)
+            ).first()
+            if row is None:
+                return False
+
+            # Одобренный пост со временем публикации подхватит планировщик Django
+            status = values.get("status", row.status)
+            if values.get("scheduled_time") and status == PostStatus.APPROVED:
+                values["status"] = "scheduled"
+
+            conn.execute(update(dj_post).where(dj_post.c.id == post_id).values(**values))
+        return True
+
+    def schedule_post(self, post_id: int, scheduled_for: datetime) -> bool:
+        """Публикацию выполнит планировщик Django (статус "scheduled")"""
+        return self.update_post(post_id, scheduled_for=scheduled_for)
+
+    def delete_post(self, post_id: int) -> bool:
+        with self.engine.begin() as conn:
+            conn.execute(delete(dj_publication).where(dj_publication.c.post_id == post_id))
+            conn.execute(delete(dj_post_platforms).where(dj_post_platforms.c.post_id == post_id))
+            result = conn.execute(delete(dj_post).where(dj_post.c.id == post_id))
+        return result.rowcount > 0
+
+    def add_publication(
+        self,
+        post_id: int,
+        channel_type: str,
+        channel_id: str,
+        status: str,
+        external_id: str = None,
+        external_url: str = None,
+        error_message: str = None,
+    ):
+        with self.engine.begin() as conn:
+            platform_id = self._platform_ids(conn, [channel_type]).get(channel_type)
+            if platform_id is None:
+                logger.warning(f"Platform '{channel_type}' not found in web DB, publication not recorded")
+                return
+            conn.execute(insert(dj_publication).values(
+                post_id=post_id,
+                platform_id=platform_id,
+                status=status,
+                external_id=external_id or "",
+                external_url=external_url or "",
+                error_message=error_message or "",
+                published_at=_utcnow(),
+            ))
+
+
+def _make_title(content: str) -> str:
+    return content[:50] + "..." if len(content) > 50 else content
+
+
+# Singleton
+_storage = None
+
+def get_storage():
+    """Получить хранилище постов согласно STORAGE_BACKEND"""
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND == "django":
+            _storage = DjangoStorage()
+            logger.info("Post storage: Django tables")
+        else:
+            _storage = BotStorage()
+    return _storage
@@ -0,0 +1,73 @@
+"""
+MOS-POOL Bot - Параллельная обработка обновлений
+================================================
+Обновления разных чатов обрабатываются одновременно, поэтому долгий хендлер
+(AI генерация, публикация в VK) одного пользователя не задерживает остальных.
+
+Обновления одного чата идут строго по очереди: ConversationHandler хранит
+состояние по (chat_id, user_id), и два сообщения одного пользователя не
+должны обрабатываться одновременно.
+"""
+import asyncio
+import sys
+from typing import Awaitable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    До max_concurrent_updates обновлений одновременно, по одному на чат.
+
+    Обновление, ждущее своей очереди в чате, не занимает слот: иначе один
+    пользователь, отправивший много сообщений подряд, занял бы все слоты.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        self._limit = max_concurrent_updates
+        # Лимит базового класса берёт слот до блокировки чата - держим его открытым,
+        # а настоящий лимит применяем уже после блокировки
+        super().__init__(sys.maxsize)
+        self._slots = asyncio.BoundedSemaphore(max_concurrent_updates)
+        self._chat_locks: Dict[int, asyncio.Lock] = {}
+        self._chat_waiters: Dict[int, int] = {}
+
+    @property
+    def max_concurrent_updates(self) -> int:
+        return self._limit
+
+    @staticmethod
+    def _chat_key(update: object) -> Optional[int]:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable) -> None:
+        key = self._chat_key(update)
+        if key is None:
+            async with self._slots:
+                await coroutine
+            return
+
+        lock = self._chat_locks.setdefault(key, asyncio.Lock())
+        self._chat_waiters[key] = self._chat_waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                async with self._slots:
+                    await coroutine
+        finally:
+            self._chat_waiters[key] -= 1
+            if not self._chat_waiters[key]:
+                del self._chat_waiters[key]
+                del self._chat_locks[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
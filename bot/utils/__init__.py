@@ -1,3 +1,5 @@
-"""Utils package"""
-from .mistral_client import get_mistral_client, MistralClient
-from .vk_client import get_vk_client, VKClient
+"""Utils package
+
+Клиенты импортируются из своих модулей (utils.mistral_client, utils.vk_client):
+пакет не тянет за собой openai и vk_api, пока они не нужны.
+"""
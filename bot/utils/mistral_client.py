@@ -3,7 +3,6 @@ MOS-POOL Bot - Mistral AI клиент
 """
 import logging
 from typing import Optional
-from openai import OpenAI
 from config import MISTRAL_API_KEY, MISTRAL_API_BASE, MISTRAL_MODEL
 
 logger = logging.getLogger(__name__)
@@ -15,6 +14,8 @@ class MistralClient:
     def __init__(self):
         self.client = None
         if MISTRAL_API_KEY:
+            # openai грузится ~1 с - только когда клиент действительно нужен
+            from openai import OpenAI
             self.client = OpenAI(
                 api_key=MISTRAL_API_KEY,
                 base_url=MISTRAL_API_BASE
@@ -2,12 +2,15 @@
 MOS-POOL Bot - VK клиент
 """
 import logging
-from typing import Optional, List
-import vk_api
+from typing import Optional, List, Dict
 from config import VK_ACCESS_TOKEN, VK_GROUP_ID
+from metrics import stage
 
 logger = logging.getLogger(__name__)
 
+# Максимум постов в одном запросе wall.getById
+WALL_GET_BY_ID_LIMIT = 100
+
 
 class VKClient:
     """Клиент для VK API"""
@@ -19,6 +22,7 @@ class VKClient:
         
         if VK_ACCESS_TOKEN and VK_GROUP_ID:
             try:
+                import vk_api
                 self.session = vk_api.VkApi(token=VK_ACCESS_TOKEN)
                 self.api = self.session.get_api()
                 self.upload = vk_api.VkUpload(self.session)
@@ -62,8 +66,8 @@ class VKClient:
             attachments = []
             
             # Загрузка фото
-            if photo_paths:
-                for photo_path in photo_paths[:10]:  # Максимум 10 фото
+            with stage("vk", "media"):
+                for photo_path in (photo_paths or [])[:10]:  # Максимум 10 фото
                     try:
                         photos = self.upload.photo_wall(
                             photo_path,
@@ -76,12 +80,13 @@ class VKClient:
                         logger.error(f"VK photo upload error: {e}")
             
             # Публикация
-            response = self.api.wall.post(
-                owner_id=-self.group_id,
-                message=text,
-                attachments=",".join(attachments) if attachments else None,
-                from_group=1 if from_group else 0
-            )
+            with stage("vk", "api"):
+                response = self.api.wall.post(
+                    owner_id=-self.group_id,
+                    message=text,
+                    attachments=",".join(attachments) if attachments else None,
+                    from_group=1 if from_group else 0
+                )
             
             post_id = response.get("post_id")
             if post_id:
@@ -113,25 +118,46 @@ class VKClient:
     
     def get_post_stats(self, post_id: int) -> Optional[dict]:
         """Получение статистики поста"""
+        stats = self.get_posts_stats([post_id])
+        return stats.get(post_id) if stats else None
+    
+    def get_posts_stats(self, post_ids: List[int], owner_id: int = None) -> Optional[Dict[int, dict]]:
+        """
+        Статистика нескольких постов: один wall.getById на каждые
+        WALL_GET_BY_ID_LIMIT постов.
+        
+        Args:
+            post_ids: ID постов на стене
+            owner_id: Владелец стены (по умолчанию - группа из настроек)
+        
+        Returns:
+            {post_id: stats} (удалённых постов в ответе нет) или None при ошибке
+        """
         if not self.is_configured():
             return None
         
-        try:
-            posts = self.api.wall.getById(
-                posts=f"-{self.group_id}_{post_id}"
-            )
-            if posts:
-                post = posts[0]
-                return {
+        owner_id = owner_id or -self.group_id
+        stats = {}
+        for start in range(0, len(post_ids), WALL_GET_BY_ID_LIMIT):
+            chunk = post_ids[start:start + WALL_GET_BY_ID_LIMIT]
+            try:
+                response = self.api.wall.getById(
+                    posts=",".join(f"{owner_id}_{post_id}" for post_id in chunk)
+                )
+            except Exception as e:
+                logger.error(f"VK stats error: {e}")
+                return None
+            
+            # Новые версии API возвращают {"items": [...]}
+            items = response.get("items", []) if isinstance(response, dict) else response
+            for post in items:
+                stats[post["id"]] = {
                     "views": post.get("views", {}).get("count", 0),
                     "likes": post.get("likes", {}).get("count", 0),
                     "reposts": post.get("reposts", {}).get("count", 0),
                     "comments": post.get("comments", {}).get("count", 0),
                 }
-            return None
-        except Exception as e:
-            logger.error(f"VK stats error: {e}")
-            return None
+        return stats
 
 
 # Singleton
@@ -0,0 +1,110 @@
+"""
+MOS-POOL Bot - Режим webhook
+============================
+Telegram сам присылает обновления на WEBHOOK_URL + WEBHOOK_PATH, вместо того
+чтобы бот постоянно опрашивал getUpdates.
+
+Обновления принимает aiohttp-сервер и кладёт их в очередь Application,
+дальше работают обычные хендлеры. Запросы без правильного
+X-Telegram-Bot-Api-Secret-Token отклоняются.
+
+Запуск: BOT_MODE=webhook WEBHOOK_URL=https://... python main.py
+"""
+import asyncio
+import hmac
+import logging
+import secrets
+import signal
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application
+
+from config import (
+    WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_LISTEN, WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN, WEBHOOK_MAX_CONNECTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def create_web_app(app: Application, secret_token: str) -> web.Application:
+    """aiohttp-приложение, принимающее обновления от Telegram"""
+
+    async def handle_update(request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), secret_token):
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        # Отвечаем сразу, обработка идёт в фоне через очередь Application
+        await app.update_queue.put(Update.de_json(data, app.bot))
+        return web.Response()
+
+    async def health(request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    web_app = web.Application()
+    web_app.router.add_post(WEBHOOK_PATH, handle_update)
+    web_app.router.add_get("/healthz", health)
+    return web_app
+
+
+async def serve_webhook(app: Application, allowed_updates: list, stop_event: asyncio.Event = None):
+    """
+    Запустить Application в режиме webhook и ждать остановки.
+
+    Args:
+        app: Настроенное приложение с хендлерами
+        allowed_updates: Типы обновлений, которые присылает Telegram
+        stop_event: Событие остановки (по умолчанию - SIGINT/SIGTERM)
+    """
+    if not WEBHOOK_URL:
+        raise RuntimeError("WEBHOOK_URL is required for webhook mode")
+
+    # Без заданного секрета генерируем случайный - webhook всё равно ставим мы
+    secret_token = WEBHOOK_SECRET_TOKEN or secrets.token_urlsafe(32)
+
+    if stop_event is None:
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except NotImplementedError:  # Windows
+                pass
+
+    runner = web.AppRunner(create_web_app(app, secret_token), access_log=None)
+    await runner.setup()
+
+    async with app:
+        await app.start()
+        await app.bot.set_webhook(
+            url=WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=secret_token,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=allowed_updates,
+        )
+
+        site = web.TCPSite(runner, WEBHOOK_LISTEN, WEBHOOK_PORT)
+        await site.start()
+        logger.info(f"🌐 Webhook listening on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+
+        try:
+            await stop_event.wait()
+        finally:
+            await runner.cleanup()
+            await app.stop()
+
+
+def run_webhook(app: Application, allowed_updates: list):
+    """Блокирующий запуск (аналог app.run_polling)"""
+    try:
+        asyncio.run(serve_webhook(app, allowed_updates))
+    except KeyboardInterrupt:
+        pass
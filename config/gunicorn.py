@@ -0,0 +1,69 @@
+"""
+Gunicorn - боевой запуск веб-интерфейса вместо runserver.
+
+    gunicorn -c config/gunicorn.py config.wsgi
+
+Запросы в основном короткие (SQLite в режиме WAL), но генерация текста
+и публикация ждут внешние API секундами - поэтому gthread: несколько
+процессов, в каждом потоки, и один медленный запрос не занимает воркер
+целиком. Воркеры перезапускаются каждые max_requests запросов (со
+случайным разбросом, чтобы не все сразу) - это ограничивает рост памяти.
+
+Приложение не загружается в мастере (preload_app выключен): каждый
+воркер поднимает Django сам, а планировщик задач работает только в
+одном из них (см. apps/scheduler/scheduler.py).
+
+Параметры переопределяются переменными окружения / .env (GUNICORN_*).
+С PROMETHEUS_MULTIPROC_DIR воркеры пишут метрики в общий каталог
+(см. config/metrics.py); мастер чистит его от файлов мёртвых процессов.
+"""
+import multiprocessing
+import os
+
+import environ
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+env = environ.Env()
+environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
+
+bind = env('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = env.int('GUNICORN_WORKERS', default=min(multiprocessing.cpu_count() * 2 + 1, 8))
+worker_class = 'gthread'
+threads = env.int('GUNICORN_THREADS', default=4)
+
+# Генерация поста через ИИ может идти десятки секунд
+timeout = env.int('GUNICORN_TIMEOUT', default=120)
+graceful_timeout = 30
+keepalive = env.int('GUNICORN_KEEPALIVE', default=5)
+
+max_requests = env.int('GUNICORN_MAX_REQUESTS', default=1000)
+max_requests_jitter = max_requests // 10
+
+chdir = BASE_DIR
+# Пульс воркеров - в памяти, а не на диске (важно для медленных дисков VPS)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = env('GUNICORN_ACCESS_LOG', default='-')
+errorlog = '-'
+loglevel = env('GUNICORN_LOG_LEVEL', default='info')
+
+
+def on_starting(server):
+    """Убрать файлы метрик процессов, не доживших до прошлой остановки"""
+    path = env('PROMETHEUS_MULTIPROC_DIR', default='')
+    if path and os.path.isdir(path):
+        from config.metrics import cleanup_dead_processes
+        cleanup_dead_processes(path)
+
+
+def child_exit(server, worker):
+    """Метрики вышедшего воркера: gauge с режимом live* перестают учитываться"""
+    if env('PROMETHEUS_MULTIPROC_DIR', default=''):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Остановить планировщик воркера: задачи не держат выход, блокировку подхватит другой"""
+    from apps.scheduler.scheduler import stop_scheduler
+    stop_scheduler()
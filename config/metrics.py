@@ -0,0 +1,73 @@
+"""
+Metrics - метрики Prometheus (эндпоинт /metrics/).
+
+Воркеры gunicorn и процесс run_scheduler пишут метрики в общий каталог
+PROMETHEUS_MULTIPROC_DIR (режим multiprocess prometheus_client), и
+/metrics/ отдаёт их сумму, какой бы воркер ни принял запрос. Без этого
+каталога - метрики одного процесса (runserver со встроенным планировщиком).
+
+prometheus_client импортируется модулями метрик (apps/*/metrics.py),
+которые грузятся только вместе с публикацией и планировщиком.
+"""
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Секунды: от записи в SQLite до загрузки фото и таймаута API
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """Записать длительность блока в гистограмму (и при исключении тоже)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - started)
+
+
+def render_metrics(collectors=()) -> tuple:
+    """
+    (тело ответа, Content-Type) в текстовом формате Prometheus.
+
+    Args:
+        collectors: Коллекторы, которые считают значения в момент опроса
+            (запросом к БД) - в multiprocess-режиме их не видно через
+            файлы процессов, поэтому они собираются здесь
+    """
+    from django.conf import settings
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    on_scrape = CollectorRegistry()
+    for collector in collectors:
+        on_scrape.register(collector)
+    return generate_latest(registry) + generate_latest(on_scrape), CONTENT_TYPE_LATEST
+
+
+def cleanup_dead_processes(path: str):
+    """
+    Удалить файлы метрик завершившихся процессов.
+
+    Имена файлов multiprocess - <тип>_<pid>.db; счётчики мёртвых процессов
+    пропадут из суммы, что Prometheus считает сбросом счётчика (rate() это
+    учитывает), зато каталог не растёт с каждым перезапуском воркера.
+    """
+    for file in Path(path).glob('*.db'):
+        try:
+            pid = int(file.stem.rsplit('_', 1)[1])
+            os.kill(pid, 0)
+        except (IndexError, ValueError):
+            continue
+        except ProcessLookupError:
+            file.unlink(missing_ok=True)
+        except PermissionError:
+            pass  # Процесс жив, но чужой
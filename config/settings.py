@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,6 +77,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Сколько секунд ждать снятия блокировки (PRAGMA см. config/sqlite.py)
+            'timeout': env.int('SQLITE_TIMEOUT', default=20),
+        },
     }
 }
 
@@ -98,10 +103,23 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Статику отдаёт WhiteNoise прямо из gunicorn: после collectstatic файлы
+# с хешем в имени (кэшируются навсегда) и заранее сжатые .gz/.br
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+
 # Media files (uploaded images)
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Загрузки пишутся на диск по мере приёма, с SHA-256 и ранними лимитами
+# (apps/posts/services/uploads.py): размер файла (байты) и число пикселей
+FILE_UPLOAD_HANDLERS = ['apps.posts.services.uploads.HashingUploadHandler']
+UPLOAD_MAX_SIZE = env.int('UPLOAD_MAX_SIZE', default=25 * 1024 * 1024)
+UPLOAD_MAX_PIXELS = env.int('UPLOAD_MAX_PIXELS', default=50_000_000)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -120,10 +138,50 @@ VK_GROUP_ID = env('VK_GROUP_ID', default='')
 # Mistral AI
 MISTRAL_API_KEY = env('MISTRAL_API_KEY', default='')
 MISTRAL_API_BASE = env('MISTRAL_API_BASE', default='https://api.mistral.ai/v1')
+# Одновременных запросов к ИИ при массовой генерации
+AI_CONCURRENCY = env.int('AI_CONCURRENCY', default=4)
+
+# Шаблоны постов из БД кэшируются в процессе; сигналы сбрасывают кэш сразу,
+# TTL ограничивает устаревание в других процессах (секунды)
+TEMPLATE_CACHE_TTL = env.int('TEMPLATE_CACHE_TTL', default=300)
+
+# Индекс хештегов по истории публикаций: как часто дочитывать новые посты и
+# перестраивать с нуля (сек, в каждом процессе) и добирать ли недостающие
+# хештеги через ИИ
+HASHTAG_INDEX_REFRESH = env.int('HASHTAG_INDEX_REFRESH', default=600)
+HASHTAG_INDEX_REBUILD = env.int('HASHTAG_INDEX_REBUILD', default=6 * 3600)
+HASHTAG_AI_FALLBACK = env.bool('HASHTAG_AI_FALLBACK', default=False)
+
+# Превью изображений для списков: наибольшая сторона (px) и потоков на сборку
+THUMBNAIL_SIZE = env.int('THUMBNAIL_SIZE', default=480)
+THUMBNAIL_WORKERS = env.int('THUMBNAIL_WORKERS', default=2)
+
+# Планировщик: запускать ли его в процессе веб-сервера (иначе -
+# manage.py run_scheduler) и сколько задач выполнять параллельно
+SCHEDULER_IN_PROCESS = env.bool('SCHEDULER_IN_PROCESS', default=True)
+SCHEDULER_THREADS = env.int('SCHEDULER_THREADS', default=10)
+# Планировщик работает в одном процессе из всех (воркеры gunicorn):
+# файл блокировки и как часто остальные проверяют, не освободился ли он (сек)
+SCHEDULER_LOCK_FILE = env('SCHEDULER_LOCK_FILE', default=str(BASE_DIR / 'logs' / 'scheduler.lock'))
+SCHEDULER_LOCK_RETRY = env.int('SCHEDULER_LOCK_RETRY', default=30)
+
+# Метрики Prometheus (/metrics/): общий каталог, куда пишут все процессы
+# (воркеры gunicorn, run_scheduler); пусто - метрики одного процесса
+PROMETHEUS_MULTIPROC_DIR = env('PROMETHEUS_MULTIPROC_DIR', default='')
+if PROMETHEUS_MULTIPROC_DIR:
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
 
 # Company site for parsing
 COMPANY_SITE_URL = env('COMPANY_SITE_URL', default='')
 
+# Обход сайта (apps/posts/services/site_crawler.py)
+CRAWLER_PROJECTS_PATH = env('CRAWLER_PROJECTS_PATH', default='/projects/')
+CRAWLER_WORKERS = env.int('CRAWLER_WORKERS', default=8)
+CRAWLER_TIMEOUT = env.int('CRAWLER_TIMEOUT', default=15)
+CRAWLER_MAX_PAGES = env.int('CRAWLER_MAX_PAGES', default=50)  # Страниц списка проектов
+CRAWLER_INTERVAL_HOURS = env.int('CRAWLER_INTERVAL_HOURS', default=24)  # 0 - не обходить по расписанию
+
 # =============================================================================
 # Logging Configuration
 # =============================================================================
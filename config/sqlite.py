@@ -0,0 +1,44 @@
+"""
+SQLite tuning - PRAGMA для каждого нового соединения.
+
+WAL позволяет читать во время записи (веб-запросы не ждут планировщик).
+Ожидание блокировки вместо мгновенной ошибки "database is locked" задаёт
+OPTIONS['timeout'] (SQLITE_TIMEOUT в settings) - PRAGMA busy_timeout здесь
+нет, иначе он молча перекрыл бы эту настройку.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Порядок важен: journal_mode первым, остальные применяются к соединению
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',       # безопасно в режиме WAL
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,          # отрицательное значение - в КиБ (~20 МБ)
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_sqlite_pragmas(cursor, pragmas: dict = None):
+    """
+    Применить PRAGMA к соединению.
+
+    Args:
+        cursor: DB-API курсор SQLite соединения
+        pragmas: Набор PRAGMA (по умолчанию SQLITE_PRAGMAS)
+    """
+    for name, value in (pragmas or SQLITE_PRAGMAS).items():
+        cursor.execute(f"PRAGMA {name}={value}")
+
+
+def on_connection_created(sender, connection, **kwargs):
+    """Обработчик сигнала connection_created для Django"""
+    if connection.vendor != 'sqlite':
+        return
+
+    try:
+        with connection.cursor() as cursor:
+            apply_sqlite_pragmas(cursor)
+    except Exception as e:
+        logger.error(f"Failed to apply SQLite pragmas: {e}")
@@ -2,14 +2,23 @@
 URL configuration for Pool Social Media Automation System
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from apps.posts import api_views, views as post_views
+from apps.posts.services.thumbnails import THUMBS_DIR
+
 urlpatterns = [
+    # Превью отдаются и без DEBUG: маленькие и с долгим кэшированием
+    re_path(
+        rf'^{settings.MEDIA_URL.lstrip("/")}{THUMBS_DIR}/(?P<path>.+)$',
+        post_views.serve_thumbnail, name='thumbnail'
+    ),
     path('admin/', admin.site.urls),
     path('', include('apps.posts.urls')),
     path('api/', include('apps.posts.api_urls')),
+    path('metrics/', api_views.metrics, name='metrics'),
 ]
 
 # Serve media files in development
@@ -6,3 +6,11 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 application = get_wsgi_application()
+
+# Планировщик в процессе веб-сервера (runserver, gunicorn); в бою он вынесен
+# в manage.py run_scheduler и SCHEDULER_IN_PROCESS=False
+from django.conf import settings  # noqa: E402
+
+if settings.SCHEDULER_IN_PROCESS:
+    from apps.scheduler.scheduler import start_scheduler
+    start_scheduler()
@@ -6,6 +6,7 @@ set -e
 
 APP_DIR="/opt/pool-social"
 SERVICE_FILE="/etc/systemd/system/pool-social.service"
+SCHEDULER_SERVICE_FILE="/etc/systemd/system/pool-social-scheduler.service"
 LOG_DIR="/var/log/pool-social"
 
 echo "========================================"
@@ -59,16 +60,20 @@ echo "Running database migrations..."
 python manage.py makemigrations posts
 python manage.py migrate
 
+# Static files for WhiteNoise (hashed + compressed)
+python manage.py collectstatic --noinput
+
 # Create logs directory for Django
 mkdir -p logs
 
 # Install systemd service
 echo "Installing systemd service..."
 cp deploy/pool-social.service "$SERVICE_FILE"
+cp deploy/pool-social-scheduler.service "$SCHEDULER_SERVICE_FILE"
 
 # Reload systemd and enable service
 systemctl daemon-reload
-systemctl enable pool-social
+systemctl enable pool-social pool-social-scheduler
 
 echo ""
 echo "========================================"
@@ -78,7 +83,7 @@ echo ""
 echo "Next steps:"
 echo "1. Edit config: nano $APP_DIR/.env"
 echo "2. Create admin user: cd $APP_DIR && source venv/bin/activate && python manage.py createsuperuser"
-echo "3. Start service: systemctl start pool-social"
+echo "3. Start services: systemctl start pool-social pool-social-scheduler"
 echo "4. Check status: systemctl status pool-social"
 echo "5. View logs: tail -f /var/log/pool-social/app.log"
 echo ""
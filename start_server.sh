@@ -43,4 +43,10 @@ echo "Open http://127.0.0.1:8000 in your browser"
 echo "Press Ctrl+C to stop"
 echo ""
 
-python manage.py runserver 0.0.0.0:8000
+# ./start_server.sh --dev - dev server with autoreload
+if [ "$1" == "--dev" ]; then
+    python manage.py runserver 0.0.0.0:8000
+else
+    python manage.py collectstatic --noinput > /dev/null
+    gunicorn -c config/gunicorn.py config.wsgi
+fi